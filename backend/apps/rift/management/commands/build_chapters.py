@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+from apps.rift.services.chapters import rebuild_chapters, refresh_last_chapter
+from apps.rift.services.players import get_player_by_puuid, iter_players
+from common.utils.command_util import BatchCommand
+
+
+class Command(BatchCommand):
+    help = "Segment players' seasons into chapters and store the precomputed chapter aggregates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--puuid", help="Build a single player; default is every player.")
+        parser.add_argument("--season", type=int, default=datetime.now(timezone.utc).year)
+        parser.add_argument(
+            "--refresh", action="store_true", help="Only re-derive each player's last chapter with new games."
+        )
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            if options["puuid"]:
+                player = get_player_by_puuid(cursor, options["puuid"])
+                if player is None:
+                    raise CommandError(f"Unknown puuid: {options['puuid']}")
+                players = [player]
+            else:
+                players = list(iter_players(cursor))
+
+        build = refresh_last_chapter if options["refresh"] else rebuild_chapters
+        for player in players:
+            chapters = build(player.id, options["season"])
+            self.stdout.write(f"{player.game_name}#{player.tag_line}: {len(chapters)} chapter(s) written")
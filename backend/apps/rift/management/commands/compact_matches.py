@@ -0,0 +1,31 @@
+from django.db import connection
+
+from apps.rift.services.matches import compact_matches, relation_size
+from common.utils.command_util import BatchCommand
+
+
+def _mb(size: int) -> str:
+    return f"{size / 2**20:,.1f} MB"
+
+
+class Command(BatchCommand):
+    help = (
+        "Move league_matches rows stored whole (raw_data jsonb) to split storage: game_info / participant / "
+        "teams slices plus the zlib-compressed document in raw_zlib."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many matches.")
+        parser.add_argument("--vacuum-full", action="store_true", help="VACUUM FULL league_matches afterwards.")
+
+    def handle(self, *args, **options):
+        report = compact_matches(options["batch_size"], options["limit"])
+        self.stdout.write(
+            f"compacted {report.matches} match(es); league_matches {_mb(report.bytes_before)} -> "
+            f"{_mb(report.bytes_after)}"
+        )
+        if options["vacuum_full"]:
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM FULL league_matches")
+                self.stdout.write(f"after VACUUM FULL: {_mb(relation_size(cursor))}")
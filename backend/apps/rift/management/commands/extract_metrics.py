@@ -0,0 +1,21 @@
+import os
+
+from apps.rift.services.metrics_extraction import DEFAULT_BATCH_SIZE, process_unprocessed
+from common.utils.command_util import BatchCommand
+
+
+class Command(BatchCommand):
+    help = "Compute league_player_match_metrics for every unprocessed match in league_matches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many matches.")
+
+    def handle(self, *args, **options):
+        report = process_unprocessed(options["batch_size"], options["workers"], options["limit"])
+        rate = report.matches / report.seconds if report.seconds else 0
+        self.stdout.write(
+            f"processed={report.matches} metrics={report.metrics} unmatched={report.unmatched} "
+            f"in {report.seconds:.1f}s ({rate:,.0f} matches/s)"
+        )
@@ -0,0 +1,69 @@
+import re
+from datetime import datetime, timezone
+
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+
+from apps.rift.services import partitions
+from common.utils.command_util import BatchCommand
+
+
+class Command(BatchCommand):
+    help = (
+        "Create season partitions of league_matches and league_player_match_metrics ahead of time (moving "
+        "rows of those seasons out of the default partitions) and detach or archive old seasons."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, default=1, help="Seasons to create past the current one.")
+        parser.add_argument(
+            "--from", dest="first", type=int, default=None,
+            help="First season to create (default: the current one); use it to backfill history.",
+        )
+        parser.add_argument(
+            "--detach-before", type=int, default=None, help="Detach the partitions of seasons before this one."
+        )
+        parser.add_argument(
+            "--archive-schema", default=None, help="Move detached partitions into this schema (created if missing)."
+        )
+
+    def handle(self, *args, **options):
+        archive = options["archive_schema"]
+        if archive is not None and not re.fullmatch(r"[a-z_][a-z0-9_]*", archive):
+            raise CommandError(f"Invalid schema name: {archive}")
+        current = datetime.now(timezone.utc).year
+        first = options["first"] if options["first"] is not None else current
+        detach_before = options["detach_before"]
+        if detach_before is not None and first < detach_before:
+            first = detach_before
+
+        for season in range(first, current + options["ahead"] + 1):
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    moved = partitions.create_season(cursor, season)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            if moved is not None:
+                self.stdout.write(f"season {season}: created, {moved} row(s) moved from the default partitions")
+
+        if detach_before is not None:
+            with connection.cursor() as cursor:
+                seasons = sorted({
+                    p.season for p in partitions.list_partitions(cursor, "league_matches")
+                    if p.season is not None and p.season < detach_before
+                })
+            for season in seasons:
+                try:
+                    with transaction.atomic(), connection.cursor() as cursor:
+                        detached = partitions.detach_season(cursor, season, archive)
+                except ValueError as exc:
+                    raise CommandError(str(exc))
+                where = f" into schema {archive}" if archive else ""
+                self.stdout.write(f"season {season}: detached {', '.join(detached)}{where}")
+
+        with connection.cursor() as cursor:
+            for table in partitions.PARTITIONED:
+                for p in partitions.list_partitions(cursor, table):
+                    self.stdout.write(f"{p.name:45} ~{p.rows:>12,} rows {p.bytes / 2**20:>10,.1f} MB")
+                    if p.season is None and p.rows:
+                        self.stdout.write("  rows outside every season: --from <season> moves them out")
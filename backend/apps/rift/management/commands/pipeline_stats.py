@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.rift.services.pipeline import stage_timings
+
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value:,.0f}"
+
+
+class Command(BaseCommand):
+    help = "Show where pipeline time goes: per-stage durations of recently finished jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            timings = stage_timings(cursor, options["days"])
+            cursor.execute(
+                """
+                SELECT status, COUNT(*) FROM league_pipeline_jobs
+                WHERE created_at >= NOW() - make_interval(days => %s)
+                GROUP BY status ORDER BY status
+                """,
+                (options["days"],),
+            )
+            jobs = cursor.fetchall()
+
+        total = sum(t["total_ms"] for t in timings) or 1
+        self.stdout.write("jobs: " + (", ".join(f"{status}={count}" for status, count in jobs) or "none"))
+        self.stdout.write(f"{'stage':16} {'runs':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'share':>6} {'retries':>7}")
+        for t in timings:
+            self.stdout.write(
+                f"{t['stage']:16} {t['runs']:>6} {_ms(t['p50_ms']):>9} {_ms(t['p95_ms']):>9} "
+                f"{_ms(t['max_ms']):>9} {t['total_ms'] / total:>6.0%} {t['retries']:>7}"
+            )
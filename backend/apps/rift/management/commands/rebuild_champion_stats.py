@@ -0,0 +1,23 @@
+import time
+
+from django.db import connection, transaction
+
+from apps.rift.services import champion_stats
+from common.utils.command_util import BatchCommand
+
+
+class Command(BatchCommand):
+    help = (
+        "Recompute league_player_champion_stats and league_role_champion_stats from "
+        "league_player_match_metrics (one season, or every season)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, default=None, help="Only this season (default: all).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            players, roles = champion_stats.rebuild(cursor, options["season"])
+        seconds = time.perf_counter() - started
+        self.stdout.write(f"rebuilt {players} player and {roles} role champion row(s) in {seconds:.1f}s")
@@ -0,0 +1,40 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+from apps.rift.services.players import get_player_by_puuid
+from apps.rift.services.recommendations import (
+    DEFAULT_BATCH_SIZE,
+    generate_recommendations,
+    refresh_recommendations,
+)
+from common.utils.command_util import BatchCommand
+
+
+class Command(BatchCommand):
+    help = "Write each player's top 3 league_champion_recommendations from the champion co-play matrix."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, default=datetime.now(timezone.utc).year)
+        parser.add_argument(
+            "--puuid", action="append", help="Only fold these players' new games into the model and rewrite theirs."
+        )
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options["puuid"]:
+            with connection.cursor() as cursor:
+                player_ids = []
+                for puuid in options["puuid"]:
+                    player = get_player_by_puuid(cursor, puuid)
+                    if player is None:
+                        raise CommandError(f"Unknown puuid: {puuid}")
+                    player_ids.append(player.id)
+            written = refresh_recommendations(player_ids, options["season"], options["batch_size"])
+        else:
+            written = generate_recommendations(options["season"], options["batch_size"])
+        seconds = time.perf_counter() - started
+        self.stdout.write(f"wrote {written} recommendation(s) in {seconds:.1f}s")
@@ -0,0 +1,69 @@
+import os
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+from apps.rift.services.players import get_player_by_puuid
+from apps.rift.services.similarity_matches import DEFAULT_BLOCK_SIZE, DEFAULT_TOP_N, recompute_similarity
+from common.analysis.similarity_index import METRICS
+from common.utils.command_util import BatchCommand
+
+
+class Command(BatchCommand):
+    help = "Recompute league_similarity_matches (top-N pros per player) in vectorized blocks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=DEFAULT_TOP_N, help="Pros kept per player.")
+        parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+        parser.add_argument("--metric", choices=METRICS, default="cosine")
+        parser.add_argument("--same-role", action="store_true", help="Only match players with pros of their role.")
+        parser.add_argument("--puuid", action="append", help="Recompute these players only (repeatable).")
+        parser.add_argument("--after-id", type=int, default=0, help="Start after this player_id.")
+        parser.add_argument(
+            "--checkpoint",
+            help="File holding the last committed player_id: read on start, updated after every block, "
+            "removed when the run completes.",
+        )
+
+    def handle(self, *args, **options):
+        player_ids = None
+        if options["puuid"]:
+            with connection.cursor() as cursor:
+                player_ids = []
+                for puuid in options["puuid"]:
+                    player = get_player_by_puuid(cursor, puuid)
+                    if player is None:
+                        raise CommandError(f"Unknown puuid: {puuid}")
+                    player_ids.append(player.id)
+
+        checkpoint = options["checkpoint"]
+        after_id = options["after_id"]
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                after_id = max(after_id, int(f.read().strip() or 0))
+            self.stdout.write(f"resuming after player_id={after_id}")
+
+        def on_block(report):
+            if checkpoint:
+                with open(checkpoint, "w") as f:
+                    f.write(str(report.last_player_id))
+            self.stdout.write(
+                f"players={report.players} rows={report.rows} changed={report.changed} "
+                f"through player_id={report.last_player_id} ({report.rows_per_second:,.0f} rows/s)"
+            )
+
+        report = recompute_similarity(
+            top_n=options["top"],
+            block_size=options["block_size"],
+            metric=options["metric"],
+            same_role=options["same_role"],
+            player_ids=player_ids,
+            after_id=after_id,
+            on_block=on_block,
+        )
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(
+            f"recomputed players={report.players} rows={report.rows} changed={report.changed} "
+            f"in {report.seconds:.1f}s ({report.rows_per_second:,.0f} rows/s)"
+        )
@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+
+from django.core.management.base import BaseCommand, OutputWrapper
+
+from apps.rift.services.pipeline import run_worker
+
+
+def _work(worker_id: str, poll_interval: float, drain: bool, stdout=None) -> int:
+    """One worker; stops after its current job on SIGTERM/SIGINT."""
+    stopping = []
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopping.append(True))
+
+    def on_job(job, status):
+        if stdout is not None:
+            stdout.write(f"[{worker_id}] job {job.id} ({job.puuid}, {job.season}): {status}")
+
+    return run_worker(worker_id, poll_interval, drain, should_stop=lambda: bool(stopping), on_job=on_job)
+
+
+def _child(worker_id: str, poll_interval: float, drain: bool):
+    # spawned interpreter: configure Django before touching the database
+    import django
+
+    django.setup()
+    _work(worker_id, poll_interval, drain, OutputWrapper(sys.stdout))
+
+
+class Command(BaseCommand):
+    help = "Run pipeline workers: claim queued league_pipeline_jobs and run their stages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to run.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between polls when idle.")
+        parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        if options["processes"] <= 1:
+            ran = _work(prefix, options["poll_interval"], options["drain"], self.stdout)
+            self.stdout.write(f"ran {ran} jobs")
+            return
+
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=_child, args=(f"{prefix}/{i}", options["poll_interval"], options["drain"]))
+            for i in range(options["processes"])
+        ]
+        for worker in workers:
+            worker.start()
+        # e.g. a deploy stopping the service: every child finishes its current job, then exits
+        signal.signal(signal.SIGTERM, lambda *_: [os.kill(w.pid, signal.SIGTERM) for w in workers if w.is_alive()])
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            # children got the same SIGINT and finish their current job
+            for worker in workers:
+                worker.join()
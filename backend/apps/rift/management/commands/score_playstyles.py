@@ -0,0 +1,36 @@
+import time
+from datetime import datetime, timezone
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+from apps.rift.services.players import get_player_by_puuid
+from apps.rift.services.playstyle import rebuild_playstyles, refresh_playstyles
+from common.utils.command_util import BatchCommand
+
+
+class Command(BatchCommand):
+    help = "Score league_player_playstyle axes from role-relative percentiles of league_player_match_metrics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, default=datetime.now(timezone.utc).year)
+        parser.add_argument(
+            "--puuid", action="append", help="Only update these players in the cached tables and rescore them."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options["puuid"]:
+            with connection.cursor() as cursor:
+                player_ids = []
+                for puuid in options["puuid"]:
+                    player = get_player_by_puuid(cursor, puuid)
+                    if player is None:
+                        raise CommandError(f"Unknown puuid: {puuid}")
+                    player_ids.append(player.id)
+            written = refresh_playstyles(player_ids, options["season"], options["batch_size"])
+        else:
+            written = rebuild_playstyles(options["season"], options["batch_size"])
+        seconds = time.perf_counter() - started
+        self.stdout.write(f"scored {written} player(s) in {seconds:.1f}s")
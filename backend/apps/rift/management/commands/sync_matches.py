@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+from apps.rift.services.match_sync import sync_player_matches
+from apps.rift.services.players import get_player_by_puuid, iter_players
+from common.utils.command_util import BatchCommand
+
+
+class Command(BatchCommand):
+    help = "Incrementally sync matches (after each player's watermark) into league_matches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--puuid", help="Sync a single player; default is every player.")
+        parser.add_argument("--year", type=int, default=datetime.now(timezone.utc).year)
+        parser.add_argument("--role", default="AUTO")
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            if options["puuid"]:
+                player = get_player_by_puuid(cursor, options["puuid"])
+                if player is None:
+                    raise CommandError(f"Unknown puuid: {options['puuid']}")
+                players = [player]
+            else:
+                players = list(iter_players(cursor))
+
+        for player in players:
+            report = sync_player_matches(player, options["year"], options["role"])
+            self.stdout.write(
+                f"{player.game_name}#{player.tag_line}: listed={report.listed} pages={report.pages} "
+                f"fetched={report.fetched} skipped={report.skipped} missed={report.missed} "
+                f"given_up={report.given_up} watermark={report.watermark_before}->{report.watermark_after}"
+                + ("" if report.complete else " (incomplete: watermark held)")
+            )
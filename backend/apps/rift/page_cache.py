@@ -0,0 +1,177 @@
+import hashlib
+import time
+from functools import wraps
+from typing import Iterable, Optional, Sequence, Tuple
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from apps.rift.services.players import get_player_by_puuid
+from common.utils.db_util import db_sync_to_async
+
+# Data a page is rendered from; writers bump the (player, source) version after commit
+SOURCES = ("matches", "metrics", "chapters", "similarity", "recommendations")
+PAGE_SOURCES = {
+    "matches": ("matches",),
+    "metrics": ("metrics",),
+    "timeseries": ("metrics", "chapters"),
+    "champions": ("metrics",),  # role averages drift with other players' games until the entry expires
+    "chapters": ("chapters",),
+    "similarity": ("similarity",),
+    "recommendations": ("recommendations",),
+    "year": ("chapters", "similarity", "recommendations"),
+}
+
+PLAYER_ID_KEY = "rift:page:player-id:{puuid}"
+VERSION_KEY = "rift:page:version:{source}:{player_id}"
+ENTRY_KEY = "rift:page:{page}:{player_id}:{digest}"
+
+
+def _versions(player_id: int, sources: Sequence[str]) -> Tuple[int, ...]:
+    keys = [VERSION_KEY.format(source=source, player_id=player_id) for source in sources]
+    found = cache.get_many(keys)
+    return tuple(found.get(key, 0) for key in keys)
+
+
+def source_version(player_id: int, source: str) -> int:
+    """Current version of one (player, source); part of any cache key derived from that data."""
+    return _versions(player_id, (source,))[0]
+
+
+def _player_id(puuid: str) -> Optional[int]:
+    """puuid -> league_players.id; ids never change, so the mapping is cached without expiry."""
+    key = PLAYER_ID_KEY.format(puuid=puuid)
+    player_id = cache.get(key)
+    if player_id is None:
+        with connection.cursor() as cursor:
+            player = get_player_by_puuid(cursor, puuid)
+        if player is None:
+            return None
+        player_id = player.id
+        cache.set(key, player_id, timeout=None)
+    return player_id
+
+
+def entry_key(page: str, player_id: int, request) -> str:
+    """Page + player + current source versions + everything that changes the rendered bytes."""
+    sources = PAGE_SOURCES[page]
+    variant = "|".join(
+        [
+            request.get_host(),
+            request.get_full_path(),
+            request.accepted_media_type or "",
+            ",".join(str(v) for v in _versions(player_id, sources)),
+        ]
+    )
+    digest = hashlib.blake2b(variant.encode(), digest_size=16).hexdigest()
+    return ENTRY_KEY.format(page=page, player_id=player_id, digest=digest)
+
+
+def etag_for(content: bytes) -> str:
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def _not_modified(request, etag: str) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    return header.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def _cached_response(request, etag: str, content_type: str, content: bytes) -> HttpResponse:
+    response = HttpResponseNotModified() if _not_modified(request, etag) else HttpResponse(content, content_type)
+    response["ETag"] = etag
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def _rendered(view, request, response, args, kwargs):
+    """Render a fresh 200 response; returns (response to send, cache entry)."""
+    response = view.finalize_response(request, response, *args, **kwargs)
+    response.render()
+    etag = etag_for(response.content)
+    entry = (etag, response["Content-Type"], response.content)
+    if _not_modified(request, etag):
+        response = HttpResponseNotModified()
+    response["ETag"] = etag
+    return response, entry
+
+
+def cached_player_page(page: str):
+    """
+    Cache a `get(self, request, puuid)` handler's fully rendered 200 response per player and
+    page, and answer If-None-Match with 304. Entries are never deleted: invalidate_player_pages()
+    bumps a version that is part of the key, so stale entries just stop being read and expire
+    after RIFT_PAGE_CACHE_TIMEOUT. Works on any Django cache backend (locmem, Redis), and on
+    `async def` handlers of AsyncAPIView.
+    """
+    if page not in PAGE_SOURCES:
+        raise ValueError(f"unknown page {page!r}; add it to PAGE_SOURCES")
+
+    def decorator(handler):
+        if iscoroutinefunction(handler):
+
+            @wraps(handler)
+            async def async_wrapper(view, request, puuid, *args, **kwargs):
+                player_id = await db_sync_to_async(_player_id)(puuid)
+                if player_id is None:
+                    return await handler(view, request, puuid, *args, **kwargs)
+                key = await sync_to_async(entry_key)(page, player_id, request)
+                hit = await cache.aget(key)
+                if hit is not None:
+                    return _cached_response(request, *hit)
+
+                response = await handler(view, request, puuid, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                response, entry = _rendered(view, request, response, args, kwargs)
+                await cache.aset(key, entry, settings.RIFT_PAGE_CACHE_TIMEOUT)
+                return response
+
+            return async_wrapper
+
+        @wraps(handler)
+        def wrapper(view, request, puuid, *args, **kwargs):
+            player_id = _player_id(puuid)
+            if player_id is None:
+                return handler(view, request, puuid, *args, **kwargs)
+            key = entry_key(page, player_id, request)
+            hit = cache.get(key)
+            if hit is not None:
+                return _cached_response(request, *hit)
+
+            response = handler(view, request, puuid, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response, entry = _rendered(view, request, response, args, kwargs)
+            cache.set(key, entry, settings.RIFT_PAGE_CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_player_pages(player_ids: Iterable[int], *sources: str):
+    """
+    Mark every cached page built from `sources` stale for these players. Runs after the
+    surrounding transaction commits (immediately outside one), so a reader can't re-cache the
+    old rows under the new version.
+    """
+    unknown = set(sources) - set(SOURCES)
+    if unknown:
+        raise ValueError(f"unknown page sources {sorted(unknown)}")
+    player_ids = set(player_ids)
+    if not player_ids or not sources:
+        return
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many(
+            {VERSION_KEY.format(source=s, player_id=pid): version for s in sources for pid in player_ids},
+            timeout=None,
+        )
+
+    transaction.on_commit(bump)
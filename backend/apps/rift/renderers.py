@@ -0,0 +1,67 @@
+import json
+import struct
+
+import numpy as np
+from rest_framework.renderers import BaseRenderer
+
+MAGIC = b"RTS1"
+
+
+class ColumnarBinaryRenderer(BaseRenderer):
+    """
+    Compact encoding for columnar payloads (?format=bin):
+
+        MAGIC "RTS1" | uint32 LE header length | header JSON (utf-8) | column buffers
+
+    The header holds every non-column field plus, per column, its name, dtype, byte offset
+    (from the start of the column buffers) and length. Floats are little-endian float32 with NaN
+    for missing values, integers little-endian int64. Buffers are 8-byte aligned.
+    Payloads without "columns" (errors) are rendered as plain JSON.
+    """
+
+    media_type = "application/x-rift-columns"
+    format = "bin"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or "columns" not in data:
+            return json.dumps(data).encode("utf-8")
+
+        header = {key: value for key, value in data.items() if key != "columns"}
+        header["columns"] = []
+        buffers = []
+        offset = 0
+        for name, column in data["columns"].items():
+            array = np.asarray(column)
+            if array.dtype.kind in "iub":
+                array = array.astype("<i8")
+            else:
+                array = array.astype("<f4")
+            raw = array.tobytes()
+            header["columns"].append(
+                {"name": name, "dtype": array.dtype.str, "offset": offset, "length": int(array.size)}
+            )
+            padding = -len(raw) % 8
+            buffers.append(raw + b"\0" * padding)
+            offset += len(raw) + padding
+
+        head = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        head += b" " * (-(len(MAGIC) + 4 + len(head)) % 8)
+        return b"".join([MAGIC, struct.pack("<I", len(head)), head, *buffers])
+
+
+def decode_columns(blob: bytes):
+    """Inverse of ColumnarBinaryRenderer.render (used by tests and python clients)."""
+    if blob[:4] != MAGIC:
+        raise ValueError("Not a columnar payload")
+    (head_len,) = struct.unpack_from("<I", blob, 4)
+    start = 8 + head_len
+    header = json.loads(blob[8:start])
+    columns = {}
+    for col in header.pop("columns"):
+        columns[col["name"]] = np.frombuffer(
+            blob, dtype=np.dtype(col["dtype"]), count=col["length"], offset=start + col["offset"]
+        )
+    header["columns"] = columns
+    return header
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+
+from rest_framework import serializers
+
+
+def _current_season() -> int:
+    return datetime.now(timezone.utc).year
+
+
+class TimeSeriesQuerySerializer(serializers.Serializer):
+    season = serializers.IntegerField(min_value=2010, max_value=2100, default=_current_season)
+    points = serializers.IntegerField(min_value=3, max_value=2000, default=300)
+    mode = serializers.ChoiceField(choices=("lttb", "mean"), default="lttb")
+    window = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class YearQuerySerializer(serializers.Serializer):
+    season = serializers.IntegerField(min_value=2010, max_value=2100, default=_current_season)
+
+
+class ChampionStatsQuerySerializer(serializers.Serializer):
+    season = serializers.IntegerField(min_value=2010, max_value=2100, default=_current_season)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class PipelineJobRequestSerializer(serializers.Serializer):
+    season = serializers.IntegerField(min_value=2010, max_value=2100, default=_current_season)
@@ -0,0 +1,206 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from apps.rift.services.champions import get_champion_catalog
+from apps.rift.services.chapters import season_bounds
+
+PLAYER_TABLE = "league_player_champion_stats"
+ROLE_TABLE = "league_role_champion_stats"
+KEYS = {
+    PLAYER_TABLE: ("player_id", "season", "role", "champion_id"),
+    ROLE_TABLE: ("season", "role", "champion_id"),
+}
+
+# Season of a metrics row: calendar year (UTC) of match_recorded_at, as season_bounds()
+SEASON = "EXTRACT(YEAR FROM to_timestamp(match_recorded_at / 1000.0) AT TIME ZONE 'UTC')::int"
+_KEY_SELECT = {"player_id": "player_id", "season": SEASON, "role": "COALESCE(role, '')", "champion_id": "champion_id"}
+
+_PER_MIN = "* 60.0 / NULLIF(game_duration, 0)"
+_LONG = "game_duration >= 1800"
+
+# Running totals kept as is (NOT NULL columns)
+COUNTERS = {
+    "games": "COUNT(*)",
+    "wins": "COUNT(*) FILTER (WHERE win)",
+    "kills": "SUM(kills)",
+    "deaths": "SUM(deaths)",
+    "assists": "SUM(assists)",
+}
+# measure -> per-game SQL expression. The rollups keep <measure>_sum and <measure>_n (games where
+# it is not NULL), so average() reproduces AVG() over the underlying rows exactly.
+MEASURES = {
+    "kda": "kda_ratio",
+    "cs_per_min": "cs_per_min",
+    "gold_per_min": "gold_per_min",
+    "damage_per_min": "damage_per_min",
+    "kill_participation": "kill_participation",
+    "vision_score_per_min": "vision_score_per_min",
+    "kills_per_min": f"kills {_PER_MIN}",
+    "assists_per_min": f"assists {_PER_MIN}",
+    "wards_placed_per_min": f"wards_placed {_PER_MIN}",
+    "wards_killed_per_min": f"wards_killed {_PER_MIN}",
+    "first_blood": "(first_blood OR first_blood_assist)::int",
+    "first_tower": "(first_tower OR first_tower_assist)::int",
+    "objective_takedowns": (
+        "COALESCE((objective_contribution->>'dragon_kills')::float, 0)"
+        " + COALESCE((objective_contribution->>'baron_kills')::float, 0)"
+        " + COALESCE((objective_contribution->>'turret_takedowns')::float, 0)"
+    ),
+    "objective_damage_per_min": f"(objective_contribution->>'damage_to_objectives')::float {_PER_MIN}",
+    "kda_long": f"CASE WHEN {_LONG} THEN kda_ratio END",
+    "kda_short": f"CASE WHEN NOT ({_LONG}) THEN kda_ratio END",
+    "win_long": f"CASE WHEN {_LONG} THEN win::int END",
+    "win_short": f"CASE WHEN NOT ({_LONG}) THEN win::int END",
+}
+STAT_COLUMNS = (
+    ("champion_name",)
+    + tuple(COUNTERS)
+    + tuple(f"{measure}_{part}" for measure in MEASURES for part in ("sum", "n"))
+)
+
+# Champion card fields returned by load_player_champions (averages over the season)
+CARD_MEASURES = ("kda", "cs_per_min", "gold_per_min", "damage_per_min", "kill_participation", "vision_score_per_min")
+
+
+def average(measure: str) -> str:
+    """SQL for the mean of a measure over the summed rollup rows (NULL when no game had it)."""
+    return f"SUM({measure}_sum) / NULLIF(SUM({measure}_n), 0)"
+
+
+def _aggregate_select() -> str:
+    parts = ["MAX(champion_name)"] + list(COUNTERS.values())
+    for expression in MEASURES.values():
+        parts += [f"COALESCE(SUM({expression}), 0)", f"COUNT({expression})"]
+    return ", ".join(parts)
+
+
+def _rollup_select() -> str:
+    # the role table is the player table's rows summed over players
+    parts = ["MAX(champion_name)"] + [f"SUM({name})" for name in STAT_COLUMNS[1:]]
+    return ", ".join(parts)
+
+
+def _upsert(table: str, select: str) -> str:
+    keys = KEYS[table]
+    updates = ["champion_name = EXCLUDED.champion_name"] + [
+        f"{name} = t.{name} + EXCLUDED.{name}" for name in STAT_COLUMNS[1:]
+    ]
+    # key order, so concurrent writers lock shared (season, role, champion) rows in the same order
+    return f"""
+        INSERT INTO {table} AS t ({", ".join(keys)}, {", ".join(STAT_COLUMNS)})
+        {select}
+        ORDER BY {", ".join(keys)}
+        ON CONFLICT ({", ".join(keys)}) DO UPDATE SET {", ".join(updates)}, updated_at = NOW()
+    """
+
+
+def rollup_sql(where: str) -> str:
+    """
+    One statement adding the metrics rows matching `where` to both rollups: the rows are
+    grouped per (player, season, role, champion) once, the player table takes those groups and
+    the role table their sums over players (games without a role are left out of it).
+    """
+    player_keys = KEYS[PLAYER_TABLE]
+    role_keys = KEYS[ROLE_TABLE]
+    delta = f"""
+        SELECT {", ".join(f"{_KEY_SELECT[key]} AS {key}" for key in player_keys)},
+               {_aggregate_select()}
+        FROM league_player_match_metrics
+        WHERE {where}
+        GROUP BY {", ".join(str(i) for i in range(1, len(player_keys) + 1))}
+    """
+    player_select = f"SELECT {', '.join(player_keys)}, {', '.join(STAT_COLUMNS)} FROM delta"
+    role_select = (
+        f"SELECT {', '.join(role_keys)}, {_rollup_select()} FROM delta WHERE role <> '' "
+        f"GROUP BY {', '.join(role_keys)}"
+    )
+    return f"""
+        WITH delta ({", ".join(player_keys)}, {", ".join(STAT_COLUMNS)}) AS ({delta}),
+        player_rows AS ({_upsert(PLAYER_TABLE, player_select)})
+        {_upsert(ROLE_TABLE, role_select)}
+    """
+
+
+def add_metrics(cursor, metric_ids: Sequence[int]):
+    """
+    Fold freshly inserted league_player_match_metrics rows into the rollups. Call it in the
+    transaction that inserted them, so the rollups commit (or roll back) with the rows.
+    """
+    if metric_ids:
+        cursor.execute(rollup_sql("id = ANY(%s)"), (list(metric_ids),))
+
+
+def rebuild(cursor, season: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Recompute the rollups (one season's rows, or everything) from league_player_match_metrics
+    in one set-based statement. Locks both tables first, so metrics committed concurrently are
+    either in the scan or added on top once this commits, never both or neither.
+    Returns the (player, role) rollup row counts.
+    """
+    if season is None:
+        cursor.execute(f"TRUNCATE {PLAYER_TABLE}, {ROLE_TABLE}")
+        cursor.execute(rollup_sql("TRUE"))
+        scope, params = "", ()
+    else:
+        start, end = season_bounds(season)
+        cursor.execute(f"LOCK TABLE {PLAYER_TABLE}, {ROLE_TABLE} IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(f"DELETE FROM {PLAYER_TABLE} WHERE season = %s", (season,))
+        cursor.execute(f"DELETE FROM {ROLE_TABLE} WHERE season = %s", (season,))
+        cursor.execute(rollup_sql("match_recorded_at >= %s AND match_recorded_at < %s"), (start, end))
+        scope, params = "WHERE season = %s", (season,)
+    cursor.execute(
+        f"SELECT (SELECT COUNT(*) FROM {PLAYER_TABLE} {scope}), (SELECT COUNT(*) FROM {ROLE_TABLE} {scope})",
+        params * 2,
+    )
+    return cursor.fetchone()
+
+
+def load_player_champions(cursor, player_id: int, season: int, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    The player's most played champions in the season: games, wins and averages, next to the
+    same averages over everyone on that champion in the player's usual role for it.
+    """
+    mine = ", ".join(f"{average(m)} AS {m}" for m in CARD_MEASURES)
+    baseline = ", ".join(f"r.{m}_sum / NULLIF(r.{m}_n, 0)" for m in CARD_MEASURES)
+    cursor.execute(
+        f"""
+        WITH mine AS (
+            SELECT champion_id, MAX(champion_name) AS champion_name, SUM(games) AS games, SUM(wins) AS wins,
+                   (ARRAY_AGG(role ORDER BY games DESC, role))[1] AS role, {mine}
+            FROM {PLAYER_TABLE}
+            WHERE player_id = %s AND season = %s
+            GROUP BY champion_id
+        )
+        SELECT m.champion_id, m.champion_name, NULLIF(m.role, ''), m.games, m.wins,
+               {", ".join(f"m.{measure}" for measure in CARD_MEASURES)},
+               r.games, r.wins, {baseline}
+        FROM mine m
+        LEFT JOIN {ROLE_TABLE} r ON r.season = %s AND r.role = m.role AND r.champion_id = m.champion_id
+        ORDER BY m.games DESC, m.champion_id
+        LIMIT %s
+        """,
+        (player_id, season, season, limit),
+    )
+    catalog = get_champion_catalog()
+    width = len(CARD_MEASURES)
+    cards = []
+    for row in cursor.fetchall():
+        champion_id, name, role, games, wins = row[:5]
+        role_games, role_wins = row[5 + width:7 + width]
+        cards.append(
+            {
+                "champion_id": champion_id,
+                "champion_name": catalog.name(champion_id, name),
+                "champion_icon_url": catalog.image_url(champion_id),
+                "role": role,
+                "games": games,
+                "wins": wins,
+                "win_rate": wins / games,
+                **dict(zip(CARD_MEASURES, row[5:5 + width])),
+                "role_average": None if role_games is None else {
+                    "games": role_games,
+                    "win_rate": role_wins / role_games,
+                    **dict(zip(CARD_MEASURES, row[7 + width:])),
+                },
+            }
+        )
+    return cards
@@ -0,0 +1,105 @@
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from django.db import connection
+
+from common.models.champion import Champion
+
+# How often a worker asks league_champion_catalog_version whether the seed moved on
+CHECK_INTERVAL = 60.0         # seconds
+
+_lock = threading.Lock()
+_catalog: Optional["ChampionCatalog"] = None
+_checked_at = 0.0
+
+
+class ChampionCatalog:
+    """
+    Immutable snapshot of league_champions. Lookups by champion_id index a tuple directly
+    (ids are small integers); lookups by champion_key go through a read-only mapping.
+    A refresh builds a new catalog and swaps the module reference, so readers never see a
+    half-loaded one.
+    """
+
+    __slots__ = ("version", "_by_id", "_by_key")
+
+    def __init__(self, champions: Sequence[Champion], version: Optional[Tuple] = None):
+        size = max((c.champion_id for c in champions), default=-1) + 1
+        by_id = [None] * size
+        for champion in champions:
+            by_id[champion.champion_id] = champion
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "_by_id", tuple(by_id))
+        object.__setattr__(self, "_by_key", MappingProxyType({c.champion_key: c for c in champions}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ChampionCatalog is immutable")
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def get(self, champion_id: int) -> Optional[Champion]:
+        if 0 <= champion_id < len(self._by_id):
+            return self._by_id[champion_id]
+        return None
+
+    def by_key(self, champion_key: str) -> Optional[Champion]:
+        return self._by_key.get(champion_key)
+
+    def name(self, champion_id: int, default: Optional[str] = None) -> Optional[str]:
+        champion = self.get(champion_id)
+        return champion.name if champion else default
+
+    def image_url(self, champion_id: int) -> Optional[str]:
+        champion = self.get(champion_id)
+        return champion.image_url if champion else None
+
+    def icons(self, champion_ids: Iterable[int]) -> Dict[int, str]:
+        out = {}
+        for champion_id in champion_ids:
+            url = self.image_url(int(champion_id))
+            if url is not None:
+                out[int(champion_id)] = url
+        return out
+
+
+def load_catalog_version(cursor) -> Optional[Tuple]:
+    cursor.execute("SELECT version, updated_at FROM league_champion_catalog_version WHERE id = 1")
+    row = cursor.fetchone()
+    return tuple(row) if row else None
+
+
+def load_champion_catalog(cursor) -> ChampionCatalog:
+    # version first: a seed committing in between only makes the snapshot look older than it is
+    version = load_catalog_version(cursor)
+    cursor.execute("SELECT id, champion_id, champion_key, name, title, image_url FROM league_champions")
+    return ChampionCatalog(Champion.from_rows(cursor.fetchall()), version)
+
+
+def get_champion_catalog() -> ChampionCatalog:
+    """
+    The process-wide catalog. Loaded on first use; afterwards at most one single-row version
+    query per CHECK_INTERVAL decides whether to reload, so requests normally touch no table.
+    """
+    global _catalog, _checked_at
+    catalog = _catalog
+    if catalog is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+        return catalog
+    with _lock:
+        if _catalog is not None and time.monotonic() - _checked_at < CHECK_INTERVAL:
+            return _catalog
+        with connection.cursor() as cursor:
+            if _catalog is None or load_catalog_version(cursor) != _catalog.version:
+                _catalog = load_champion_catalog(cursor)
+        _checked_at = time.monotonic()
+        return _catalog
+
+
+def reset_champion_catalog():
+    """Drop the cached snapshot (tests, or right after seeding in this process)."""
+    global _catalog, _checked_at
+    with _lock:
+        _catalog = None
+        _checked_at = 0.0
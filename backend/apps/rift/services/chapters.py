@@ -0,0 +1,170 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from psycopg2.extras import Json, execute_values
+
+from apps.rift.page_cache import invalidate_player_pages, source_version
+from apps.rift.services.champions import get_champion_catalog
+from common.analysis.binseg import MAX_SEGMENTS
+from common.analysis.chapter_aggregates import aggregate_chapters, segment_season
+from common.analysis.season_columns import SeasonColumns, select_columns
+from common.models.player_chapter import PlayerChapter
+
+CHAPTER_COLUMNS = (
+    "player_id", "chapter_index", "season", "start_date", "end_date", "start_game_idx", "end_game_idx",
+    "title", "summary", "top_champion_id", "top_champion_name", "top_champion_icon_url", "top_champion_games",
+    "games_count", "win_rate", "kda_score", "cs_score", "damage_score", "vision_score", "raw_metrics",
+)
+# Per-game columns chapters and the season charts need (champion id/name always come along)
+SEASON_FIELDS = (
+    "match_id", "match_recorded_at", "win", "kills", "deaths", "assists", "kda_ratio",
+    "cs_per_min", "damage_per_min", "vision_score_per_min",
+)
+SEASON_KEY = "rift:season:{player_id}:{season}:{version}"
+
+
+def season_bounds(season: int) -> Tuple[int, int]:
+    """[start, end) of a season in epoch ms (calendar year, UTC)."""
+    start = datetime(season, 1, 1, tzinfo=timezone.utc)
+    end = datetime(season + 1, 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def load_season(cursor, player_id: int, season: int, from_ms: Optional[int] = None) -> SeasonColumns:
+    start, end = season_bounds(season)
+    if from_ms is not None:
+        start = max(start, from_ms)
+    # range scan on ix_metrics_player_ts
+    cursor.execute(
+        f"""
+        SELECT {select_columns(SEASON_FIELDS)}
+        FROM league_player_match_metrics
+        WHERE player_id = %s AND match_recorded_at >= %s AND match_recorded_at < %s
+        ORDER BY match_recorded_at, match_id
+        """,
+        (player_id, start, end),
+    )
+    return SeasonColumns.from_cursor(cursor, SEASON_FIELDS)
+
+
+def cached_season(cursor, player_id: int, season: int) -> SeasonColumns:
+    """
+    load_season() through the cache, stored as one SeasonColumns blob. The key carries the
+    player's "metrics" page-cache version, so newly written metrics miss it.
+    """
+    version = source_version(player_id, "metrics")
+    key = SEASON_KEY.format(player_id=player_id, season=season, version=version)
+    blob = cache.get(key)
+    if blob is not None:
+        return SeasonColumns.from_bytes(blob)
+    games = load_season(cursor, player_id, season)
+    cache.set(key, games.to_bytes(), settings.RIFT_PAGE_CACHE_TIMEOUT)
+    return games
+
+
+def recorded_at(games: SeasonColumns) -> Dict[int, int]:
+    """league_matches id -> match_recorded_at of the season's games (the links' partition key)."""
+    return dict(zip(games["match_id"].tolist(), games["match_recorded_at"].tolist()))
+
+
+def write_chapters(
+    cursor,
+    player_id: int,
+    season: int,
+    chapters: Sequence[Tuple[PlayerChapter, List[int]]],
+    match_recorded_at: Mapping[int, int],
+    from_index: int = 1,
+) -> List[PlayerChapter]:
+    """
+    Replace the player's chapters (chapter_index >= from_index) for the season together with their
+    league_playerchapter_matches links; match_recorded_at maps every linked match id to its
+    timestamp (recorded_at()). Call inside transaction.atomic().
+    """
+    cursor.execute(
+        "DELETE FROM league_player_chapters WHERE player_id = %s AND season = %s AND chapter_index >= %s",
+        (player_id, season, from_index),
+    )
+    invalidate_player_pages([player_id], "chapters")
+    if not chapters:
+        return []
+    rows = []
+    for chapter, _ in chapters:
+        row = [getattr(chapter, name) for name in CHAPTER_COLUMNS]
+        row[-1] = Json(chapter.raw_metrics) if chapter.raw_metrics is not None else None
+        rows.append(row)
+    returned = execute_values(
+        cursor,
+        f"""
+        INSERT INTO league_player_chapters ({", ".join(CHAPTER_COLUMNS)})
+        VALUES %s
+        RETURNING chapter_index, id
+        """,
+        rows,
+        fetch=True,
+    )
+    ids = dict(returned)
+    links = []
+    for chapter, match_ids in chapters:
+        chapter.id = ids[chapter.chapter_index]
+        links.extend((chapter.id, match_id, match_recorded_at[match_id]) for match_id in match_ids)
+    execute_values(
+        cursor,
+        "INSERT INTO league_playerchapter_matches (chapter_id, match_id, match_recorded_at) VALUES %s",
+        links,
+        page_size=1000,
+    )
+    return [chapter for chapter, _ in chapters]
+
+
+def rebuild_chapters(player_id: int, season: int) -> List[PlayerChapter]:
+    """Segment the whole season and rewrite every chapter of it."""
+    with connection.cursor() as cursor:
+        games = cached_season(cursor, player_id, season)
+        breaks = segment_season(games)
+        icons = get_champion_catalog().icons(set(games["champion_id"].tolist()))
+    chapters = aggregate_chapters(games, breaks, player_id, season, icons=icons)
+    with transaction.atomic(), connection.cursor() as cursor:
+        return write_chapters(cursor, player_id, season, chapters, recorded_at(games))
+
+
+def refresh_last_chapter(player_id: int, season: int) -> List[PlayerChapter]:
+    """
+    New games arrived: earlier chapters are final, so only the last chapter plus the new games
+    are re-derived. The tail may split into more chapters while the season stays <= MAX_SEGMENTS.
+    Returns the rewritten chapters.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.id, c.chapter_index, c.start_game_idx
+            FROM league_player_chapters c
+            WHERE c.player_id = %s AND c.season = %s
+            ORDER BY c.chapter_index DESC
+            LIMIT 1
+            """,
+            (player_id, season),
+        )
+        last = cursor.fetchone()
+        if last is None:
+            return rebuild_chapters(player_id, season)
+        chapter_id, chapter_index, start_game_idx = last
+        cursor.execute(
+            "SELECT MIN(match_recorded_at) FROM league_playerchapter_matches WHERE chapter_id = %s",
+            (chapter_id,),
+        )
+        from_ms = cursor.fetchone()[0]
+        if from_ms is None:
+            return rebuild_chapters(player_id, season)
+        tail = load_season(cursor, player_id, season, from_ms=from_ms)
+        icons = get_champion_catalog().icons(set(tail["champion_id"].tolist()))
+
+    breaks = segment_season(tail, min_segments=1, max_segments=MAX_SEGMENTS - chapter_index + 1)
+    chapters = aggregate_chapters(
+        tail, breaks, player_id, season,
+        chapter_offset=chapter_index - 1, game_offset=start_game_idx - 1, icons=icons,
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        return write_chapters(cursor, player_id, season, chapters, recorded_at(tail), from_index=chapter_index)
@@ -0,0 +1,17 @@
+from dataclasses import fields
+from typing import Any, Dict, List, Sequence
+
+from common.models.player_match_metrics import PlayerMatchMetrics
+
+# Keyset-paginated per-player lists: table, selected columns and the timestamp the pages walk
+MATCH_TABLE = "league_matches"
+MATCH_COLUMNS = ("id", "match_id", "match_timestamp", "is_processed")  # raw_data stays out of lists
+MATCH_TIMESTAMP = "match_timestamp"
+
+METRICS_TABLE = "league_player_match_metrics"
+METRICS_COLUMNS = tuple(f.name for f in fields(PlayerMatchMetrics))
+METRICS_TIMESTAMP = "match_recorded_at"
+
+
+def rows_to_dicts(columns: Sequence[str], rows: Sequence[tuple]) -> List[Dict[str, Any]]:
+    return [dict(zip(columns, row)) for row in rows]
@@ -0,0 +1,178 @@
+import json
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from django.db import connection, transaction
+from psycopg2.extras import Json
+
+from apps.rift.page_cache import invalidate_player_pages
+from apps.rift.services.matches import (
+    bulk_load_matches,
+    latest_match_timestamp,
+    match_from_riot,
+    stored_match_timestamps,
+)
+from common.lambda_call.fetch_matches import (
+    fetch_match_ids_via_lambda,
+    iter_matches_by_ids_via_lambda,
+)
+from common.models.match import Match
+from common.models.match_sync_state import MatchSyncState
+from common.models.player import Player
+
+# Max match ids listed per Lambda invoke (one page) and bodies requested per invoke
+MAX_LISTED = 1000
+BODY_BATCH_SIZE = 100
+INSERT_BATCH_SIZE = 500
+# Syncs an id's body may fail to come back (deleted or 404 at Riot) before it stops holding the watermark
+MAX_BODY_MISSES = 3
+
+
+@dataclass
+class SyncReport:
+    player_id: int
+    listed: int = 0                      # ids returned by the Lambda after the watermark
+    pages: int = 0                       # listing invokes (a full page is followed by an older one)
+    fetched: int = 0                     # bodies fetched and stored
+    skipped: int = 0                     # ids already in league_matches (bodies never fetched)
+    missed: int = 0                      # bodies requested but not returned (retried next sync)
+    given_up: int = 0                    # ids not requested any more after MAX_BODY_MISSES misses
+    complete: bool = True                # every match after the watermark is stored (else it stays put)
+    watermark_before: int = 0
+    watermark_after: int = 0
+
+
+def get_sync_state(cursor, player_id: int) -> MatchSyncState:
+    cursor.execute(
+        """
+        SELECT last_match_timestamp, last_match_id, last_synced_at, body_misses
+        FROM league_match_sync_state WHERE player_id = %s
+        """,
+        (player_id,),
+    )
+    row = cursor.fetchone()
+    if row:
+        state = MatchSyncState(player_id, *row)
+        if isinstance(state.body_misses, str):  # Django leaves jsonb undecoded
+            state.body_misses = json.loads(state.body_misses)
+        return state
+    # first sync after matches were loaded some other way: start from what is stored
+    return MatchSyncState(player_id, latest_match_timestamp(cursor, player_id) or 0)
+
+
+def save_sync_state(cursor, state: MatchSyncState):
+    cursor.execute(
+        """
+        INSERT INTO league_match_sync_state (player_id, last_match_timestamp, last_match_id, last_synced_at,
+                                             body_misses)
+        VALUES (%s, %s, %s, NOW(), %s)
+        ON CONFLICT (player_id) DO UPDATE
+        SET last_match_timestamp = GREATEST(league_match_sync_state.last_match_timestamp,
+                                            EXCLUDED.last_match_timestamp),
+            last_match_id = COALESCE(EXCLUDED.last_match_id, league_match_sync_state.last_match_id),
+            last_synced_at = NOW(),
+            body_misses = EXCLUDED.body_misses
+        """,
+        (state.player_id, state.last_match_timestamp, state.last_match_id, Json(state.body_misses)),
+    )
+
+
+def _batches(items: List[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def sync_player_matches(player: Player, year: int, role: str = "AUTO", max_listed: int = MAX_LISTED) -> SyncReport:
+    """
+    Incremental sync of one player's matches into league_matches.
+    1) read the player's high-water mark
+    2) list the match ids played at/after it, newest first, max_listed per page; a full page is
+       followed by one ending at its oldest match, until a page comes back short
+    3) drop ids already stored, fetch bodies for the rest and store them
+    4) advance the watermark to the newest listed match once every page was read and every body
+       came back, except ids given up on after MAX_BODY_MISSES syncs
+    """
+    riot_id = f"{player.game_name}#{player.tag_line}"
+
+    with connection.cursor() as cursor:
+        state = get_sync_state(cursor, player.id)
+    report = SyncReport(player_id=player.id, watermark_before=state.last_match_timestamp)
+
+    # watermark is in ms, Riot's startTime/endTime in s; boundary seconds are re-listed and deduped
+    start_time = state.last_match_timestamp // 1000 if state.last_match_timestamp else None
+    end_time: Optional[int] = None
+    seen: Set[str] = set()
+    newest: Optional[Tuple[int, str]] = None
+    while True:
+        page = fetch_match_ids_via_lambda(
+            riot_id, player.region, year, role, max_listed, start_time=start_time, end_time=end_time
+        )
+        report.pages += 1
+        fresh = [match_id for match_id in page if match_id not in seen]
+        seen.update(fresh)
+        report.listed += len(fresh)
+
+        with connection.cursor() as cursor:
+            timestamps = stored_match_timestamps(cursor, fresh)
+        report.skipped += len(timestamps)
+        missing = [match_id for match_id in fresh if match_id not in timestamps]
+        wanted = [match_id for match_id in missing if state.body_misses.get(match_id, 0) < MAX_BODY_MISSES]
+        report.given_up += len(missing) - len(wanted)
+        timestamps.update(_fetch_bodies(player, riot_id, year, role, wanted, report))
+        for match_id in wanted:
+            if match_id in timestamps:
+                state.body_misses.pop(match_id, None)
+            else:
+                state.body_misses[match_id] = state.body_misses.get(match_id, 0) + 1
+                report.missed += 1
+
+        if timestamps:
+            page_newest = max((ts, match_id) for match_id, ts in timestamps.items())
+            newest = page_newest if newest is None else max(newest, page_newest)
+        if len(page) < max_listed or not fresh:
+            break
+        if not timestamps:
+            # nothing on the full page has a known timestamp to page back from; the next sync retries
+            report.complete = False
+            break
+        end_time = min(timestamps.values()) // 1000
+
+    # a missed body is an id that is never listed again once the watermark moves past it
+    report.complete = report.complete and not report.missed
+    if report.complete:
+        state.body_misses = {}  # only ids given up on are left, and the watermark leaves them behind
+        if newest is not None and newest[0] > state.last_match_timestamp:
+            state.last_match_timestamp, state.last_match_id = newest
+    with transaction.atomic(), connection.cursor() as cursor:
+        save_sync_state(cursor, state)
+
+    report.watermark_after = state.last_match_timestamp
+    return report
+
+
+def _fetch_bodies(
+    player: Player, riot_id: str, year: int, role: str, match_ids: List[str], report: SyncReport
+) -> Dict[str, int]:
+    """Fetch and store the bodies of match_ids. Returns match id -> match_timestamp of those that came back."""
+    received: Dict[str, int] = {}
+    for batch in _batches(match_ids, BODY_BATCH_SIZE):
+        pending: List[Match] = []
+        for raw in iter_matches_by_ids_via_lambda(riot_id, player.region, year, role, batch):
+            match = match_from_riot(raw, player.id, player.puuid)
+            received[match.match_id] = match.match_timestamp
+            pending.append(match)
+            if len(pending) >= INSERT_BATCH_SIZE:
+                report.fetched += _store(pending)
+                pending = []
+        report.fetched += _store(pending)
+    return received
+
+
+def _store(matches: List[Match]) -> int:
+    if not matches:
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        inserted = bulk_load_matches(cursor, matches).inserted
+        if inserted:
+            invalidate_player_pages({match.player_id for match in matches}, "matches")
+        return inserted
@@ -0,0 +1,271 @@
+import io
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from psycopg2.extras import execute_values
+
+from common.analysis.match_document import SLICE_COLUMNS, compress_document, decompress_document, split_document
+from common.models.match import Match
+
+
+# COPY text format: backslash, tab and newlines must be escaped in every field
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+STAGING_TABLE = "_staging_league_matches"
+# league_matches columns written by bulk_load_matches, in COPY order
+LOAD_COLUMNS = ("match_id", "player_id", "raw_data", "match_timestamp", "is_processed", *SLICE_COLUMNS, "raw_zlib")
+
+
+@dataclass
+class LoadReport:
+    staged: int = 0
+    inserted: int = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.staged - self.inserted
+
+
+def match_from_riot(raw: Dict[str, Any], player_id: int, puuid: Optional[str] = None) -> Match:
+    """
+    Riot match-v5 document -> Match (league_matches row, not yet stored). Stored split when
+    RIFT_MATCH_STORAGE is "split" and the player's puuid is known, whole otherwise.
+    """
+    split = puuid is not None and settings.RIFT_MATCH_STORAGE == "split"
+    return Match.from_riot(raw, player_id, puuid if split else None)
+
+
+def latest_match_timestamp(cursor, player_id: int) -> Optional[int]:
+    # served by ix_matches_player_ts (player_id, match_timestamp DESC)
+    cursor.execute(
+        """
+        SELECT match_timestamp FROM league_matches
+        WHERE player_id = %s
+        ORDER BY match_timestamp DESC
+        LIMIT 1
+        """,
+        (player_id,),
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def stored_match_timestamps(cursor, match_ids: Sequence[str]) -> Dict[str, int]:
+    """match id -> match_timestamp of the given ids that are stored in league_matches."""
+    if not match_ids:
+        return {}
+    # the registry gives each id's partition key, so every lookup probes one partition
+    cursor.execute(
+        """
+        SELECT r.match_id, r.match_timestamp
+        FROM league_match_ids r
+        JOIN league_matches m ON m.match_id = r.match_id AND m.match_timestamp = r.match_timestamp
+        WHERE r.match_id = ANY(%s)
+        """,
+        (list(match_ids),),
+    )
+    return dict(cursor.fetchall())
+
+
+class _LineReader(io.TextIOBase):
+    """Read-only text file over an iterator of lines, so COPY pulls rows lazily."""
+
+    def __init__(self, lines: Iterator[str]):
+        self._lines = lines
+        self._buf = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buf]
+        length = len(self._buf)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        if size < 0:
+            self._buf = ""
+            return data
+        self._buf = data[size:]
+        return data[:size]
+
+
+def _json_field(value) -> str:
+    if value is None:
+        return "\\N"
+    return json.dumps(value, separators=(",", ":")).translate(_COPY_ESCAPES)
+
+
+def _copy_lines(matches: Iterable[Match], report: LoadReport) -> Iterator[str]:
+    for m in matches:
+        report.staged += 1
+        if m.is_split:
+            document = "\\N"
+            slices = [_json_field(m.game_info), _json_field(m.participant), _json_field(m.teams)]
+            # bytea hex input; the backslash itself is escaped for COPY
+            blob = "\\\\x" + compress_document(m.raw_data).hex()
+        else:
+            document = _json_field(m.raw_data)
+            slices = ["\\N"] * len(SLICE_COLUMNS)
+            blob = "\\N"
+        yield "\t".join(
+            [
+                m.match_id.translate(_COPY_ESCAPES),
+                str(m.player_id),
+                document,
+                str(m.match_timestamp),
+                "t" if m.is_processed else "f",
+                *slices,
+                blob,
+            ]
+        ) + "\n"
+
+
+def bulk_load_matches(
+    cursor, matches: Iterable[Match], table: str = "league_matches", id_table: str = "league_match_ids"
+) -> LoadReport:
+    """
+    Season-scale ingestion: stream matches into a session temp table with COPY, register new
+    match ids in `id_table`, then merge into `table` with one INSERT ... ON CONFLICT
+    (match_id, match_timestamp) DO NOTHING. Every row is stored under its registered timestamp,
+    so a refetched document with a different (or missing) gameCreation still dedupes.
+    Split matches (Match.is_split) are written as their slices plus the compressed document
+    in raw_zlib, others whole in raw_data.
+    Must run inside a transaction (staging rows are cleared on commit).
+    """
+    report = LoadReport()
+    columns = ", ".join(LOAD_COLUMNS)
+    cursor.execute(
+        f"""
+        CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+          match_id        VARCHAR(100) NOT NULL,
+          player_id       BIGINT       NOT NULL,
+          raw_data        JSONB        NULL,
+          match_timestamp BIGINT       NOT NULL,
+          is_processed    BOOLEAN      NOT NULL,
+          game_info       JSONB        NULL,
+          participant     JSONB        NULL,
+          teams           JSONB        NULL,
+          raw_zlib        BYTEA        NULL
+        ) ON COMMIT DELETE ROWS
+        """
+    )
+    cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+    cursor.copy_expert(
+        f"COPY {STAGING_TABLE} ({columns}) FROM STDIN",
+        _LineReader(_copy_lines(matches, report)),
+    )
+    if not report.staged:
+        return report
+    # its own statement, so the merge sees the timestamps a concurrent load of the same ids registered
+    cursor.execute(
+        f"""
+        INSERT INTO {id_table} (match_id, match_timestamp)
+        SELECT DISTINCT ON (match_id) match_id, match_timestamp
+        FROM {STAGING_TABLE}
+        ORDER BY match_id
+        ON CONFLICT (match_id) DO NOTHING
+        """
+    )
+    selected = ", ".join("r.match_timestamp" if name == "match_timestamp" else f"s.{name}" for name in LOAD_COLUMNS)
+    cursor.execute(
+        f"""
+        INSERT INTO {table} ({columns})
+        SELECT DISTINCT ON (s.match_id) {selected}
+        FROM {STAGING_TABLE} s
+        JOIN {id_table} r ON r.match_id = s.match_id
+        ORDER BY s.match_id
+        ON CONFLICT (match_id, match_timestamp) DO NOTHING
+        """
+    )
+    report.inserted = cursor.rowcount
+    return report
+
+
+def load_raw_documents(cursor, match_pks: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """Full documents by league_matches.id, whichever way each row is stored (the cold path)."""
+    cursor.execute(
+        "SELECT id, raw_data::text, raw_zlib FROM league_matches WHERE id = ANY(%s)",
+        (list(match_pks),),
+    )
+    return {
+        pk: decompress_document(bytes(blob)) if blob is not None else json.loads(raw)
+        for pk, raw, blob in cursor.fetchall()
+    }
+
+
+@dataclass
+class CompactionReport:
+    matches: int = 0                  # rows rewritten from raw_data to slices + raw_zlib
+    bytes_before: int = 0             # pg_total_relation_size(league_matches)
+    bytes_after: int = 0
+
+
+def relation_size(cursor, table: str = "league_matches") -> int:
+    """Heap + TOAST + indexes, in bytes."""
+    cursor.execute("SELECT pg_total_relation_size(%s::regclass)", (table,))
+    return cursor.fetchone()[0]
+
+
+def compact_batch(cursor, after_id: int, limit: int) -> Tuple[int, int]:
+    """Split the next `limit` whole rows after id `after_id`. Returns (rows, last id)."""
+    cursor.execute(
+        """
+        SELECT m.id, p.puuid, m.raw_data::text
+        FROM league_matches m
+        JOIN league_players p ON p.id = m.player_id
+        WHERE m.raw_data IS NOT NULL AND m.id > %s
+        ORDER BY m.id
+        LIMIT %s
+        """,
+        (after_id, limit),
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        return 0, after_id
+    values: List[tuple] = []
+    for pk, puuid, text in rows:
+        raw = json.loads(text)
+        slices = [json.dumps(part, separators=(",", ":")) for part in split_document(raw, puuid)]
+        values.append((pk, *slices, compress_document(raw)))
+    execute_values(
+        cursor,
+        f"""
+        UPDATE league_matches m
+        SET game_info = v.game_info::jsonb, participant = v.participant::jsonb, teams = v.teams::jsonb,
+            raw_zlib = v.raw_zlib, raw_data = NULL
+        FROM (VALUES %s) AS v (id, {", ".join(SLICE_COLUMNS)}, raw_zlib)
+        WHERE m.id = v.id
+        """,
+        values,
+        page_size=len(values),
+    )
+    return len(rows), rows[-1][0]
+
+
+def compact_matches(batch_size: int = 500, limit: Optional[int] = None) -> CompactionReport:
+    """
+    Rewrite rows stored whole into split storage, one transaction per batch. The freed space
+    is reused by new rows; VACUUM FULL (or pg_repack) returns it to the OS.
+    """
+    report = CompactionReport()
+    with connection.cursor() as cursor:
+        report.bytes_before = relation_size(cursor)
+    after_id = 0
+    while limit is None or report.matches < limit:
+        size = batch_size if limit is None else min(batch_size, limit - report.matches)
+        with transaction.atomic(), connection.cursor() as cursor:
+            done, after_id = compact_batch(cursor, after_id, size)
+        if not done:
+            break
+        report.matches += done
+    with connection.cursor() as cursor:
+        report.bytes_after = relation_size(cursor)
+    return report
@@ -0,0 +1,168 @@
+import json
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from django.db import connection, transaction
+from psycopg2.extras import Json, execute_values
+
+from apps.rift.page_cache import invalidate_player_pages
+from apps.rift.services import champion_stats
+from common.analysis.match_document import Slices, split_document
+from common.analysis.match_metrics import METRICS_COLUMNS, extract_slice_rows
+
+JSON_COLUMNS = ("rune_setup", "damage_breakdown", "objective_contribution", "analysis_json")
+_JSON_POSITIONS = tuple(METRICS_COLUMNS.index(name) for name in JSON_COLUMNS)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# (league_matches.id, player_id, match_timestamp, puuid, raw_data as text,
+#  game_info / participant / teams as text): raw_data for rows stored whole, the slices otherwise
+UnprocessedRow = Tuple[int, int, int, str, Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+@dataclass
+class ExtractionReport:
+    matches: int = 0          # league_matches rows flipped to is_processed
+    metrics: int = 0          # league_player_match_metrics rows written
+    unmatched: int = 0        # matches where the player's puuid was not among the participants
+    seconds: float = 0.0
+
+
+def fetch_unprocessed(
+    cursor, after_id: int, limit: int, player_ids: Optional[Sequence[int]] = None
+) -> List[UnprocessedRow]:
+    # keyset over ix_matches_unprocessed; JSON stays text so the parent never decodes it, and
+    # split rows only read their slices (raw_zlib is never detoasted)
+    subset = "AND m.player_id = ANY(%s)" if player_ids is not None else ""
+    params = [after_id] + ([list(player_ids)] if player_ids is not None else []) + [limit]
+    cursor.execute(
+        f"""
+        SELECT m.id, m.player_id, m.match_timestamp, p.puuid, m.raw_data::text,
+               m.game_info::text, m.participant::text, m.teams::text
+        FROM league_matches m
+        JOIN league_players p ON p.id = m.player_id
+        WHERE NOT m.is_processed AND m.id > %s {subset}
+        ORDER BY m.id
+        LIMIT %s
+        """,
+        params,
+    )
+    return cursor.fetchall()
+
+
+def _slices(row: UnprocessedRow) -> Slices:
+    if row[4] is not None:
+        return split_document(json.loads(row[4]), row[3])
+    return json.loads(row[5]), json.loads(row[6]) if row[6] is not None else None, json.loads(row[7])
+
+
+def extract_batch(rows: Sequence[UnprocessedRow]) -> Tuple[List[tuple], List[int]]:
+    """Pure CPU step (runs in pool workers): stored JSON text -> metrics rows."""
+    metrics = extract_slice_rows(
+        [_slices(row) for row in rows],
+        match_pks=[row[0] for row in rows],
+        player_ids=[row[1] for row in rows],
+        recorded_at=[row[2] for row in rows],
+    )
+    return metrics, [row[0] for row in rows]
+
+
+def write_batch(cursor, metrics: Sequence[tuple], match_pks: Sequence[int]) -> int:
+    written = []
+    if metrics:
+        rows = []
+        for row in metrics:
+            row = list(row)
+            for pos in _JSON_POSITIONS:
+                if row[pos] is not None:
+                    row[pos] = Json(row[pos])
+            rows.append(row)
+        written = execute_values(
+            cursor,
+            f"""
+            INSERT INTO league_player_match_metrics ({", ".join(METRICS_COLUMNS)})
+            VALUES %s
+            ON CONFLICT (match_id, match_recorded_at) DO NOTHING
+            RETURNING id, player_id
+            """,
+            rows,
+            page_size=len(rows),
+            fetch=True,
+        )
+        champion_stats.add_metrics(cursor, [row[0] for row in written])
+    cursor.execute(
+        "UPDATE league_matches SET is_processed = TRUE WHERE id = ANY(%s) RETURNING player_id",
+        (list(match_pks),),
+    )
+    # the match history page shows is_processed, so every owner's page goes stale, with or without metrics
+    invalidate_player_pages((row[0] for row in cursor.fetchall()), "matches")
+    invalidate_player_pages((row[1] for row in written), "metrics")
+    return len(written)
+
+
+def _commit(report: ExtractionReport, result: Tuple[List[tuple], List[int]]):
+    metrics, match_pks = result
+    with transaction.atomic(), connection.cursor() as cursor:
+        report.metrics += write_batch(cursor, metrics, match_pks)
+    report.matches += len(match_pks)
+    report.unmatched += len(match_pks) - len(metrics)
+
+
+def process_unprocessed(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    limit: Optional[int] = None,
+    player_ids: Optional[Sequence[int]] = None,
+) -> ExtractionReport:
+    """
+    Drain the is_processed = FALSE backlog (only player_ids' matches when given).
+    workers > 1 fans the JSON decode + extraction out to a process pool while the parent
+    keeps reading the next batches and writing finished ones.
+    """
+    report = ExtractionReport()
+    started = time.perf_counter()
+    after_id = 0
+    remaining = limit
+
+    def next_batch():
+        nonlocal after_id, remaining
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        if size <= 0:
+            return []
+        with connection.cursor() as cursor:
+            rows = fetch_unprocessed(cursor, after_id, size, player_ids)
+        if rows:
+            after_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+        return rows
+
+    if workers <= 1:
+        while True:
+            rows = next_batch()
+            if not rows:
+                break
+            _commit(report, extract_batch(rows))
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            in_flight = set()
+            exhausted = False
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < 2 * workers:
+                    rows = next_batch()
+                    if not rows:
+                        exhausted = True
+                        break
+                    in_flight.add(pool.submit(extract_batch, rows))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _commit(report, future.result())
+
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,142 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from apps.rift.page_cache import invalidate_player_pages
+from apps.rift.services.chapters import season_bounds
+
+# Range-partitioned tables -> partition key, in attach order: metrics rows reference
+# (league_matches.id, match_timestamp), so a season's matches partition attaches first and
+# detaches last
+PARTITIONED = {
+    "league_matches": "match_timestamp",
+    "league_player_match_metrics": "match_recorded_at",
+}
+_BOUND = re.compile(r"FROM \('?(-?\d+)'?\) TO")
+
+
+@dataclass(slots=True)
+class Partition:
+    table: str                  # partitioned parent
+    name: str
+    season: Optional[int]       # None for the default partition
+    rows: int                   # planner estimate (reltuples)
+    bytes: int                  # pg_total_relation_size
+
+
+def partition_name(table: str, season: int) -> str:
+    return f"{table}_s{season}"
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def season_of(timestamp_ms: int) -> int:
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).year
+
+
+def list_partitions(cursor, table: str) -> List[Partition]:
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), GREATEST(c.reltuples, 0)::bigint,
+               pg_total_relation_size(c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname
+        """,
+        (table,),
+    )
+    partitions = []
+    for name, bound, rows, size in cursor.fetchall():
+        start = _BOUND.search(bound)
+        season = season_of(int(start.group(1))) if start else None
+        partitions.append(Partition(table, name, season, rows, size))
+    return partitions
+
+
+def _attached(cursor, season: int) -> Dict[str, str]:
+    """Parent table -> the season's partition, for the tables that have one."""
+    return {table: p.name for table in PARTITIONED for p in list_partitions(cursor, table) if p.season == season}
+
+
+def create_season(cursor, season: int) -> Optional[int]:
+    """
+    Partitions for one season on both tables, with that season's rows moved in from the default
+    partitions. Returns the rows moved, or None when the season already exists. Call inside
+    transaction.atomic().
+
+    The partitions are built detached and attached afterwards: metrics rows leave the default
+    partition before the matches they reference, so the move never cascades.
+    """
+    attached = _attached(cursor, season)
+    if len(attached) == len(PARTITIONED):
+        return None
+    if attached:
+        raise ValueError(f"season {season} is only partitioned as {sorted(attached.values())}; fix it by hand")
+
+    start, end = season_bounds(season)
+    moved = 0
+    for table, key in reversed(PARTITIONED.items()):
+        name = partition_name(table, season)
+        cursor.execute(
+            f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+        )
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {default_partition(table)} WHERE {key} >= %s AND {key} < %s RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+            """,
+            (start, end),
+        )
+        moved += cursor.rowcount
+    for table in PARTITIONED:
+        cursor.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {partition_name(table, season)} FOR VALUES FROM (%s) TO (%s)",
+            (start, end),
+        )
+    return moved
+
+
+def detach_season(cursor, season: int, archive_schema: Optional[str] = None) -> List[str]:
+    """
+    Detach one season's partitions from both tables; they stay as plain tables (moved to
+    `archive_schema` when given) without the foreign key into league_matches. Returns the
+    detached table names. Call inside transaction.atomic().
+
+    The season's chapters are deleted with their match links, which reference the detached
+    matches. The champion rollups are left as they are; rebuilding them for a detached season
+    would empty it.
+    """
+    attached = _attached(cursor, season)
+    if not attached:
+        return []
+    if len(attached) != len(PARTITIONED):
+        raise ValueError(f"season {season} is only partitioned as {sorted(attached.values())}; fix it by hand")
+
+    cursor.execute(f"SELECT DISTINCT player_id FROM {attached['league_matches']}")
+    player_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("DELETE FROM league_player_chapters WHERE season = %s", (season,))
+    if archive_schema:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}")
+    for table in reversed(PARTITIONED):
+        name = attached[table]
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+        # a detached table keeps foreign keys into the partitioned tables, pointing at rows that left
+        cursor.execute(
+            """
+            SELECT conname FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f' AND confrelid = ANY(%s::regclass[])
+            """,
+            (name, list(PARTITIONED)),
+        )
+        for (constraint,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"')
+        if archive_schema:
+            cursor.execute(f"ALTER TABLE {name} SET SCHEMA {archive_schema}")
+    invalidate_player_pages(player_ids, "matches", "metrics", "chapters")
+    return [attached[table] for table in PARTITIONED]
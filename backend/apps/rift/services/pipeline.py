@@ -0,0 +1,416 @@
+import json
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import close_old_connections, connection, transaction
+from psycopg2.extras import Json, execute_values
+
+from apps.rift.services.chapters import refresh_last_chapter
+from apps.rift.services.match_sync import sync_player_matches
+from apps.rift.services.metrics_extraction import process_unprocessed
+from apps.rift.services.players import get_player_by_puuid
+from apps.rift.services.playstyle import refresh_playstyles
+from apps.rift.services.recommendations import refresh_recommendations
+from apps.rift.services.similarity_matches import recompute_similarity
+from common.models.pipeline_job import PipelineJob, PipelineJobStage
+from common.models.player import Player
+from common.utils.db_util import statement_timeout
+
+# A failing stage is retried (resuming at that stage) after RETRY_BACKOFF_SECONDS * 2**(attempt-1)
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 30
+# A running job whose worker stopped heartbeating this long ago is handed to another worker
+STALE_AFTER_SECONDS = 30 * 60
+# How often a worker refreshes heartbeat_at while a stage runs
+HEARTBEAT_SECONDS = STALE_AFTER_SECONDS / 10
+
+ACTIVE_STATUSES = ("queued", "running")
+JOB_COLUMNS = "id, player_id, puuid, season, status, stage, error, created_at, started_at, finished_at"
+STAGE_COLUMNS = "stage, status, attempts, started_at, finished_at, duration_ms, detail, error"
+
+
+# ---- stages: (player, season) -> report stored as the stage's detail ----
+
+def _fetch(player: Player, season: int) -> Dict[str, Any]:
+    report = sync_player_matches(player, season)
+    return {
+        "listed": report.listed, "fetched": report.fetched, "skipped": report.skipped,
+        "missed": report.missed, "given_up": report.given_up, "complete": report.complete,
+    }
+
+
+def _metrics(player: Player, season: int) -> Dict[str, Any]:
+    report = process_unprocessed(player_ids=[player.id])
+    return {"matches": report.matches, "metrics": report.metrics, "unmatched": report.unmatched}
+
+
+def _chapters(player: Player, season: int) -> Dict[str, Any]:
+    return {"chapters": len(refresh_last_chapter(player.id, season))}
+
+
+def _playstyle(player: Player, season: int) -> Dict[str, Any]:
+    return {"players": refresh_playstyles([player.id], season)}
+
+
+def _similarity(player: Player, season: int) -> Dict[str, Any]:
+    report = recompute_similarity(player_ids=[player.id])
+    return {"rows": report.rows, "changed": report.changed}
+
+
+def _recommendations(player: Player, season: int) -> Dict[str, Any]:
+    return {"players": refresh_recommendations([player.id], season)}
+
+
+# In run order; each stage only reads what the stages before it committed
+STAGES: Tuple[Tuple[str, Callable[[Player, int], Dict[str, Any]]], ...] = (
+    ("fetch", _fetch),
+    ("metrics", _metrics),
+    ("chapters", _chapters),
+    ("playstyle", _playstyle),
+    ("similarity", _similarity),
+    ("recommendations", _recommendations),
+)
+STAGE_RUNNERS = dict(STAGES)
+
+
+# ---- queue ----
+
+def enqueue_job(cursor, player: Player, season: int) -> Tuple[PipelineJob, bool]:
+    """
+    Queue a pipeline run for the player's season, or return the job already queued/running for
+    the same (puuid, season). The partial unique index uq_pipeline_jobs_active makes this safe
+    under concurrent requests. Returns (job, created).
+    """
+    while True:
+        with transaction.atomic():
+            cursor.execute(
+                """
+                INSERT INTO league_pipeline_jobs (player_id, puuid, season)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (puuid, season) WHERE status IN ('queued', 'running') DO NOTHING
+                RETURNING id
+                """,
+                (player.id, player.puuid, season),
+            )
+            row = cursor.fetchone()
+            if row is not None:
+                execute_values(
+                    cursor,
+                    "INSERT INTO league_pipeline_job_stages (job_id, stage, position) VALUES %s",
+                    [(row[0], stage, position) for position, (stage, _) in enumerate(STAGES)],
+                )
+                return get_job(cursor, row[0]), True
+
+        cursor.execute(
+            """
+            SELECT id FROM league_pipeline_jobs
+            WHERE puuid = %s AND season = %s AND status IN ('queued', 'running')
+            """,
+            (player.puuid, season),
+        )
+        row = cursor.fetchone()
+        if row is not None:
+            return get_job(cursor, row[0]), False
+        # the live job finished between the two statements: try the insert again
+
+
+def load_stages(cursor, job_id: int) -> List[PipelineJobStage]:
+    cursor.execute(
+        f"SELECT {STAGE_COLUMNS} FROM league_pipeline_job_stages WHERE job_id = %s ORDER BY position",
+        (job_id,),
+    )
+    stages = PipelineJobStage.from_rows(cursor.fetchall())
+    for stage in stages:
+        if isinstance(stage.detail, str):  # Django leaves jsonb undecoded
+            stage.detail = json.loads(stage.detail)
+    return stages
+
+
+def get_job(cursor, job_id: int) -> Optional[PipelineJob]:
+    cursor.execute(f"SELECT {JOB_COLUMNS} FROM league_pipeline_jobs WHERE id = %s", (job_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    job = PipelineJob.from_row(row)
+    job.stages = load_stages(cursor, job_id)
+    return job
+
+
+def claim_job(cursor, worker_id: str) -> Optional[PipelineJob]:
+    """Take the oldest due job; SKIP LOCKED lets any number of workers poll the same table."""
+    cursor.execute(
+        f"""
+        UPDATE league_pipeline_jobs
+        SET status = 'running', locked_by = %s, heartbeat_at = NOW(),
+            started_at = COALESCE(started_at, NOW())
+        WHERE id = (
+            SELECT id FROM league_pipeline_jobs
+            WHERE status = 'queued' AND run_after <= NOW()
+            ORDER BY run_after, id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {JOB_COLUMNS}
+        """,
+        (worker_id,),
+    )
+    row = cursor.fetchone()
+    return PipelineJob.from_row(row) if row else None
+
+
+def requeue_stale(cursor, stale_after: int = STALE_AFTER_SECONDS) -> int:
+    """Jobs whose worker died mid-stage go back to the queue; that stage's attempt still counts."""
+    cursor.execute(
+        """
+        UPDATE league_pipeline_jobs
+        SET status = 'queued', locked_by = NULL, run_after = NOW()
+        WHERE status = 'running' AND heartbeat_at < NOW() - make_interval(secs => %s)
+        """,
+        (stale_after,),
+    )
+    return cursor.rowcount
+
+
+# ---- progress ----
+# Every write checks locked_by and returns False when it matched no row: the job was requeued
+# (requeue_stale) and may be running on another worker, which this one must leave alone.
+
+def heartbeat(cursor, job_id: int, worker_id: str) -> bool:
+    cursor.execute(
+        "UPDATE league_pipeline_jobs SET heartbeat_at = NOW() WHERE id = %s AND locked_by = %s",
+        (job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+
+def start_stage(cursor, job_id: int, worker_id: str, stage: str) -> bool:
+    with transaction.atomic():
+        cursor.execute(
+            "UPDATE league_pipeline_jobs SET stage = %s, heartbeat_at = NOW() WHERE id = %s AND locked_by = %s",
+            (stage, job_id, worker_id),
+        )
+        if cursor.rowcount != 1:
+            return False
+        cursor.execute(
+            """
+            UPDATE league_pipeline_job_stages
+            SET status = 'running', attempts = attempts + 1, started_at = NOW(), finished_at = NULL, error = NULL
+            WHERE job_id = %s AND stage = %s
+            """,
+            (job_id, stage),
+        )
+        return True
+
+
+def _update_stage(cursor, job_id: int, worker_id: str, stage: str, assignments: str, params: tuple) -> bool:
+    cursor.execute(
+        f"""
+        UPDATE league_pipeline_job_stages s
+        SET {assignments}
+        FROM league_pipeline_jobs j
+        WHERE j.id = s.job_id AND j.id = %s AND j.locked_by = %s AND s.stage = %s
+        """,
+        params + (job_id, worker_id, stage),
+    )
+    return cursor.rowcount == 1
+
+
+def finish_stage(cursor, job_id: int, worker_id: str, stage: str, duration_ms: int, detail: Dict[str, Any]) -> bool:
+    return _update_stage(
+        cursor, job_id, worker_id, stage,
+        "status = 'succeeded', finished_at = NOW(), duration_ms = %s, detail = %s",
+        (duration_ms, Json(detail)),
+    )
+
+
+def fail_stage(
+    cursor, job_id: int, worker_id: str, stage: str, duration_ms: int, error: str, retry_in: Optional[int]
+) -> bool:
+    """Record the failed attempt; requeue the job after retry_in seconds, or fail it when None."""
+    with transaction.atomic():
+        if not _update_stage(
+            cursor, job_id, worker_id, stage,
+            "status = 'failed', finished_at = NOW(), duration_ms = %s, error = %s",
+            (duration_ms, error),
+        ):
+            return False
+        if retry_in is None:
+            return finish_job(cursor, job_id, worker_id, "failed", error)
+        cursor.execute(
+            """
+            UPDATE league_pipeline_jobs
+            SET status = 'queued', locked_by = NULL, error = %s,
+                run_after = NOW() + make_interval(secs => %s)
+            WHERE id = %s AND locked_by = %s
+            """,
+            (error, retry_in, job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+
+def finish_job(cursor, job_id: int, worker_id: str, status: str, error: Optional[str] = None) -> bool:
+    cursor.execute(
+        """
+        UPDATE league_pipeline_jobs
+        SET status = %s, error = %s, locked_by = NULL, finished_at = NOW()
+        WHERE id = %s AND locked_by = %s
+        """,
+        (status, error, job_id, worker_id),
+    )
+    return cursor.rowcount == 1
+
+
+class _Heartbeat(threading.Thread):
+    """
+    Refreshes the job's heartbeat_at every `interval` seconds while a stage runs, so a stage
+    longer than STALE_AFTER_SECONDS isn't requeued under its worker. Sets `lost` once the job
+    is no longer locked by this worker. Uses the thread's own connection.
+    """
+
+    def __init__(self, job_id: int, worker_id: str, interval: float = HEARTBEAT_SECONDS):
+        super().__init__(name=f"pipeline-heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    with connection.cursor() as cursor:
+                        if not heartbeat(cursor, self.job_id, self.worker_id):
+                            self.lost.set()
+                            return
+                except Exception:
+                    connection.close()  # reconnect on the next beat
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def retry_delay(attempts: int) -> Optional[int]:
+    """Seconds before the next attempt of a stage that has failed `attempts` times; None = give up."""
+    if attempts >= MAX_ATTEMPTS:
+        return None
+    return RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+
+
+# ---- worker ----
+
+def run_job(job: PipelineJob, worker_id: str) -> str:
+    """
+    Run the job claimed by worker_id: its remaining stages in order. Succeeded stages (from an
+    earlier attempt) are skipped, so a retry resumes at the stage that failed. Returns the job's
+    new status: succeeded, failed, or queued (a stage failed and will be retried), or "lost"
+    when the job was requeued away from this worker, which then stops without touching it.
+    """
+    with connection.cursor() as cursor:
+        stages = load_stages(cursor, job.id)
+        player = get_player_by_puuid(cursor, job.puuid)
+        if player is None:
+            return "failed" if finish_job(cursor, job.id, worker_id, "failed", "Player not found.") else "lost"
+
+    for stage in stages:
+        if stage.status == "succeeded":
+            continue
+        if stage.attempts >= MAX_ATTEMPTS:
+            # its worker kept dying mid-stage (requeue_stale); don't crash another one
+            error = f"{stage.stage}: gave up after {stage.attempts} attempts"
+            with connection.cursor() as cursor:
+                return "failed" if finish_job(cursor, job.id, worker_id, "failed", error) else "lost"
+
+        with connection.cursor() as cursor:
+            if not start_stage(cursor, job.id, worker_id, stage.stage):
+                return "lost"
+        beat = _Heartbeat(job.id, worker_id)
+        beat.start()
+        started = time.perf_counter()
+        try:
+            detail = STAGE_RUNNERS[stage.stage](player, job.season)
+        except Exception:
+            beat.stop()
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            error = traceback.format_exc(limit=-5)  # innermost frames
+            retry_in = retry_delay(stage.attempts + 1)
+            close_old_connections()  # reconnects if the stage lost the connection
+            with connection.cursor() as cursor:
+                if not fail_stage(cursor, job.id, worker_id, stage.stage, duration_ms, error, retry_in):
+                    return "lost"
+            return "failed" if retry_in is None else "queued"
+        beat.stop()
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        with connection.cursor() as cursor:
+            if beat.lost.is_set() or not finish_stage(cursor, job.id, worker_id, stage.stage, duration_ms, detail):
+                return "lost"
+
+    with connection.cursor() as cursor:
+        return "succeeded" if finish_job(cursor, job.id, worker_id, "succeeded") else "lost"
+
+
+def run_worker(
+    worker_id: str,
+    poll_interval: float = 2.0,
+    drain: bool = False,
+    should_stop: Callable[[], bool] = lambda: False,
+    on_job: Optional[Callable[[PipelineJob, str], None]] = None,
+) -> int:
+    """
+    Claim and run jobs until should_stop() (checked between jobs), sleeping poll_interval when
+    the queue is empty; drain=True returns once it is empty instead. Stale jobs are requeued
+    at most once per STALE_AFTER_SECONDS / 10. Returns the number of jobs run.
+    """
+    ran = 0
+    next_requeue = 0.0
+    while not should_stop():
+        close_old_connections()
+        with connection.cursor() as cursor:
+            if time.monotonic() >= next_requeue:
+                requeue_stale(cursor)
+                next_requeue = time.monotonic() + STALE_AFTER_SECONDS / 10
+            job = claim_job(cursor, worker_id)
+        if job is None:
+            if drain:
+                break
+            time.sleep(poll_interval)
+            continue
+        # stages are batch work: no web request statement timeout
+        with statement_timeout(0):
+            status = run_job(job, worker_id)
+        ran += 1
+        if on_job is not None:
+            on_job(job, status)
+    return ran
+
+
+# ---- reporting ----
+
+def stage_timings(cursor, days: int = 7) -> List[Dict[str, Any]]:
+    """Per-stage duration percentiles over the stages that succeeded in the last `days` days."""
+    cursor.execute(
+        """
+        SELECT s.stage, COUNT(*),
+               percentile_cont(0.5)  WITHIN GROUP (ORDER BY s.duration_ms),
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY s.duration_ms),
+               MAX(s.duration_ms), SUM(s.duration_ms), SUM(s.attempts - 1)
+        FROM league_pipeline_job_stages s
+        WHERE s.status = 'succeeded' AND s.finished_at >= NOW() - make_interval(days => %s)
+        GROUP BY s.stage
+        """,
+        (days,),
+    )
+    found = {row[0]: row[1:] for row in cursor.fetchall()}
+    timings = []
+    for stage, _ in STAGES:
+        count, p50, p95, worst, total, retries = found.get(stage, (0, None, None, None, 0, 0))
+        timings.append(
+            {"stage": stage, "runs": count, "p50_ms": p50, "p95_ms": p95, "max_ms": worst,
+             "total_ms": total or 0, "retries": retries or 0}
+        )
+    return timings
@@ -0,0 +1,19 @@
+from typing import Iterator, Optional
+
+from common.models.player import Player
+
+PLAYER_COLUMNS = """
+    id, game_name, tag_line, puuid, summoner_id, region, role,
+    favorite_champion_id, favorite_champion_name, profile_icon_id
+"""
+
+
+def get_player_by_puuid(cursor, puuid: str) -> Optional[Player]:
+    cursor.execute(f"SELECT {PLAYER_COLUMNS} FROM league_players WHERE puuid = %s", (puuid,))
+    row = cursor.fetchone()
+    return Player.from_row(row) if row else None
+
+
+def iter_players(cursor) -> Iterator[Player]:
+    cursor.execute(f"SELECT {PLAYER_COLUMNS} FROM league_players ORDER BY id")
+    yield from Player.from_rows(cursor.fetchall())
@@ -0,0 +1,167 @@
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection, transaction
+from psycopg2.extras import Json, execute_values
+
+from apps.rift.services.champion_stats import PLAYER_TABLE, average
+from common.analysis.playstyle import FEATURES, PercentileTables, feature_vector, score_players
+from common.analysis.similarity_index import PLAYSTYLE_AXES
+
+# Rollup measures behind every feature (see champion_stats.MEASURES), averaged per (player, role)
+# played in the season; two measures -> the difference of their averages
+FEATURE_MEASURES = {
+    "kills_per_min": ("kills_per_min",),
+    "damage_per_min": ("damage_per_min",),
+    "first_blood_rate": ("first_blood",),
+    "kill_participation": ("kill_participation",),
+    "assists_per_min": ("assists_per_min",),
+    "objective_takedowns": ("objective_takedowns",),
+    "objective_damage_per_min": ("objective_damage_per_min",),
+    "first_tower_rate": ("first_tower",),
+    "vision_score_per_min": ("vision_score_per_min",),
+    "wards_placed_per_min": ("wards_placed_per_min",),
+    "wards_killed_per_min": ("wards_killed_per_min",),
+    "cs_per_min": ("cs_per_min",),
+    "gold_per_min": ("gold_per_min",),
+    "late_kda_delta": ("kda_long", "kda_short"),
+    "late_win_rate_delta": ("win_long", "win_short"),
+}
+AGGREGATE_SELECT = {
+    name: " - ".join(f"({average(measure)})" for measure in measures) for name, measures in FEATURE_MEASURES.items()
+}
+
+TABLES_KEY = "rift:playstyle:tables:{season}:{version}"
+VERSION_KEY = "rift:playstyle:version:{season}"
+# superseded versions just expire
+TABLES_TIMEOUT = 24 * 3600
+
+Aggregate = Tuple[int, str, int, np.ndarray]
+
+_lock = threading.Lock()
+_tables: Dict[int, PercentileTables] = {}
+
+
+def load_role_aggregates(cursor, season: int, player_ids: Optional[Sequence[int]] = None) -> List[Aggregate]:
+    """(player_id, role, games, feature vector) for the season, summed over the champion rollup rows."""
+    subset = "AND player_id = ANY(%s)" if player_ids is not None else ""
+    params = [season] + ([list(player_ids)] if player_ids is not None else [])
+    cursor.execute(
+        f"""
+        SELECT player_id, role, SUM(games), {", ".join(AGGREGATE_SELECT[name] for name in FEATURES)}
+        FROM {PLAYER_TABLE}
+        WHERE season = %s AND role <> '' {subset}
+        GROUP BY player_id, role
+        """,
+        params,
+    )
+    return [(row[0], row[1], row[2], feature_vector(row[3:])) for row in cursor.fetchall()]
+
+
+def _current_version(season: int) -> int:
+    key = VERSION_KEY.format(season=season)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        # another worker may have set it first; keep whichever landed
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_percentile_tables(season: int):
+    """Call after the season's rollups changed (and committed); every worker rebuilds on its next lookup."""
+    cache.set(VERSION_KEY.format(season=season), time.time_ns(), timeout=None)
+
+
+def _publish(season: int, tables: PercentileTables):
+    cache.set(TABLES_KEY.format(season=season, version=tables.version), tables, TABLES_TIMEOUT)
+    _tables[season] = tables
+
+
+def get_percentile_tables(season: int) -> PercentileTables:
+    """
+    The season's tables at the current shared version: process memo -> shared cache -> a build
+    from the champion rollup. Tables are never changed once built, only replaced: whichever
+    worker builds a version reads rollups committed before it was stamped, so no worker's
+    refresh is lost to another's.
+    """
+    version = _current_version(season)
+    tables = _tables.get(season)
+    if tables is not None and tables.version == version:
+        return tables
+    with _lock:
+        tables = _tables.get(season)
+        if tables is not None and tables.version == version:
+            return tables
+        tables = cache.get(TABLES_KEY.format(season=season, version=version))
+        if tables is None:
+            with connection.cursor() as cursor:
+                tables = PercentileTables.build(load_role_aggregates(cursor, season), version=version)
+        _publish(season, tables)
+        return tables
+
+
+def write_playstyles(cursor, scored: Sequence[Tuple[int, str, np.ndarray, np.ndarray]], games: Dict[int, int]) -> int:
+    if not scored:
+        return 0
+    rows = []
+    for player_id, role, axes, pct in scored:
+        raw = {
+            "role": role,
+            "games": games.get(player_id),
+            "percentiles": {name: (None if np.isnan(v) else round(float(v), 2)) for name, v in zip(FEATURES, pct)},
+        }
+        rows.append((player_id, *axes.tolist(), Json(raw)))
+    execute_values(
+        cursor,
+        f"""
+        INSERT INTO league_player_playstyle (player_id, {", ".join(PLAYSTYLE_AXES)}, raw_metrics)
+        VALUES %s
+        ON CONFLICT (player_id) DO UPDATE SET
+            {", ".join(f"{axis} = EXCLUDED.{axis}" for axis in PLAYSTYLE_AXES)},
+            raw_metrics = EXCLUDED.raw_metrics
+        """,
+        rows,
+        page_size=len(rows),
+    )
+    return len(rows)
+
+
+def _score_and_write(tables: PercentileTables, aggregates: List[Aggregate], batch_size: int) -> int:
+    games: Dict[int, int] = {}
+    for player_id, _, count, _ in aggregates:
+        games[player_id] = max(games.get(player_id, 0), count)
+    scored = score_players(tables, aggregates)
+    written = 0
+    for i in range(0, len(scored), batch_size):
+        with transaction.atomic(), connection.cursor() as cursor:
+            written += write_playstyles(cursor, scored[i:i + batch_size], games)
+    return written
+
+
+def rebuild_playstyles(season: int, batch_size: int = 5000) -> int:
+    """Rebuild the season's tables from scratch and rescore every player. Returns players written."""
+    invalidate_percentile_tables(season)
+    version = _current_version(season)
+    with connection.cursor() as cursor:
+        aggregates = load_role_aggregates(cursor, season)
+    tables = PercentileTables.build(aggregates, version=version)
+    _publish(season, tables)
+    return _score_and_write(tables, aggregates, batch_size)
+
+
+def refresh_playstyles(player_ids: Sequence[int], season: int, batch_size: int = 5000) -> int:
+    """
+    New games landed for player_ids: move the season's tables to a new version (rebuilt from the
+    rollup, which already holds the new games) and rescore just them. Other players keep their
+    scores until the next rebuild (their percentiles barely move).
+    """
+    invalidate_percentile_tables(season)
+    tables = get_percentile_tables(season)
+    with connection.cursor() as cursor:
+        aggregates = load_role_aggregates(cursor, season, player_ids)
+    return _score_and_write(tables, aggregates, batch_size)
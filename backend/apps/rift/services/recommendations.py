@@ -0,0 +1,154 @@
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from psycopg2.extras import execute_values
+
+from apps.rift.page_cache import invalidate_player_pages
+from apps.rift.services import champion_stats
+from apps.rift.services.champions import get_champion_catalog
+from common.analysis.champion_recommender import TOP_N, CoPlayModel, PoolRow
+
+MODEL_KEY = "rift:recommendations:model:{season}:{version}"
+VERSION_KEY = "rift:recommendations:version:{season}"
+# superseded versions just expire
+MODEL_TIMEOUT = 24 * 3600
+DEFAULT_BATCH_SIZE = 2000
+
+_lock = threading.Lock()
+_models: Dict[int, CoPlayModel] = {}
+
+
+def load_pool_rows(
+    cursor, season: int, player_ids: Optional[Sequence[int]] = None
+) -> Tuple[List[PoolRow], Dict[int, str]]:
+    """(player_id, role, champion_id, games, wins) for the season, plus champion names."""
+    subset = "AND player_id = ANY(%s)" if player_ids is not None else ""
+    params = [season] + ([list(player_ids)] if player_ids is not None else [])
+    # already one row per (player, role, champion): read straight off the rollup
+    cursor.execute(
+        f"""
+        SELECT player_id, role, champion_id, games, wins, champion_name
+        FROM {champion_stats.PLAYER_TABLE}
+        WHERE season = %s AND role <> '' {subset}
+        """,
+        params,
+    )
+    rows = cursor.fetchall()
+    return [row[:5] for row in rows], {row[2]: row[5] for row in rows}
+
+
+def _current_version(season: int) -> int:
+    key = VERSION_KEY.format(season=season)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        # another worker may have set it first; keep whichever landed
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def invalidate_coplay_model(season: int):
+    """Call after the season's rollups changed (and committed); every worker rebuilds on its next lookup."""
+    cache.set(VERSION_KEY.format(season=season), time.time_ns(), timeout=None)
+
+
+def _publish(season: int, model: CoPlayModel):
+    cache.set(MODEL_KEY.format(season=season, version=model.version), model, MODEL_TIMEOUT)
+    _models[season] = model
+
+
+def get_coplay_model(season: int) -> CoPlayModel:
+    """
+    The season's model at the current shared version: process memo -> shared cache -> a build
+    from the champion rollup, versioned like the playstyle percentile tables (never changed
+    once built, only replaced).
+    """
+    version = _current_version(season)
+    model = _models.get(season)
+    if model is not None and model.version == version:
+        return model
+    with _lock:
+        model = _models.get(season)
+        if model is not None and model.version == version:
+            return model
+        model = cache.get(MODEL_KEY.format(season=season, version=version))
+        if model is None:
+            with connection.cursor() as cursor:
+                model = CoPlayModel.build(*load_pool_rows(cursor, season), version=version)
+        _publish(season, model)
+        return model
+
+
+def write_recommendations(cursor, model: CoPlayModel, picks: Dict[int, Tuple[str, list]]) -> int:
+    """Replace the players' top-3 rows; picks maps player_id -> (role, recommend() output)."""
+    cursor.execute(
+        "DELETE FROM league_champion_recommendations WHERE player_id = ANY(%s)",
+        (list(picks),),
+    )
+    invalidate_player_pages(picks, "recommendations")
+    catalog = get_champion_catalog()
+    rows = [
+        (
+            player_id,
+            champion,
+            catalog.name(champion, model.names.get(champion, str(champion))),
+            catalog.image_url(champion),
+            model.reason(role, champion, because_of),
+            rank,
+        )
+        for player_id, (role, recs) in picks.items()
+        for rank, (champion, _, because_of) in enumerate(recs, start=1)
+    ]
+    if rows:
+        execute_values(
+            cursor,
+            """
+            INSERT INTO league_champion_recommendations
+                (player_id, champion_id, champion_name, champion_icon_url, reason, rank)
+            VALUES %s
+            """,
+            rows,
+            page_size=len(rows),
+        )
+    return len(rows)
+
+
+def _recommend_and_write(model: CoPlayModel, player_ids: Sequence[int], batch_size: int) -> int:
+    by_role: Dict[str, List[int]] = {}
+    for player_id in player_ids:
+        role = model.primary_role(player_id)
+        if role is not None:
+            by_role.setdefault(role, []).append(player_id)
+    written = 0
+    for role, members in by_role.items():
+        for i in range(0, len(members), batch_size):
+            block = members[i:i + batch_size]
+            recs = model.recommend(role, block, TOP_N)
+            with transaction.atomic(), connection.cursor() as cursor:
+                written += write_recommendations(cursor, model, {pid: (role, r) for pid, r in zip(block, recs)})
+    return written
+
+
+def generate_recommendations(season: int, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Rebuild the season's co-play model and rewrite every player's top 3. Returns rows written."""
+    invalidate_coplay_model(season)
+    version = _current_version(season)
+    with connection.cursor() as cursor:
+        rows, names = load_pool_rows(cursor, season)
+    model = CoPlayModel.build(rows, names, version=version)
+    _publish(season, model)
+    return _recommend_and_write(model, sorted({row[0] for row in rows}), batch_size)
+
+
+def refresh_recommendations(player_ids: Sequence[int], season: int, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    New matches landed for player_ids: move the season's model to a new version (rebuilt from
+    the rollup, which already holds their games) and rewrite their top 3. Other players pick up
+    the shifted co-play counts on the next full run.
+    """
+    invalidate_coplay_model(season)
+    return _recommend_and_write(get_coplay_model(season), list(player_ids), batch_size)
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+
+from common.analysis.similarity_index import PLAYSTYLE_AXES, SimilarityIndex, playstyle_vectors
+
+# Shared version stamp: bumped whenever pro playstyles change so every worker reloads.
+# With the default locmem cache this only reaches the current process; configure a shared
+# cache backend (Redis, memcached) for multi-worker deployments.
+INDEX_VERSION_KEY = "rift:similarity:pro_index_version"
+
+_lock = threading.Lock()
+_index: Optional[SimilarityIndex] = None
+
+
+def load_pro_playstyle_rows(cursor) -> List[tuple]:
+    """(pro_player_id, role, region, *PLAYSTYLE_AXES) for every pro with a playstyle."""
+    cursor.execute(
+        f"""
+        SELECT p.id, p.role, p.region, {", ".join("s." + axis for axis in PLAYSTYLE_AXES)}
+        FROM league_pro_players p
+        JOIN league_player_playstyle s ON s.pro_player_id = p.id
+        ORDER BY p.role, p.region, p.id
+        """
+    )
+    return cursor.fetchall()
+
+
+def load_player_vectors(cursor, player_ids: List[int]) -> Tuple[List[int], np.ndarray]:
+    """Playstyle vectors of the given players (players without a playstyle are left out)."""
+    cursor.execute(
+        f"""
+        SELECT player_id, {", ".join(PLAYSTYLE_AXES)}
+        FROM league_player_playstyle
+        WHERE player_id = ANY(%s)
+        ORDER BY player_id
+        """,
+        (list(player_ids),),
+    )
+    rows = cursor.fetchall()
+    return [row[0] for row in rows], playstyle_vectors([row[1:] for row in rows])
+
+
+def _current_version():
+    version = cache.get(INDEX_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        # another worker may have set it first; keep whichever landed
+        cache.add(INDEX_VERSION_KEY, version, timeout=None)
+        version = cache.get(INDEX_VERSION_KEY, version)
+    return version
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """
+    The process-wide pro index. Built on first use and rebuilt only when the shared version
+    stamp moved, so a lookup is one cache get plus an attribute read.
+    """
+    global _index
+    version = _current_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _lock:
+        if _index is None or _index.version != version:
+            with connection.cursor() as cursor:
+                rows = load_pro_playstyle_rows(cursor)
+            _index = SimilarityIndex.from_rows(rows, version=version)
+        return _index
+
+
+def invalidate_similarity_index():
+    """Call after pro playstyles were written; every worker rebuilds on its next lookup."""
+    global _index
+    cache.set(INDEX_VERSION_KEY, time.time_ns(), timeout=None)
+    _index = None
@@ -0,0 +1,146 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import connection, transaction
+from psycopg2.extras import execute_values
+
+from apps.rift.page_cache import invalidate_player_pages
+from apps.rift.services.similarity import load_pro_playstyle_rows
+from common.analysis.similarity_index import PLAYSTYLE_AXES, SimilarityIndex, playstyle_vectors
+
+DEFAULT_TOP_N = 5
+DEFAULT_BLOCK_SIZE = 2000
+
+# (player_id, role, *PLAYSTYLE_AXES)
+PlayerRow = Tuple
+
+
+@dataclass
+class SimilarityReport:
+    players: int = 0
+    rows: int = 0                      # (player, pro) pairs recomputed
+    changed: int = 0                   # of which inserted or updated
+    seconds: float = 0.0
+    last_player_id: int = 0            # every player up to here is committed; resume point
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def fetch_player_block(
+    cursor, after_id: int, limit: int, player_ids: Optional[Sequence[int]] = None
+) -> List[PlayerRow]:
+    # keyset over the UNIQUE(player_id) index of league_player_playstyle
+    subset = "AND s.player_id = ANY(%s)" if player_ids is not None else ""
+    params = [after_id] + ([list(player_ids)] if player_ids is not None else []) + [limit]
+    cursor.execute(
+        f"""
+        SELECT s.player_id, p.role, {", ".join("s." + axis for axis in PLAYSTYLE_AXES)}
+        FROM league_player_playstyle s
+        JOIN league_players p ON p.id = s.player_id
+        WHERE s.player_id > %s {subset}
+        ORDER BY s.player_id
+        LIMIT %s
+        """,
+        params,
+    )
+    return cursor.fetchall()
+
+
+def score_block(
+    index: SimilarityIndex, rows: Sequence[PlayerRow], top_n: int, metric: str = "cosine", same_role: bool = False
+) -> List[Tuple[int, int, float]]:
+    """Top-N pros for every player of the block: one matrix multiply per role group (or one overall)."""
+    player_ids = np.asarray([row[0] for row in rows], dtype=np.int64)
+    vectors = playstyle_vectors([row[2:] for row in rows])
+    if same_role:
+        roles = np.asarray([row[1] or "" for row in rows], dtype=object)
+        groups = [(role, np.flatnonzero(roles == role)) for role in set(roles.tolist())]
+    else:
+        groups = [(None, np.arange(len(rows)))]
+
+    out: List[Tuple[int, int, float]] = []
+    for role, members in groups:
+        pro_ids, scores = index.top_k(vectors[members], top_n, metric=metric, role=role or None)
+        players = np.repeat(player_ids[members], pro_ids.shape[1])
+        out.extend(zip(players.tolist(), pro_ids.ravel().tolist(), scores.ravel().tolist()))
+    return out
+
+
+def write_block(cursor, player_ids: Sequence[int], matches: Sequence[Tuple[int, int, float]]) -> int:
+    """
+    Replace the block's players' matches in one statement: upsert the new top-N and delete
+    any pair that dropped out of it. Unchanged scores are not rewritten, so re-running a block
+    is cheap. Returns the rows inserted or updated. Call inside transaction.atomic().
+    """
+    invalidate_player_pages(player_ids, "similarity")
+    if not matches:
+        cursor.execute("DELETE FROM league_similarity_matches WHERE player_id = ANY(%s)", (list(player_ids),))
+        return 0
+    # execute_values owns the only placeholder, so the block's ids are inlined as an ARRAY literal
+    block = cursor.mogrify("%s", (list(player_ids),)).decode()
+    written = execute_values(
+        cursor,
+        f"""
+        WITH fresh (player_id, pro_player_id, similarity_score) AS (VALUES %s),
+        stale AS (
+            DELETE FROM league_similarity_matches m
+            WHERE m.player_id = ANY({block})
+              AND NOT EXISTS (
+                  SELECT 1 FROM fresh f WHERE f.player_id = m.player_id AND f.pro_player_id = m.pro_player_id
+              )
+        )
+        INSERT INTO league_similarity_matches (player_id, pro_player_id, similarity_score)
+        SELECT player_id, pro_player_id, similarity_score FROM fresh
+        ON CONFLICT (player_id, pro_player_id) DO UPDATE SET similarity_score = EXCLUDED.similarity_score
+        WHERE league_similarity_matches.similarity_score IS DISTINCT FROM EXCLUDED.similarity_score
+        RETURNING 1
+        """,
+        matches,
+        template="(%s::bigint, %s::bigint, %s::double precision)",
+        page_size=len(matches),
+        fetch=True,
+    )
+    return len(written)
+
+
+def recompute_similarity(
+    top_n: int = DEFAULT_TOP_N,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    metric: str = "cosine",
+    same_role: bool = False,
+    player_ids: Optional[Sequence[int]] = None,
+    after_id: int = 0,
+    on_block: Optional[Callable[[SimilarityReport], None]] = None,
+) -> SimilarityReport:
+    """
+    Recompute league_similarity_matches for every player with a playstyle (or just player_ids),
+    in player_id order from after_id. Each block is scored with one matrix multiply and committed
+    on its own, so an interrupted run resumes from report.last_player_id. on_block is called after
+    every commit.
+    """
+    report = SimilarityReport(last_player_id=after_id)
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        index = SimilarityIndex.from_rows(load_pro_playstyle_rows(cursor))
+
+    while True:
+        with connection.cursor() as cursor:
+            rows = fetch_player_block(cursor, report.last_player_id, block_size, player_ids)
+        if not rows:
+            break
+        matches = score_block(index, rows, top_n, metric, same_role)
+        with transaction.atomic(), connection.cursor() as cursor:
+            report.changed += write_block(cursor, [row[0] for row in rows], matches)
+        report.rows += len(matches)
+        report.players += len(rows)
+        report.last_player_id = rows[-1][0]
+        report.seconds = time.perf_counter() - started
+        if on_block:
+            on_block(report)
+
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,69 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from apps.rift.services.chapters import cached_season
+from common.analysis.downsample import downsample, rolling_mean_1d
+
+# Chart columns: response name -> season column; build_time_series smooths win_rate with a rolling mean
+SERIES = {
+    "win_rate": "win",
+    "kda": "kda_ratio",
+    "cs_per_min": "cs_per_min",
+    "damage_per_min": "damage_per_min",
+}
+DEFAULT_POINTS = 300
+DEFAULT_WIN_RATE_WINDOW = 10
+
+
+def load_chapter_bands(cursor, player_id: int, season: int) -> List[Dict[str, Any]]:
+    cursor.execute(
+        """
+        SELECT chapter_index, title, start_game_idx, end_game_idx
+        FROM league_player_chapters
+        WHERE player_id = %s AND season = %s
+        ORDER BY chapter_index
+        """,
+        (player_id, season),
+    )
+    return [
+        {"chapter_index": row[0], "title": row[1], "start_game_idx": row[2], "end_game_idx": row[3]}
+        for row in cursor.fetchall()
+    ]
+
+
+def build_time_series(
+    cursor,
+    player_id: int,
+    season: int,
+    points: int = DEFAULT_POINTS,
+    mode: str = "lttb",
+    win_rate_window: int = DEFAULT_WIN_RATE_WINDOW,
+) -> Dict[str, Any]:
+    """
+    Columnar season series for the "Year in Time Series" page: one array per metric plus the
+    1-based game index and match timestamp, downsampled server-side to at most `points` entries.
+    Win rate is a trailing rolling mean over `win_rate_window` games (a per-game 0/1 is not plottable).
+    """
+    games = cached_season(cursor, player_id, season)
+    total = games.games
+    columns = {name: games[source] for name, source in SERIES.items()}
+    columns["win_rate"] = rolling_mean_1d(columns["win_rate"], win_rate_window)
+    columns["timestamp"] = games["match_recorded_at"]
+
+    sampled = downsample(np.arange(1, total + 1), columns, points, mode=mode, passthrough=("timestamp",))
+    sampled["game_index"] = sampled.pop("x")
+    if mode == "mean":
+        # bucket centres are fractional game indexes
+        sampled["game_index"] = np.round(sampled["game_index"], 1)
+    else:
+        sampled["game_index"] = sampled["game_index"].astype(np.int64)
+
+    return {
+        "season": season,
+        "games": total,
+        "points": int(len(sampled["game_index"])),
+        "mode": mode,
+        "columns": sampled,
+        "chapters": load_chapter_bands(cursor, player_id, season),
+    }
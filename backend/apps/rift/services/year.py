@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional
+
+from common.analysis.similarity_index import PLAYSTYLE_AXES
+
+SIMILAR_PROS = 3
+
+# league_player_chapters columns returned to the journey page (raw_metrics stays server-side)
+CHAPTER_FIELDS = (
+    "chapter_index", "start_date", "end_date", "start_game_idx", "end_game_idx", "title", "summary",
+    "top_champion_id", "top_champion_name", "top_champion_icon_url", "top_champion_games",
+    "games_count", "win_rate", "kda_score", "cs_score", "damage_score", "vision_score",
+)
+
+
+def _playstyle(row) -> Optional[Dict[str, Any]]:
+    if row is None or all(value is None for value in row):
+        return None
+    return dict(zip(PLAYSTYLE_AXES, row))
+
+
+def load_chapters(cursor, player_id: int, season: int) -> List[Dict[str, Any]]:
+    """Page 1: the season's chapter cards in order."""
+    cursor.execute(
+        f"""
+        SELECT {", ".join(CHAPTER_FIELDS)}
+        FROM league_player_chapters
+        WHERE player_id = %s AND season = %s
+        ORDER BY chapter_index
+        """,
+        (player_id, season),
+    )
+    return [dict(zip(CHAPTER_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def load_similarity(cursor, player_id: int, limit: int = SIMILAR_PROS) -> Dict[str, Any]:
+    """Page 3: the player's playstyle and the closest pros with theirs."""
+    axes = ", ".join(f"s.{axis}" for axis in PLAYSTYLE_AXES)
+    cursor.execute(f"SELECT {axes} FROM league_player_playstyle s WHERE s.player_id = %s", (player_id,))
+    playstyle = _playstyle(cursor.fetchone())
+    cursor.execute(
+        f"""
+        SELECT m.similarity_score, m.feature_explanation,
+               p.id, p.name, p.team, p.region, p.role, p.profile_icon_id, {axes}
+        FROM league_similarity_matches m
+        JOIN league_pro_players p ON p.id = m.pro_player_id
+        LEFT JOIN league_player_playstyle s ON s.pro_player_id = p.id
+        WHERE m.player_id = %s
+        ORDER BY m.similarity_score DESC
+        LIMIT %s
+        """,
+        (player_id, limit),
+    )
+    matches = [
+        {
+            "similarity": row[0],
+            "explanation": row[1],
+            "pro": {
+                "id": row[2], "name": row[3], "team": row[4], "region": row[5], "role": row[6],
+                "profile_icon_id": row[7],
+            },
+            "playstyle": _playstyle(row[8:]),
+        }
+        for row in cursor.fetchall()
+    ]
+    return {"playstyle": playstyle, "matches": matches}
+
+
+def load_recommendations(cursor, player_id: int) -> List[Dict[str, Any]]:
+    """Page 4: the player's top-3 champion suggestions."""
+    cursor.execute(
+        """
+        SELECT rank, champion_id, champion_name, champion_icon_url, reason
+        FROM league_champion_recommendations
+        WHERE player_id = %s
+        ORDER BY rank
+        """,
+        (player_id,),
+    )
+    return [
+        {"rank": row[0], "champion_id": row[1], "champion_name": row[2], "champion_icon_url": row[3], "reason": row[4]}
+        for row in cursor.fetchall()
+    ]
@@ -0,0 +1,851 @@
+import asyncio
+import json
+import threading
+from unittest import TestCase
+from unittest.mock import ANY, MagicMock, patch
+
+import numpy as np
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.rift.page_cache import invalidate_player_pages
+from apps.rift.renderers import ColumnarBinaryRenderer, decode_columns
+from apps.rift.services import (
+    champion_stats,
+    champions,
+    partitions,
+    pipeline,
+    playstyle,
+    recommendations,
+    similarity,
+)
+from apps.rift.services.match_sync import MAX_BODY_MISSES, MAX_LISTED, sync_player_matches
+from apps.rift.services.matches import LOAD_COLUMNS, LoadReport, bulk_load_matches, match_from_riot
+from apps.rift.services.metrics_extraction import write_batch
+from apps.rift.services.similarity_matches import score_block, write_block
+from apps.rift.views import PlayerTimeSeriesView, PlayerYearView
+from common.analysis.match_document import decompress_document
+from common.analysis.match_metrics import METRICS_COLUMNS
+from common.analysis.playstyle import FEATURES
+from common.analysis.similarity_index import SimilarityIndex
+from common.models.champion import Champion
+from common.models.match_sync_state import MatchSyncState
+from common.models.pipeline_job import PipelineJob, PipelineJobStage
+from common.models.player import Player
+
+
+def riot_match(match_id, game_creation):
+    return {"metadata": {"matchId": match_id}, "info": {"gameCreation": game_creation}}
+
+
+class MatchSyncTests(TestCase):
+    def setUp(self):
+        self.player = Player(id=7, game_name="Lagusa", tag_line="JP1", region="jp1")
+        patcher = patch.multiple(
+            "apps.rift.services.match_sync",
+            connection=MagicMock(),
+            transaction=MagicMock(),
+            invalidate_player_pages=MagicMock(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_sync(self, watermark, pages, known, bodies, max_listed=MAX_LISTED, misses=None):
+        """pages: the listing invokes' ids in call order; known: stored match id -> timestamp."""
+        stored = []
+        saved = []
+        with patch(
+            "apps.rift.services.match_sync.get_sync_state",
+            return_value=MatchSyncState(self.player.id, watermark, body_misses=dict(misses or {})),
+        ), patch(
+            "apps.rift.services.match_sync.fetch_match_ids_via_lambda", side_effect=pages
+        ) as fetch_ids, patch(
+            "apps.rift.services.match_sync.stored_match_timestamps",
+            side_effect=lambda cursor, ids: {i: known[i] for i in ids if i in known},
+        ), patch(
+            "apps.rift.services.match_sync.iter_matches_by_ids_via_lambda",
+            side_effect=lambda *args: iter([bodies[i] for i in args[-1] if i in bodies]),
+        ) as fetch_bodies, patch(
+            "apps.rift.services.match_sync.bulk_load_matches",
+            side_effect=lambda cursor, matches: stored.extend(matches) or LoadReport(len(matches), len(matches)),
+        ), patch(
+            "apps.rift.services.match_sync.save_sync_state",
+            side_effect=lambda cursor, state: saved.append(state),
+        ):
+            report = sync_player_matches(self.player, 2025, max_listed=max_listed)
+        return report, stored, saved, fetch_ids, fetch_bodies
+
+    def test_sync_skips_known_matches(self):
+        """Test only unknown match ids have their bodies fetched"""
+        bodies = {"JP1_3": riot_match("JP1_3", 3_000_000), "JP1_4": riot_match("JP1_4", 4_000_000)}
+
+        report, stored, saved, fetch_ids, fetch_bodies = self.run_sync(
+            watermark=2_000_000,
+            pages=[["JP1_4", "JP1_3", "JP1_2"]],
+            known={"JP1_2": 2_000_000},
+            bodies=bodies,
+        )
+
+        self.assertEqual(fetch_ids.call_args.kwargs["start_time"], 2_000)
+        self.assertEqual(fetch_bodies.call_args.args[-1], ["JP1_4", "JP1_3"])
+        self.assertEqual([m.match_id for m in stored], ["JP1_4", "JP1_3"])
+        self.assertEqual((report.listed, report.fetched, report.skipped, report.pages), (3, 2, 1, 1))
+        self.assertEqual(report.watermark_after, 4_000_000)
+        self.assertEqual(saved[0].last_match_id, "JP1_4")
+
+    def test_sync_without_new_matches(self):
+        """Test a re-sync with nothing new fetches no bodies and keeps the watermark"""
+        report, stored, saved, _, fetch_bodies = self.run_sync(
+            watermark=5_000_000, pages=[["JP1_5"]], known={"JP1_5": 5_000_000}, bodies={}
+        )
+
+        fetch_bodies.assert_not_called()
+        self.assertEqual(stored, [])
+        self.assertEqual((report.fetched, report.skipped), (0, 1))
+        self.assertEqual(report.watermark_after, 5_000_000)
+
+    def test_sync_pages_back_through_a_capped_listing(self):
+        """Test a full page is followed by pages ending at its oldest match until one comes back short"""
+        bodies = {f"JP1_{i}": riot_match(f"JP1_{i}", i * 1_000_000) for i in (7, 8, 9)}
+
+        report, stored, saved, fetch_ids, _ = self.run_sync(
+            watermark=2_000_000,
+            # Riot's endTime is inclusive: the boundary match comes back and is deduped
+            pages=[["JP1_9", "JP1_8"], ["JP1_8", "JP1_7"], ["JP1_7"]],
+            known={},
+            bodies=bodies,
+            max_listed=2,
+        )
+
+        self.assertEqual(
+            [(c.kwargs["start_time"], c.kwargs["end_time"]) for c in fetch_ids.call_args_list],
+            [(2_000, None), (2_000, 8_000), (2_000, 7_000)],
+        )
+        self.assertEqual([m.match_id for m in stored], ["JP1_9", "JP1_8", "JP1_7"])
+        self.assertEqual((report.listed, report.pages), (3, 3))
+        self.assertTrue(report.complete)
+        self.assertEqual((report.watermark_after, saved[0].last_match_id), (9_000_000, "JP1_9"))
+
+    def test_sync_advances_past_matches_stored_by_an_earlier_sync(self):
+        """Test a listing of already stored matches still moves the watermark to the newest of them"""
+        report, _, saved, _, fetch_bodies = self.run_sync(
+            watermark=2_000_000, pages=[["JP1_4", "JP1_3"]], known={"JP1_4": 4_000_000, "JP1_3": 3_000_000}, bodies={}
+        )
+
+        fetch_bodies.assert_not_called()
+        self.assertEqual((report.watermark_after, saved[0].last_match_id), (4_000_000, "JP1_4"))
+
+    def test_sync_keeps_watermark_when_a_body_is_missing(self):
+        """Test an id whose body the Lambda didn't return holds the watermark back and counts a miss"""
+        bodies = {"JP1_4": riot_match("JP1_4", 4_000_000)}
+
+        report, stored, saved, _, _ = self.run_sync(
+            watermark=2_000_000, pages=[["JP1_4", "JP1_3"]], known={}, bodies=bodies, misses={"JP1_3": 1}
+        )
+
+        self.assertEqual([m.match_id for m in stored], ["JP1_4"])
+        self.assertFalse(report.complete)
+        self.assertEqual(report.missed, 1)
+        self.assertEqual(report.watermark_after, 2_000_000)
+        self.assertEqual(saved[0].body_misses, {"JP1_3": 2})
+
+    def test_sync_gives_up_on_a_body_that_keeps_missing(self):
+        """Test an id missed MAX_BODY_MISSES times is not requested again and stops holding the watermark"""
+        bodies = {"JP1_4": riot_match("JP1_4", 4_000_000)}
+
+        report, _, saved, _, fetch_bodies = self.run_sync(
+            watermark=2_000_000,
+            pages=[["JP1_4", "JP1_3"]],
+            known={},
+            bodies=bodies,
+            misses={"JP1_3": MAX_BODY_MISSES},
+        )
+
+        self.assertEqual(fetch_bodies.call_args.args[-1], ["JP1_4"])
+        self.assertEqual((report.given_up, report.missed), (1, 0))
+        self.assertTrue(report.complete)
+        self.assertEqual(report.watermark_after, 4_000_000)
+        self.assertEqual(saved[0].body_misses, {})
+
+
+class BulkLoadMatchesTests(TestCase):
+    def make_cursor(self, inserted):
+        cursor = MagicMock()
+        cursor.copied = []
+        cursor.copy_expert.side_effect = lambda sql, f: cursor.copied.append(f.read())
+        cursor.rowcount = inserted
+        return cursor
+
+    def test_bulk_load_streams_copy_rows_and_counts(self):
+        """Test bulk_load_matches COPYs escaped rows and reports inserted/skipped"""
+        matches = [
+            match_from_riot({"metadata": {"matchId": "JP1_1"}, "info": {"gameCreation": 10, "note": "a\tb\\c"}}, 7),
+            match_from_riot({"metadata": {"matchId": "JP1_2"}, "info": {"gameCreation": 20}}, 7),
+        ]
+        cursor = self.make_cursor(inserted=1)
+
+        report = bulk_load_matches(cursor, iter(matches))
+
+        lines = cursor.copied[0].splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0].split("\t")[0:2], ["JP1_1", "7"])
+        self.assertIn('"note":"a\\\\tb\\\\\\\\c"', lines[0])
+        self.assertEqual((report.staged, report.inserted, report.skipped), (2, 1, 1))
+        register_sql, merge_sql = (c.args[0] for c in cursor.execute.call_args_list[-2:])
+        self.assertIn("INSERT INTO league_match_ids", register_sql)
+        self.assertIn("ON CONFLICT (match_id) DO NOTHING", register_sql)
+        self.assertIn("ON CONFLICT (match_id, match_timestamp) DO NOTHING", merge_sql)
+        # stored under the registered timestamp, so a refetch with another gameCreation dedupes
+        self.assertIn("r.match_timestamp", merge_sql)
+        self.assertIn("JOIN league_match_ids r", merge_sql)
+
+    def test_bulk_load_split_matches(self):
+        """Test split matches COPY their slices and the compressed document instead of raw_data"""
+        raw = {
+            "metadata": {"matchId": "JP1_1"},
+            "info": {"gameCreation": 10, "participants": [{"puuid": "me", "teamId": 100, "kills": 3}]},
+        }
+        with override_settings(RIFT_MATCH_STORAGE="split"):
+            split = match_from_riot(raw, 7, "me")
+        with override_settings(RIFT_MATCH_STORAGE="full"):
+            self.assertFalse(match_from_riot(raw, 7, "me").is_split)
+        cursor = self.make_cursor(inserted=1)
+
+        bulk_load_matches(cursor, [split])
+
+        fields = dict(zip(LOAD_COLUMNS, cursor.copied[0].rstrip("\n").split("\t")))
+        self.assertEqual(fields["raw_data"], "\\N")
+        self.assertEqual(json.loads(fields["participant"]), {"puuid": "me", "teamId": 100, "kills": 3})
+        self.assertEqual(json.loads(fields["teams"])[0]["totals"]["kills"], 3)
+        self.assertEqual(decompress_document(bytes.fromhex(fields["raw_zlib"][3:])), raw)
+        self.assertIn("raw_zlib", cursor.execute.call_args_list[-1].args[0])
+
+    def test_bulk_load_empty(self):
+        """Test bulk_load_matches with no matches skips the merge"""
+        cursor = self.make_cursor(inserted=0)
+
+        report = bulk_load_matches(cursor, [])
+
+        self.assertEqual((report.staged, report.inserted), (0, 0))
+        self.assertNotIn("INSERT", cursor.execute.call_args_list[-1].args[0])
+
+
+class PlayerTimeSeriesViewTests(TestCase):
+    def setUp(self):
+        self.payload = {
+            "season": 2025,
+            "games": 3,
+            "points": 3,
+            "mode": "lttb",
+            "columns": {
+                "kda": np.array([1.5, np.nan, 3.0]),
+                "timestamp": np.array([10, 20, 30], dtype=np.int64),
+            },
+            "chapters": [],
+        }
+        player = Player(id=7, puuid="p", game_name="a", tag_line="b", region="kr")
+        self.build_time_series = MagicMock(side_effect=lambda *a, **k: dict(self.payload))
+        patcher = patch.multiple(
+            "apps.rift.views.timeseries",
+            connection=MagicMock(),
+            get_player_by_puuid=MagicMock(return_value=player),
+            build_time_series=self.build_time_series,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache_patcher = patch.multiple(
+            "apps.rift.page_cache",
+            connection=MagicMock(),
+            get_player_by_puuid=MagicMock(return_value=player),
+        )
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        cache.clear()
+
+    def get(self, query, **headers):
+        request = APIRequestFactory().get(f"/api/rift/players/p/timeseries/{query}", **headers)
+        response = PlayerTimeSeriesView.as_view()(request, puuid="p")
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def test_json_columns_replace_nan(self):
+        """Test the JSON encoding returns plain lists with null for missing values"""
+        response = self.get("?points=3")
+
+        self.assertEqual(response.status_code, 200)
+        columns = json.loads(response.content)["data"]["columns"]
+        self.assertEqual(columns["kda"], [1.5, None, 3.0])
+        self.assertEqual(columns["timestamp"], [10, 20, 30])
+
+    def test_binary_columns_roundtrip(self):
+        """Test ?format=bin returns typed column buffers that decode back"""
+        response = self.get("?format=bin")
+
+        self.assertEqual(response["Content-Type"], ColumnarBinaryRenderer.media_type)
+        decoded = decode_columns(response.content)
+        self.assertEqual(decoded["games"], 3)
+        np.testing.assert_allclose(decoded["columns"]["kda"], [1.5, np.nan, 3.0])
+        self.assertEqual(decoded["columns"]["timestamp"].dtype, np.dtype("<i8"))
+
+    def test_invalid_points(self):
+        """Test an out-of-range point budget is rejected"""
+        self.assertEqual(self.get("?points=1").status_code, 400)
+
+    def test_rendered_page_is_cached_with_etag(self):
+        """Test a repeated request is served from the page cache and If-None-Match gets a 304"""
+        first = self.get("?points=3")
+        second = self.get("?points=3")
+
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(self.build_time_series.call_count, 1)
+
+        not_modified = self.get("?points=3", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+
+    def test_cache_varies_by_query_and_format(self):
+        """Test different query strings and renderers are cached separately"""
+        self.get("?points=3")
+        self.get("?points=4")
+        binary = self.get("?format=bin")
+
+        self.assertEqual(binary["Content-Type"], ColumnarBinaryRenderer.media_type)
+        self.assertEqual(self.build_time_series.call_count, 3)
+
+    def test_invalidation_is_per_player_and_source(self):
+        """Test rewriting the player's chapters re-renders the page; other players and sources do not"""
+        with patch("apps.rift.page_cache.transaction", MagicMock(on_commit=lambda fn: fn())):
+            self.get("?points=3")
+            invalidate_player_pages([8], "chapters")
+            invalidate_player_pages([7], "similarity")
+            self.get("?points=3")
+            self.assertEqual(self.build_time_series.call_count, 1)
+
+            invalidate_player_pages([7], "chapters")
+            self.get("?points=3")
+            self.assertEqual(self.build_time_series.call_count, 2)
+
+
+class PlayerYearViewTests(TestCase):
+    def setUp(self):
+        self.player = Player(id=7, puuid="p", game_name="a", tag_line="b", region="kr")
+        # each loader waits for the other two: only passes if they really run side by side
+        barrier = threading.Barrier(3, timeout=5)
+
+        def loader(result):
+            def load(*args):
+                barrier.wait()
+                return result
+
+            return MagicMock(side_effect=load)
+
+        self.loaders = {
+            "load_chapters": loader([{"chapter_index": 1, "title": "Warm-up"}]),
+            "load_similarity": loader({"playstyle": None, "matches": []}),
+            "load_recommendations": loader([{"rank": 1, "champion_id": 103}]),
+        }
+        patcher = patch.multiple(
+            "apps.rift.views.year",
+            connection=MagicMock(),
+            get_player_by_puuid=MagicMock(return_value=self.player),
+            **self.loaders,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache_patcher = patch.multiple(
+            "apps.rift.page_cache",
+            connection=MagicMock(),
+            get_player_by_puuid=MagicMock(return_value=self.player),
+        )
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+        cache.clear()
+
+    def call(self, method, query="", user=None):
+        request = getattr(APIRequestFactory(), method)(f"/api/rift/players/p/year/{query}")
+        if user is not None:
+            force_authenticate(request, user=user)
+        response = asyncio.run(PlayerYearView.as_view()(request, puuid="p"))
+        response.render()
+        return response
+
+    def test_get_gathers_pages_concurrently(self):
+        """Test GET reads chapters, similarity and recommendations concurrently into one envelope"""
+        response = self.call("get", "?season=2025")
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)["data"]
+        self.assertEqual(data["season"], 2025)
+        self.assertEqual(data["chapters"][0]["title"], "Warm-up")
+        self.assertEqual(data["recommendations"][0]["champion_id"], 103)
+        self.loaders["load_chapters"].assert_called_once_with(ANY, 7, 2025)
+
+    def test_errors_use_the_error_envelope(self):
+        """Test validation and auth errors from the async view go through the custom handler"""
+        bad_season = self.call("get", "?season=1")
+        self.assertEqual(bad_season.status_code, 400)
+        self.assertFalse(json.loads(bad_season.content)["result"])
+
+        self.assertEqual(self.call("post").status_code, 401)
+
+    def test_post_enqueues_the_pipeline(self):
+        """Test POST queues one pipeline job per player season and points at its status URL"""
+        user = MagicMock(is_authenticated=True)
+        job = PipelineJob(id=3, player_id=7, puuid="p", season=2025)
+        enqueue = MagicMock(side_effect=[(job, True), (job, False)])
+        with patch("apps.rift.views.year.enqueue_job", enqueue):
+            queued = self.call("post", "?season=2025", user=user)
+            deduped = self.call("post", "?season=2025", user=user)
+
+        self.assertEqual((queued.status_code, deduped.status_code), (202, 200))
+        self.assertTrue(queued["Location"].endswith("/jobs/3/"))
+        self.assertEqual(json.loads(queued.content)["data"]["id"], 3)
+        enqueue.assert_called_with(ANY, self.player, 2025)
+
+
+class PipelineJobTests(TestCase):
+    def setUp(self):
+        self.job = PipelineJob(id=3, player_id=7, puuid="p", season=2025, status="running")
+        self.player = Player(id=7, puuid="p", game_name="a", tag_line="b", region="kr")
+        self.stages = [PipelineJobStage(stage) for stage, _ in pipeline.STAGES]
+        self.runners = {stage: MagicMock(return_value={"rows": 1}) for stage, _ in pipeline.STAGES}
+        self.recorded = {
+            name: MagicMock() for name in ("start_stage", "finish_stage", "fail_stage", "finish_job")
+        }
+        patcher = patch.multiple(
+            pipeline,
+            connection=MagicMock(),
+            load_stages=MagicMock(side_effect=lambda cursor, job_id: self.stages),
+            get_player_by_puuid=MagicMock(return_value=self.player),
+            _Heartbeat=MagicMock(return_value=MagicMock(**{"lost.is_set.return_value": False})),
+            **self.recorded,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        runner_patcher = patch.dict(pipeline.STAGE_RUNNERS, self.runners)
+        runner_patcher.start()
+        self.addCleanup(runner_patcher.stop)
+
+    def test_run_resumes_at_failed_stage(self):
+        """Test a retried job skips the stages that already succeeded and records each stage it runs"""
+        self.stages[0].status = self.stages[1].status = "succeeded"
+        self.stages[2] = PipelineJobStage("chapters", status="failed", attempts=1)
+
+        self.assertEqual(pipeline.run_job(self.job, "w"), "succeeded")
+
+        self.runners["fetch"].assert_not_called()
+        self.runners["metrics"].assert_not_called()
+        self.runners["chapters"].assert_called_once_with(self.player, 2025)
+        self.assertEqual(
+            [c.args[3] for c in self.recorded["finish_stage"].call_args_list],
+            ["chapters", "playstyle", "similarity", "recommendations"],
+        )
+        self.assertEqual(self.recorded["finish_stage"].call_args.args[5], {"rows": 1})
+        self.recorded["finish_job"].assert_called_once_with(ANY, 3, "w", "succeeded")
+
+    def test_failed_stage_is_retried_with_backoff_then_fails_the_job(self):
+        """Test a failing stage requeues the job with growing backoff until MAX_ATTEMPTS"""
+        self.runners["similarity"].side_effect = RuntimeError("boom")
+        for stage in self.stages[:4]:
+            stage.status = "succeeded"
+
+        self.assertEqual(pipeline.run_job(self.job, "w"), "queued")
+        _, job_id, worker_id, stage, _, error, retry_in = self.recorded["fail_stage"].call_args.args
+        self.assertEqual((job_id, worker_id, stage, retry_in), (3, "w", "similarity", pipeline.RETRY_BACKOFF_SECONDS))
+        self.assertIn("RuntimeError: boom", error)
+        self.runners["recommendations"].assert_not_called()
+
+        self.stages[4].attempts = pipeline.MAX_ATTEMPTS - 1
+        self.assertEqual(pipeline.run_job(self.job, "w"), "failed")
+        self.assertIsNone(self.recorded["fail_stage"].call_args.args[6])
+
+    def test_run_stops_when_the_job_is_requeued_away(self):
+        """Test a worker whose lock was taken over stops after the stage and never finishes the job"""
+        self.recorded["finish_stage"].return_value = False
+
+        self.assertEqual(pipeline.run_job(self.job, "w"), "lost")
+
+        self.runners["fetch"].assert_called_once()
+        self.runners["metrics"].assert_not_called()
+        self.recorded["finish_job"].assert_not_called()
+
+    def test_enqueue_dedupes_live_jobs(self):
+        """Test enqueueing while a job for the same puuid and season is live returns that job"""
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [None, (11,)]
+        live = PipelineJob(id=11, player_id=7, puuid="p", season=2025)
+
+        with patch.multiple(
+            pipeline, transaction=MagicMock(), execute_values=MagicMock(), get_job=MagicMock(return_value=live)
+        ):
+            job, created = pipeline.enqueue_job(cursor, self.player, 2025)
+
+            pipeline.execute_values.assert_not_called()
+        self.assertIs(job, live)
+        self.assertFalse(created)
+        self.assertIn("ON CONFLICT (puuid, season) WHERE status IN", cursor.execute.call_args_list[0].args[0])
+
+
+class PipelineLockTests(TestCase):
+    def test_heartbeat_refreshes_until_the_lock_is_lost(self):
+        """Test the heartbeat thread beats while the lock holds and flags the stage once it doesn't"""
+        with patch.multiple(pipeline, connection=MagicMock(), heartbeat=MagicMock(side_effect=[True, True, False])):
+            beat = pipeline.heartbeat
+            ticker = pipeline._Heartbeat(3, "w", interval=0.01)
+            ticker.start()
+            ticker.join(timeout=5)
+
+        self.assertTrue(ticker.lost.is_set())
+        self.assertEqual(beat.call_count, 3)
+        self.assertEqual(beat.call_args.args[1:], (3, "w"))
+
+    def test_progress_updates_check_the_lock(self):
+        """Test stage and job updates only touch a job still locked by the worker"""
+        cursor = MagicMock(rowcount=0)
+
+        with patch.object(pipeline, "transaction", MagicMock()):
+            self.assertFalse(pipeline.start_stage(cursor, 3, "w", "fetch"))
+        self.assertEqual(cursor.execute.call_count, 1)  # the stage row is left alone
+        self.assertFalse(pipeline.finish_job(cursor, 3, "w", "succeeded"))
+        self.assertFalse(pipeline.heartbeat(cursor, 3, "w"))
+        for call in cursor.execute.call_args_list:
+            self.assertIn("locked_by = %s", call.args[0])
+            self.assertIn("w", call.args[1])
+
+
+class SimilarityIndexCacheTests(TestCase):
+    def setUp(self):
+        similarity.cache.delete(similarity.INDEX_VERSION_KEY)
+        similarity._index = None
+        self.rows = [(1, "TOP", "KR", 90, 10, 50, 50, 50, 50)]
+        patcher = patch.multiple(
+            similarity,
+            connection=MagicMock(),
+            load_pro_playstyle_rows=MagicMock(side_effect=lambda cursor: list(self.rows)),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_index_loaded_once_until_invalidated(self):
+        """Test the pro index is reused per process and rebuilt after invalidation"""
+        first = similarity.get_similarity_index()
+        self.assertIs(similarity.get_similarity_index(), first)
+        self.assertEqual(similarity.load_pro_playstyle_rows.call_count, 1)
+
+        self.rows.append((2, "TOP", "KR", 10, 90, 50, 50, 50, 50))
+        similarity.invalidate_similarity_index()
+        second = similarity.get_similarity_index()
+
+        self.assertEqual(len(second), 2)
+        self.assertEqual(similarity.load_pro_playstyle_rows.call_count, 2)
+
+
+class PlaystyleTablesCacheTests(TestCase):
+    def setUp(self):
+        cache.delete(playstyle.VERSION_KEY.format(season=2025))
+        playstyle._tables.clear()
+        self.aggregates = [(pid, "TOP", 10, np.full(len(FEATURES), float(pid))) for pid in (1, 2, 3)]
+        patcher = patch.multiple(
+            playstyle,
+            connection=MagicMock(),
+            load_role_aggregates=MagicMock(side_effect=lambda cursor, season, player_ids=None: [
+                row for row in self.aggregates if player_ids is None or row[0] in player_ids
+            ]),
+            _score_and_write=MagicMock(return_value=1),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refresh_rebuilds_a_new_version_instead_of_mutating_the_shared_tables(self):
+        """Test a refresh publishes tables rebuilt from the rollup and leaves the old ones untouched"""
+        first = playstyle.get_percentile_tables(2025)
+        self.assertIs(playstyle.get_percentile_tables(2025), first)
+
+        self.aggregates.append((4, "TOP", 10, np.full(len(FEATURES), 4.0)))
+        playstyle.refresh_playstyles([4], 2025)
+
+        second = playstyle.get_percentile_tables(2025)
+        self.assertIsNot(second, first)
+        self.assertEqual((first.size("TOP"), second.size("TOP")), (3, 4))
+        tables, aggregates, _ = playstyle._score_and_write.call_args.args
+        self.assertIs(tables, second)
+        self.assertEqual([row[0] for row in aggregates], [4])
+
+    def test_other_workers_share_a_version_without_rebuilding(self):
+        """Test a worker with an empty memo takes the published version from the shared cache"""
+        built = playstyle.get_percentile_tables(2025)
+        playstyle._tables.clear()
+
+        shared = playstyle.get_percentile_tables(2025)
+
+        self.assertEqual(shared.version, built.version)
+        self.assertEqual(playstyle.load_role_aggregates.call_count, 1)
+
+
+class CoPlayModelCacheTests(TestCase):
+    def setUp(self):
+        cache.delete(recommendations.VERSION_KEY.format(season=2025))
+        recommendations._models.clear()
+        self.rows = [(1, "MIDDLE", 103, 6, 3), (1, "MIDDLE", 7, 4, 2), (2, "MIDDLE", 103, 5, 1)]
+        patcher = patch.multiple(
+            recommendations,
+            connection=MagicMock(),
+            load_pool_rows=MagicMock(side_effect=lambda cursor, season, player_ids=None: (
+                [row for row in self.rows if player_ids is None or row[0] in player_ids], {103: "Ahri", 7: "Leblanc"}
+            )),
+            _recommend_and_write=MagicMock(return_value=1),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refresh_rebuilds_a_new_version_instead_of_mutating_the_shared_model(self):
+        """Test a refresh publishes a model rebuilt from the rollup and leaves the old one untouched"""
+        first = recommendations.get_coplay_model(2025)
+        self.assertIs(recommendations.get_coplay_model(2025), first)
+
+        self.rows.append((3, "MIDDLE", 7, 8, 5))
+        recommendations.refresh_recommendations([3], 2025)
+
+        model, player_ids, _ = recommendations._recommend_and_write.call_args.args
+        self.assertIsNot(model, first)
+        self.assertIs(recommendations.get_coplay_model(2025), model)
+        self.assertEqual(player_ids, [3])
+        self.assertIsNone(first.primary_role(3))
+        self.assertEqual(model.primary_role(3), "MIDDLE")
+
+        recommendations._models.clear()  # another worker: takes the published version as is
+        self.assertEqual(recommendations.get_coplay_model(2025).version, model.version)
+        self.assertEqual(recommendations.load_pool_rows.call_count, 2)
+
+
+class SimilarityRecomputeTests(TestCase):
+    def setUp(self):
+        self.index = SimilarityIndex.from_rows(
+            [
+                (1, "TOP", "KR", 100, 0, 0, 0, 0, 0),
+                (2, "TOP", "KR", 0, 100, 0, 0, 0, 0),
+                (3, "SUPPORT", "KR", 0, 0, 0, 100, 0, 0),
+            ]
+        )
+
+    def test_score_block_top_n(self):
+        """Test score_block keeps the N best pros per player, optionally within the player's role"""
+        rows = [(10, "TOP", 90, 10, 0, 0, 0, 0), (11, "SUPPORT", 0, 0, 0, 90, 0, 0)]
+
+        overall = score_block(self.index, rows, top_n=2)
+        same_role = score_block(self.index, rows, top_n=2, same_role=True)
+
+        self.assertEqual([(p, pro) for p, pro, _ in overall], [(10, 1), (10, 2), (11, 3), (11, 1)])
+        self.assertEqual(sorted((p, pro) for p, pro, _ in same_role), [(10, 1), (10, 2), (11, 3)])
+        self.assertTrue(all(0.0 <= score <= 1.0 for _, _, score in overall))
+
+    def test_write_block_is_one_statement(self):
+        """Test write_block upserts and prunes a block with a single statement"""
+        cursor = MagicMock()
+        cursor.mogrify.return_value = b"ARRAY[10,11]"
+
+        with patch("apps.rift.services.similarity_matches.execute_values", return_value=[(1,)] * 3) as values, patch(
+            "apps.rift.services.similarity_matches.invalidate_player_pages"
+        ) as invalidate:
+            changed = write_block(cursor, [10, 11], [(10, 1, 0.9), (10, 2, 0.5), (11, 3, 0.8)])
+
+        self.assertEqual(changed, 3)
+        invalidate.assert_called_once_with([10, 11], "similarity")
+        sql = values.call_args.args[1]
+        self.assertIn("DELETE FROM league_similarity_matches", sql)
+        self.assertIn("ANY(ARRAY[10,11])", sql)
+        self.assertIn("ON CONFLICT (player_id, pro_player_id) DO UPDATE", sql)
+        self.assertEqual(values.call_args.kwargs["page_size"], 3)
+
+
+class ChampionCatalogTests(TestCase):
+    CHAMPIONS = [
+        Champion(1, 103, "Ahri", "Ahri", "the Nine-Tailed Fox", "https://cdn/15.1.1/Ahri.png"),
+        Champion(2, 950, "Naafiri", "Naafiri", "the Hound of a Hundred Bites", "https://cdn/15.1.1/Naafiri.png"),
+    ]
+
+    def setUp(self):
+        champions.reset_champion_catalog()
+        self.addCleanup(champions.reset_champion_catalog)
+        self.version = ("15.1.1", 1)
+        patcher = patch.multiple(
+            champions,
+            connection=MagicMock(),
+            load_catalog_version=MagicMock(side_effect=lambda cursor: self.version),
+            load_champion_catalog=MagicMock(
+                side_effect=lambda cursor: champions.ChampionCatalog(self.CHAMPIONS, self.version)
+            ),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lookups(self):
+        """Test the catalog resolves ids and keys and cannot be modified"""
+        catalog = champions.ChampionCatalog(self.CHAMPIONS)
+
+        self.assertEqual(catalog.name(950), "Naafiri")
+        self.assertEqual(catalog.by_key("Ahri").champion_id, 103)
+        self.assertIsNone(catalog.get(5000))
+        self.assertEqual(catalog.name(-1, "?"), "?")
+        self.assertEqual(catalog.icons([103, 7]), {103: "https://cdn/15.1.1/Ahri.png"})
+        with self.assertRaises(AttributeError):
+            catalog.version = "x"
+
+    def test_refresh_only_when_version_moves(self):
+        """Test workers reuse the snapshot, recheck the stamp after CHECK_INTERVAL and reload on change"""
+        first = champions.get_champion_catalog()
+        self.assertIs(champions.get_champion_catalog(), first)
+        self.assertEqual(champions.load_catalog_version.call_count, 0)
+
+        champions._checked_at -= champions.CHECK_INTERVAL
+        self.assertIs(champions.get_champion_catalog(), first)
+        self.assertEqual(champions.load_catalog_version.call_count, 1)
+
+        self.version = ("15.2.1", 2)
+        champions._checked_at -= champions.CHECK_INTERVAL
+        second = champions.get_champion_catalog()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.version, ("15.2.1", 2))
+        self.assertEqual(champions.load_champion_catalog.call_count, 2)
+
+
+class ChampionStatsTests(TestCase):
+    def test_rollup_sql_groups_once_and_upserts_both_tables(self):
+        """Test one statement groups the new rows once and adds them onto both rollups"""
+        sql = champion_stats.rollup_sql("id = ANY(%s)")
+
+        self.assertEqual(sql.count("FROM league_player_match_metrics"), 1)
+        self.assertIn("INSERT INTO league_player_champion_stats AS t", sql)
+        self.assertIn("INSERT INTO league_role_champion_stats AS t", sql)
+        self.assertIn("ON CONFLICT (player_id, season, role, champion_id) DO UPDATE", sql)
+        self.assertIn("ON CONFLICT (season, role, champion_id) DO UPDATE", sql)
+        self.assertIn("FROM delta WHERE role <> ''", sql)
+        for name in champion_stats.STAT_COLUMNS[1:]:
+            self.assertIn(f"{name} = t.{name} + EXCLUDED.{name}", sql)
+
+    def test_write_batch_updates_rollups_in_the_same_transaction(self):
+        """Test write_batch folds exactly the inserted metrics ids into the rollups on its own cursor"""
+        cursor = MagicMock()
+        rows = [(match_pk,) + (None,) * (len(METRICS_COLUMNS) - 1) for match_pk in (10, 11, 12)]
+        with patch(
+            "apps.rift.services.metrics_extraction.execute_values", return_value=[(31, 1), (32, 2)]
+        ), patch("apps.rift.services.metrics_extraction.invalidate_player_pages") as invalidate:
+            written = write_batch(cursor, rows, [10, 11, 12])
+
+        self.assertEqual(written, 2)
+        rollup = cursor.execute.call_args_list[0]
+        self.assertIn("league_player_champion_stats", rollup.args[0])
+        self.assertEqual(rollup.args[1], ([31, 32],))
+        self.assertEqual(list(invalidate.call_args.args[0]), [1, 2])
+
+    def test_write_batch_invalidates_matches_and_metrics_pages(self):
+        """Test write_batch bumps the match pages of every owner and the metrics pages of players with new rows"""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(1,), (2,), (3,)]
+        rows = [(match_pk,) + (None,) * (len(METRICS_COLUMNS) - 1) for match_pk in (10, 11)]
+        with patch(
+            "apps.rift.services.metrics_extraction.execute_values", return_value=[(31, 1), (32, 2)]
+        ), patch("apps.rift.services.metrics_extraction.invalidate_player_pages") as invalidate:
+            write_batch(cursor, rows, [10, 11, 12])
+
+        bumped = {c.args[1:]: set(c.args[0]) for c in invalidate.call_args_list}
+        self.assertEqual(bumped, {("matches",): {1, 2, 3}, ("metrics",): {1, 2}})
+        self.assertIn("RETURNING player_id", cursor.execute.call_args.args[0])
+
+    def test_player_champions_cards(self):
+        """Test champion cards carry the player's averages and the role baseline (none without a role)"""
+        cursor = MagicMock()
+        width = len(champion_stats.CARD_MEASURES)
+        cursor.fetchall.return_value = [
+            (103, "Ahri", "MIDDLE", 4, 3, *[1.0] * width, 100, 50, *[2.0] * width),
+            (950, "Naafiri", None, 2, 0, *[None] * width, None, None, *[None] * width),
+        ]
+        catalog = champions.ChampionCatalog(ChampionCatalogTests.CHAMPIONS)
+
+        with patch.object(champion_stats, "get_champion_catalog", return_value=catalog):
+            cards = champion_stats.load_player_champions(cursor, 7, 2025, limit=2)
+
+        self.assertEqual(cursor.execute.call_args.args[1], (7, 2025, 2025, 2))
+        ahri, naafiri = cards
+        self.assertEqual((ahri["games"], ahri["win_rate"], ahri["kda"]), (4, 0.75, 1.0))
+        self.assertEqual(ahri["champion_icon_url"], "https://cdn/15.1.1/Ahri.png")
+        self.assertEqual(
+            ahri["role_average"], {"games": 100, "win_rate": 0.5, **dict.fromkeys(champion_stats.CARD_MEASURES, 2.0)}
+        )
+        self.assertIsNone(naafiri["role"])
+        self.assertIsNone(naafiri["role_average"])
+
+
+class PartitionsTests(TestCase):
+    BOUND_2025 = "FOR VALUES FROM ('1735689600000') TO ('1767225600000')"
+
+    def partition_rows(self, with_season: bool):
+        """list_partitions() rows of both tables: the default partition, plus 2025 when with_season."""
+        season = [("{}_s2025", self.BOUND_2025, 10, 65536)] if with_season else []
+        return [
+            [(name.format(table), bound, rows, size) for name, bound, rows, size in
+             [("{}_default", "DEFAULT", 0, 8192)] + season]
+            for table in partitions.PARTITIONED
+        ]
+
+    def test_list_partitions_reads_seasons_from_bounds(self):
+        """Test partition bounds map back to their season and the default partition has none"""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = self.partition_rows(True)[0]
+
+        listed = partitions.list_partitions(cursor, "league_matches")
+
+        self.assertEqual([(p.name, p.season) for p in listed], [
+            ("league_matches_default", None), ("league_matches_s2025", 2025),
+        ])
+        self.assertEqual(cursor.execute.call_args.args[1], ("league_matches",))
+
+    def test_create_season_moves_metrics_before_matches(self):
+        """Test a new season is built detached, filled from the defaults metrics first, then attached matches first"""
+        cursor = MagicMock(rowcount=3)
+        cursor.fetchall.side_effect = self.partition_rows(False)
+
+        moved = partitions.create_season(cursor, 2025)
+
+        self.assertEqual(moved, 6)
+        sql = [c.args[0] for c in cursor.execute.call_args_list[2:]]
+        self.assertIn("CREATE TABLE league_player_match_metrics_s2025 (LIKE league_player_match_metrics", sql[0])
+        self.assertIn("DELETE FROM league_player_match_metrics_default WHERE match_recorded_at >= %s", sql[1])
+        self.assertIn("DELETE FROM league_matches_default WHERE match_timestamp >= %s", sql[3])
+        self.assertEqual(sql[4], "ALTER TABLE league_matches ATTACH PARTITION league_matches_s2025 "
+                                 "FOR VALUES FROM (%s) TO (%s)")
+        self.assertEqual(cursor.execute.call_args.args[1], (1735689600000, 1767225600000))
+
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = self.partition_rows(True)
+        self.assertIsNone(partitions.create_season(cursor, 2025))
+        self.assertEqual(cursor.execute.call_count, 2)
+
+    def test_detach_season_drops_foreign_keys_and_invalidates_pages(self):
+        """Test detaching drops the season's chapters, then archives metrics before matches without their FK"""
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = self.partition_rows(True) + [
+            [(7,), (8,)], [("fk_metrics_match",)], [],
+        ]
+
+        with patch("apps.rift.services.partitions.invalidate_player_pages") as invalidate:
+            detached = partitions.detach_season(cursor, 2025, archive_schema="archive")
+
+        self.assertEqual(detached, ["league_matches_s2025", "league_player_match_metrics_s2025"])
+        sql = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertIn("ALTER TABLE league_player_match_metrics DETACH PARTITION league_player_match_metrics_s2025", sql)
+        self.assertLess(
+            sql.index("ALTER TABLE league_player_match_metrics DETACH PARTITION league_player_match_metrics_s2025"),
+            sql.index("ALTER TABLE league_matches DETACH PARTITION league_matches_s2025"),
+        )
+        self.assertIn('ALTER TABLE league_player_match_metrics_s2025 DROP CONSTRAINT "fk_metrics_match"', sql)
+        self.assertIn("ALTER TABLE league_matches_s2025 SET SCHEMA archive", sql)
+        # chapter links reference the season's matches: they go before the partitions detach
+        self.assertLess(
+            sql.index("DELETE FROM league_player_chapters WHERE season = %s"),
+            sql.index("ALTER TABLE league_player_match_metrics DETACH PARTITION league_player_match_metrics_s2025"),
+        )
+        invalidate.assert_called_once_with([7, 8], "matches", "metrics", "chapters")
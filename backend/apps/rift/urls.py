@@ -1,8 +1,21 @@
 from django.urls import path
 
-# from .views import MeView, RegisterView
+from .views import (
+    PipelineJobView,
+    PlayerChampionStatsView,
+    PlayerMatchHistoryView,
+    PlayerMetricsListView,
+    PlayerPipelineJobView,
+    PlayerTimeSeriesView,
+    PlayerYearView,
+)
 
 urlpatterns = [
-    # path("signup/", RegisterView.as_view(), name="signup"),
-    # path("profile/", MeView.as_view(), name="profile"),
+    path("players/<str:puuid>/matches/", PlayerMatchHistoryView.as_view(), name="player-matches"),
+    path("players/<str:puuid>/metrics/", PlayerMetricsListView.as_view(), name="player-metrics"),
+    path("players/<str:puuid>/timeseries/", PlayerTimeSeriesView.as_view(), name="player-timeseries"),
+    path("players/<str:puuid>/champions/", PlayerChampionStatsView.as_view(), name="player-champions"),
+    path("players/<str:puuid>/year/", PlayerYearView.as_view(), name="player-year"),
+    path("players/<str:puuid>/jobs/", PlayerPipelineJobView.as_view(), name="player-pipeline-jobs"),
+    path("jobs/<int:job_id>/", PipelineJobView.as_view(), name="pipeline-job"),
 ]
@@ -0,0 +1,5 @@
+from .champions import PlayerChampionStatsView
+from .history import PlayerMatchHistoryView, PlayerMetricsListView
+from .jobs import PipelineJobView, PlayerPipelineJobView
+from .timeseries import PlayerTimeSeriesView
+from .year import PlayerYearView
@@ -0,0 +1,29 @@
+from django.db import connection
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.rift.page_cache import cached_player_page
+from apps.rift.serializers import ChampionStatsQuerySerializer
+from apps.rift.services.champion_stats import load_player_champions
+from apps.rift.services.players import get_player_by_puuid
+
+
+class PlayerChampionStatsView(APIView):
+    """Most played champion cards for a season, read from the champion rollups."""
+
+    permission_classes = [permissions.AllowAny]
+
+    @cached_player_page("champions")
+    def get(self, request, puuid):
+        query = ChampionStatsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        with connection.cursor() as cursor:
+            player = get_player_by_puuid(cursor, puuid)
+            if player is None:
+                raise NotFound("Player not found.")
+            champions = load_player_champions(cursor, player.id, params["season"], params["limit"])
+        return Response({"season": params["season"], "champions": champions})
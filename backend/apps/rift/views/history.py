@@ -0,0 +1,67 @@
+from django.db import connection
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
+
+from apps.rift.page_cache import cached_player_page
+from apps.rift.services.history import (
+    MATCH_COLUMNS,
+    MATCH_TABLE,
+    MATCH_TIMESTAMP,
+    METRICS_COLUMNS,
+    METRICS_TABLE,
+    METRICS_TIMESTAMP,
+    rows_to_dicts,
+)
+from apps.rift.services.players import get_player_by_puuid
+from middlewares.pagenation import KeysetPagination
+
+
+class _PlayerKeysetListView(APIView):
+    """Newest-first list of one player's rows, paged with ?cursor= (see KeysetPagination)."""
+
+    permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    table: str
+    columns: tuple
+    timestamp_column: str
+
+    def get(self, request, puuid):
+        paginator = self.pagination_class()
+        with connection.cursor() as cursor:
+            player = get_player_by_puuid(cursor, puuid)
+            if player is None:
+                raise NotFound("Player not found.")
+            rows = paginator.paginate_query(
+                cursor,
+                request,
+                table=self.table,
+                columns=self.columns,
+                timestamp_column=self.timestamp_column,
+                player_id=player.id,
+            )
+        return paginator.get_paginated_response(rows_to_dicts(self.columns, rows))
+
+
+class PlayerMatchHistoryView(_PlayerKeysetListView):
+    """Match history: league_matches rows without raw_data."""
+
+    table = MATCH_TABLE
+    columns = MATCH_COLUMNS
+    timestamp_column = MATCH_TIMESTAMP
+
+    @cached_player_page("matches")
+    def get(self, request, puuid):
+        return super().get(request, puuid)
+
+
+class PlayerMetricsListView(_PlayerKeysetListView):
+    """Per-game processed metrics (league_player_match_metrics)."""
+
+    table = METRICS_TABLE
+    columns = METRICS_COLUMNS
+    timestamp_column = METRICS_TIMESTAMP
+
+    @cached_player_page("metrics")
+    def get(self, request, puuid):
+        return super().get(request, puuid)
@@ -0,0 +1,68 @@
+from dataclasses import asdict
+
+from django.db import connection
+from django.urls import reverse
+from rest_framework import permissions, status
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.rift.serializers import PipelineJobRequestSerializer
+from apps.rift.services.pipeline import ACTIVE_STATUSES, enqueue_job, get_job
+from apps.rift.services.players import get_player_by_puuid
+from common.models.pipeline_job import PipelineJob
+
+# Clients poll the job's status URL about this often while it is queued or running
+POLL_AFTER_SECONDS = 2
+
+
+def job_payload(job: PipelineJob) -> dict:
+    payload = asdict(job)
+    payload["progress"] = round(job.progress, 3)
+    return payload
+
+
+def enqueued_response(request, job: PipelineJob, created: bool) -> Response:
+    """202 for a new job, 200 for the live job it deduped to; both point at the job's status URL."""
+    headers = {
+        "Location": request.build_absolute_uri(reverse("pipeline-job", args=[job.id])),
+        "Retry-After": str(POLL_AFTER_SECONDS),
+    }
+    return Response(
+        job_payload(job), status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK, headers=headers
+    )
+
+
+class PlayerPipelineJobView(APIView):
+    """
+    POST queues the full pipeline (fetch -> metrics -> chapters -> playstyle -> similarity ->
+    recommendations) for the player's season and returns the job at once: 202 for a new job,
+    200 with the job already queued/running for the same player and season. Poll the
+    Location URL (PipelineJobView) for progress.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, puuid):
+        query = PipelineJobRequestSerializer(data=request.data)
+        query.is_valid(raise_exception=True)
+        with connection.cursor() as cursor:
+            player = get_player_by_puuid(cursor, puuid)
+            if player is None:
+                raise NotFound("Player not found.")
+            job, created = enqueue_job(cursor, player, query.validated_data["season"])
+        return enqueued_response(request, job, created)
+
+
+class PipelineJobView(APIView):
+    """Status of one pipeline job: overall status, current stage, progress and per-stage timings."""
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, job_id):
+        with connection.cursor() as cursor:
+            job = get_job(cursor, job_id)
+        if job is None:
+            raise NotFound("Job not found.")
+        headers = {"Retry-After": str(POLL_AFTER_SECONDS)} if job.status in ACTIVE_STATUSES else {}
+        return Response(job_payload(job), headers=headers)
@@ -0,0 +1,46 @@
+import numpy as np
+from django.db import connection
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.rift.page_cache import cached_player_page
+from apps.rift.renderers import ColumnarBinaryRenderer
+from apps.rift.serializers import TimeSeriesQuerySerializer
+from apps.rift.services.players import get_player_by_puuid
+from apps.rift.services.timeseries import build_time_series
+from middlewares.ok_middleware import OkJSONRenderer
+
+
+class PlayerTimeSeriesView(APIView):
+    """Page 2: per-game metric columns for a season, downsampled to a point budget."""
+
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = [OkJSONRenderer, ColumnarBinaryRenderer]
+
+    @cached_player_page("timeseries")
+    def get(self, request, puuid):
+        query = TimeSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        with connection.cursor() as cursor:
+            player = get_player_by_puuid(cursor, puuid)
+            if player is None:
+                raise NotFound("Player not found.")
+            payload = build_time_series(
+                cursor,
+                player.id,
+                params["season"],
+                points=params["points"],
+                mode=params["mode"],
+                win_rate_window=params["window"],
+            )
+
+        if request.accepted_renderer.format != ColumnarBinaryRenderer.format:
+            # OkJSONRenderer writes the arrays as is (NaN -> null); 4 decimals is plenty for a chart
+            payload["columns"] = {
+                name: np.round(col, 4) if col.dtype.kind == "f" else col for name, col in payload["columns"].items()
+            }
+        return Response(payload)
@@ -0,0 +1,70 @@
+import asyncio
+
+from django.db import connection
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from apps.rift.page_cache import cached_player_page
+from apps.rift.serializers import YearQuerySerializer
+from apps.rift.services.pipeline import enqueue_job
+from apps.rift.services.players import get_player_by_puuid
+from apps.rift.services.year import load_chapters, load_recommendations, load_similarity
+from apps.rift.views.jobs import enqueued_response
+from common.utils.db_util import db_sync_to_async
+from middlewares.async_view import AsyncAPIView
+
+
+@db_sync_to_async
+def _read(loader, *args):
+    with connection.cursor() as cursor:
+        return loader(cursor, *args)
+
+
+async def _player(puuid: str):
+    player = await _read(get_player_by_puuid, puuid)
+    if player is None:
+        raise NotFound("Player not found.")
+    return player
+
+
+async def gather_year(player_id: int, season: int) -> dict:
+    """Chapters, similarity and recommendations, read concurrently on separate connections."""
+    chapters, similarity, recommendations = await asyncio.gather(
+        _read(load_chapters, player_id, season),
+        _read(load_similarity, player_id),
+        _read(load_recommendations, player_id),
+    )
+    return {"season": season, "chapters": chapters, "similarity": similarity, "recommendations": recommendations}
+
+
+class PlayerYearView(AsyncAPIView):
+    """
+    Pages 1, 3 and 4 in one response: GET reads them, POST ("analyze my year") queues the
+    pipeline job that syncs new matches and refreshes everything derived from them, and answers
+    like PlayerPipelineJobView (202 + the job's status URL; 200 with the live job when one is
+    already queued or running for the player's season). Nothing here holds a worker while
+    waiting on the database.
+    """
+
+    def get_permissions(self):
+        if self.request.method == "POST":
+            return [permissions.IsAuthenticated()]
+        return [permissions.AllowAny()]
+
+    def season(self, request) -> int:
+        query = YearQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return query.validated_data["season"]
+
+    @cached_player_page("year")
+    async def get(self, request, puuid):
+        season = self.season(request)
+        player = await _player(puuid)
+        return Response(await gather_year(player.id, season))
+
+    async def post(self, request, puuid):
+        season = self.season(request)
+        player = await _player(puuid)
+        job, created = await _read(enqueue_job, player, season)
+        return enqueued_response(request, job, created)
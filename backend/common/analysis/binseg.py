@@ -0,0 +1,156 @@
+import heapq
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.models.player_match_metrics import PlayerMatchMetrics
+
+# Page 1 shows between 2 and 5 chapter cards
+MIN_SEGMENTS = 2
+MAX_SEGMENTS = 5
+MIN_SEGMENT_SIZE = 5          # games
+DEFAULT_PENALTY = 3.0         # multiplied by d * log(n), BIC-like
+DEFAULT_SMOOTH = 5            # games; per-game win/loss is too noisy to segment raw
+
+# PlayerMatchMetrics fields that chapters are segmented on
+CHAPTER_FEATURES = ("win", "kda_ratio", "cs_per_min", "damage_per_min", "vision_score_per_min")
+
+
+class _PrefixCost:
+    """
+    L2 cost (sum of squared deviations from the segment mean, summed over columns)
+    for any segment [a, b) in O(d) from prefix sums of x and x**2.
+    """
+
+    def __init__(self, x: np.ndarray):
+        zeros = np.zeros((1, x.shape[1]))
+        self.s1 = np.vstack([zeros, np.cumsum(x, axis=0)])
+        self.s2 = np.vstack([zeros, np.cumsum(x * x, axis=0)])
+
+    def cost(self, a: int, b: int) -> float:
+        s1 = self.s1[b] - self.s1[a]
+        return float((self.s2[b] - self.s2[a]).sum() - (s1 * s1).sum() / (b - a))
+
+    def best_split(self, a: int, b: int, min_size: int) -> Tuple[float, int]:
+        """Best single split of [a, b): all candidates are scored at once. Returns (gain, t)."""
+        ts = np.arange(a + min_size, b - min_size + 1)
+        if ts.size == 0:
+            return 0.0, -1
+        left = self.s1[ts] - self.s1[a]
+        right = self.s1[b] - self.s1[ts]
+        n_left = (ts - a)[:, None]
+        n_right = (b - ts)[:, None]
+        total = self.s1[b] - self.s1[a]
+        # cost(a,t) + cost(t,b) = const - |S_l|²/n_l - |S_r|²/n_r, so maximise the two mean terms
+        score = (left * left / n_left).sum(axis=1) + (right * right / n_right).sum(axis=1)
+        best = int(np.argmax(score))
+        gain = float(score[best] - (total * total).sum() / (b - a))
+        return gain, int(ts[best])
+
+
+def feature_matrix(metrics: Sequence[PlayerMatchMetrics], features: Sequence[str] = CHAPTER_FEATURES) -> np.ndarray:
+    """Chronological metrics -> (n_games, n_features) float matrix (None -> NaN)."""
+    return np.array(
+        [[np.nan if getattr(m, f) is None else float(getattr(m, f)) for f in features] for m in metrics],
+        dtype=np.float64,
+    ).reshape(len(metrics), len(features))
+
+
+def standardize(x: np.ndarray) -> np.ndarray:
+    """Column z-scores; NaNs become the column mean (0) and constant columns stay 0."""
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    mean = np.nanmean(x, axis=0) if x.size else np.zeros(x.shape[1])
+    mean = np.where(np.isnan(mean), 0.0, mean)
+    std = np.nanstd(x, axis=0) if x.size else np.ones(x.shape[1])
+    std = np.where((std > 0) & ~np.isnan(std), std, 1.0)
+    z = (x - mean) / std
+    return np.where(np.isnan(z), 0.0, z)
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling mean along axis 0 (shorter window at the start), via prefix sums."""
+    if window <= 1:
+        return x
+    csum = np.vstack([np.zeros((1, x.shape[1])), np.cumsum(x, axis=0)])
+    idx = np.arange(1, x.shape[0] + 1)
+    lo = np.maximum(idx - window, 0)
+    return (csum[idx] - csum[lo]) / (idx - lo)[:, None]
+
+
+def binseg(
+    x: np.ndarray,
+    min_segments: int = MIN_SEGMENTS,
+    max_segments: int = MAX_SEGMENTS,
+    min_size: int = MIN_SEGMENT_SIZE,
+    penalty: Optional[float] = DEFAULT_PENALTY,
+    smooth: int = 1,
+) -> List[int]:
+    """
+    Binary segmentation of a (n, d) series (1-d input is treated as d = 1).
+    Returns segment end indices (exclusive), last one == n, e.g. [34, 80, 120].
+
+    Segments are split greedily by largest cost reduction. Splitting stops at max_segments,
+    or once min_segments is reached and the best gain is below penalty * d * log(n).
+    Each split scans its segment once with vectorised prefix sums, so a season is ~O(n log n).
+    """
+    x = rolling_mean(standardize(x), smooth)
+    n, d = x.shape
+    if n == 0:
+        return []
+    max_segments = max(1, min(max_segments, n // max(min_size, 1)))
+    min_segments = min(min_segments, max_segments)
+    threshold = -math.inf if penalty is None else penalty * d * math.log(max(n, 2))
+
+    costs = _PrefixCost(x)
+    heap: List[Tuple[float, int, int, int]] = []
+
+    def push(a: int, b: int):
+        gain, t = costs.best_split(a, b, min_size)
+        if t >= 0:
+            heapq.heappush(heap, (-gain, a, b, t))
+
+    breaks = [n]
+    push(0, n)
+    while heap and len(breaks) < max_segments:
+        neg_gain, a, b, t = heapq.heappop(heap)
+        if -neg_gain < threshold and len(breaks) >= min_segments:
+            break
+        breaks.append(t)
+        push(a, t)
+        push(t, b)
+    return sorted(breaks)
+
+
+def segments(breaks: Sequence[int]) -> List[Tuple[int, int]]:
+    """[34, 80, 120] -> [(0, 34), (34, 80), (80, 120)]"""
+    out, start = [], 0
+    for end in breaks:
+        out.append((start, end))
+        start = end
+    return out
+
+
+def _binseg_chunk(args) -> List[List[int]]:
+    series, kwargs = args
+    return [binseg(x, **kwargs) for x in series]
+
+
+def binseg_batch(series: Sequence[np.ndarray], workers: int = 1, chunk_size: int = 256, **kwargs) -> List[List[int]]:
+    """
+    Segment many players' series. With workers > 1 chunks of players are spread over a
+    process pool; results keep the input order.
+    """
+    if workers <= 1 or len(series) <= chunk_size:
+        return _binseg_chunk((series, kwargs))
+    chunks = [(list(series[i:i + chunk_size]), kwargs) for i in range(0, len(series), chunk_size)]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        out: List[List[int]] = []
+        for result in pool.map(_binseg_chunk, chunks):
+            out.extend(result)
+    return out
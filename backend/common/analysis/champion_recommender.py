@@ -0,0 +1,196 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+MIN_SIZE = 1024               # champion ids index the matrix columns directly
+TOP_N = 3                     # league_champion_recommendations keeps rank 1~3
+WIN_PRIOR_GAMES = 5.0         # win rates are shrunk towards 50% by this many pseudo-games
+POPULARITY_PRIOR = 1.0        # damps champions only a handful of players touch
+
+# (player_id, role, champion_id, games, wins)
+PoolRow = Tuple[int, str, int, int, int]
+
+
+def _affinities(games: np.ndarray, wins: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Play weight log1p(games) and the same weight scaled by smoothed win rate (1.0 at 50%)."""
+    play = np.log1p(games)
+    win_rate = (wins + WIN_PRIOR_GAMES / 2) / (games + WIN_PRIOR_GAMES)
+    return play, play * 2.0 * win_rate
+
+
+class CoPlayModel:
+    """
+    Champion x champion co-play matrices, one per role, as SciPy CSR.
+
+    Every (player, role) contributes the outer product a^T b of its pool vectors: a is the
+    L2-normalised play weight per champion, b the same weighted by how well they win on it.
+    C[i, j] is then "players who play i win on j". Because C is a plain sum over players, new
+    games for a player are applied exactly by subtracting their old outer product and adding the
+    new one. popularity (sum of a) and raw games/wins per champion are kept alongside.
+
+    A player's candidates are one sparse product a @ C (cosine-scaled by popularity), minus the
+    champions already in their pool.
+    """
+
+    def __init__(self, size: int = MIN_SIZE, version=None):
+        self.size = size
+        self.version = version
+        self.matrices: Dict[str, sp.csr_matrix] = {}
+        self.popularity: Dict[str, np.ndarray] = {}
+        self.games: Dict[str, np.ndarray] = {}
+        self.wins: Dict[str, np.ndarray] = {}
+        # (player_id, role) -> (champion ids, a, b, games, wins)
+        self.pools: Dict[Tuple[int, str], Tuple[np.ndarray, ...]] = {}
+        self.role_games: Dict[int, Dict[str, float]] = {}
+        self.names: Dict[int, str] = {}
+
+    # ---- building / incremental updates ----
+
+    @staticmethod
+    def _group(rows: Iterable[PoolRow]) -> Dict[Tuple[int, str], Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        grouped: Dict[Tuple[int, str], List[Tuple[int, int, int]]] = {}
+        for player_id, role, champion_id, games, wins in rows:
+            if role and games > 0:
+                grouped.setdefault((player_id, role), []).append((champion_id, games, wins))
+        out = {}
+        for key, items in grouped.items():
+            arr = np.asarray(items, dtype=np.int64)
+            out[key] = (arr[:, 0], arr[:, 1].astype(np.float64), arr[:, 2].astype(np.float64))
+        return out
+
+    def _vectors(self, champions: np.ndarray, games: np.ndarray, wins: np.ndarray):
+        play, perf = _affinities(games, wins)
+        norm = np.linalg.norm(play)
+        norm = norm if norm > 0 else 1.0
+        return champions, play / norm, perf / norm, games, wins
+
+    def _stack(self, entries: Sequence[tuple]) -> Tuple[sp.csr_matrix, sp.csr_matrix]:
+        rows = np.concatenate([np.full(len(e[0]), i) for i, e in enumerate(entries)]) if entries else np.empty(0, int)
+        cols = np.concatenate([e[0] for e in entries]) if entries else np.empty(0, int)
+        shape = (len(entries), self.size)
+        a = sp.csr_matrix((np.concatenate([e[1] for e in entries]) if entries else [], (rows, cols)), shape=shape)
+        b = sp.csr_matrix((np.concatenate([e[2] for e in entries]) if entries else [], (rows, cols)), shape=shape)
+        return a, b
+
+    def _ensure_size(self, max_champion_id: int):
+        if max_champion_id < self.size:
+            return
+        self.size = max(self.size * 2, max_champion_id + 1)
+        for role, matrix in self.matrices.items():
+            matrix.resize((self.size, self.size))
+            for counts in (self.popularity, self.games, self.wins):
+                counts[role] = np.pad(counts[role], (0, self.size - len(counts[role])))
+
+    def _apply(self, role: str, removed: List[tuple], added: List[tuple]):
+        if role not in self.matrices:
+            self.matrices[role] = sp.csr_matrix((self.size, self.size))
+            for counts in (self.popularity, self.games, self.wins):
+                counts[role] = np.zeros(self.size)
+        delta = sp.csr_matrix((self.size, self.size))
+        for entries, sign in ((removed, -1.0), (added, 1.0)):
+            if not entries:
+                continue
+            a, b = self._stack(entries)
+            delta = delta + sign * (a.T @ b)
+            self.popularity[role] += sign * np.asarray(a.sum(axis=0)).ravel()
+            for e in entries:
+                np.add.at(self.games[role], e[0], sign * e[3])
+                np.add.at(self.wins[role], e[0], sign * e[4])
+        matrix = (self.matrices[role] + delta).tocsr()
+        matrix.setdiag(0.0)
+        # float residue from subtract/add cycles
+        matrix.data[np.abs(matrix.data) < 1e-12] = 0.0
+        matrix.eliminate_zeros()
+        self.matrices[role] = matrix
+
+    def update(self, rows: Iterable[PoolRow], names: Optional[Dict[int, str]] = None):
+        """Replace the pools of every (player, role) present in rows; a full build is update() on an empty model."""
+        grouped = self._group(rows)
+        if names:
+            self.names.update(names)
+        if grouped:
+            self._ensure_size(max(int(c.max()) for c, _, _ in grouped.values()))
+        removed: Dict[str, List[tuple]] = {}
+        added: Dict[str, List[tuple]] = {}
+        for (player_id, role), (champions, games, wins) in grouped.items():
+            previous = self.pools.get((player_id, role))
+            if previous is not None:
+                removed.setdefault(role, []).append(previous)
+            entry = self._vectors(champions, games, wins)
+            self.pools[(player_id, role)] = entry
+            self.role_games.setdefault(player_id, {})[role] = float(games.sum())
+            added.setdefault(role, []).append(entry)
+        for role in set(removed) | set(added):
+            self._apply(role, removed.get(role, []), added.get(role, []))
+
+    @classmethod
+    def build(cls, rows: Iterable[PoolRow], names: Optional[Dict[int, str]] = None, version=None) -> "CoPlayModel":
+        model = cls(version=version)
+        model.update(rows, names)
+        return model
+
+    # ---- scoring ----
+
+    def primary_role(self, player_id: int) -> Optional[str]:
+        roles = self.role_games.get(player_id)
+        return max(roles, key=roles.get) if roles else None
+
+    def recommend(self, role: str, player_ids: Sequence[int], top_n: int = TOP_N) -> List[List[Tuple[int, float, int]]]:
+        """
+        Batched: one sparse (m x n) @ (n x n) product for the role's players.
+        Returns per player [(champion_id, score, strongest pool champion behind it), ...] best first.
+        """
+        matrix = self.matrices.get(role)
+        entries = [self.pools.get((pid, role)) for pid in player_ids]
+        if matrix is None or not player_ids:
+            return [[] for _ in player_ids]
+        present = [e for e in entries if e is not None]
+        if not present:
+            return [[] for _ in player_ids]
+        a, _ = self._stack(present)
+        damp = 1.0 / np.sqrt(np.maximum(self.popularity[role], 0.0) + POPULARITY_PRIOR)
+        a_scaled = sp.csr_matrix(a.multiply(damp[None, :]))
+        scores = (a_scaled @ matrix).toarray() * damp[None, :]
+        scores[a.toarray() > 0] = -np.inf               # already in the pool
+        scores[:, self.games[role] <= 0] = -np.inf       # never played in this role
+        scores[scores <= 0] = -np.inf                    # no co-play evidence at all
+
+        k = min(top_n, self.size)
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        # the pool champion contributing most to each pick: argmax_i a_scaled[u, i] * C[i, pick]
+        weights = a_scaled.toarray()
+        columns = matrix.tocsc()
+        because = np.empty_like(best)
+        for r in range(k):
+            because[:, r] = np.argmax(weights * columns[:, best[:, r]].toarray().T, axis=1)
+
+        out: List[List[Tuple[int, float, int]]] = []
+        row = 0
+        for entry in entries:
+            if entry is None:
+                out.append([])
+                continue
+            out.append([
+                (int(c), float(v), int(b))
+                for c, v, b in zip(best[row], best_scores[row], because[row])
+                if np.isfinite(v)
+            ])
+            row += 1
+        return out
+
+    def win_rate(self, role: str, champion_id: int) -> float:
+        games = self.games[role][champion_id]
+        return float(self.wins[role][champion_id] / games) if games > 0 else 0.0
+
+    def reason(self, role: str, champion_id: int, because_of: int) -> str:
+        name = self.names.get(champion_id, str(champion_id))
+        source = self.names.get(because_of, str(because_of))
+        return (
+            f"Players who do well on {source} also win {self.win_rate(role, champion_id) * 100:.0f}% "
+            f"of their {name} games as {role}."
+        )
@@ -0,0 +1,129 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.analysis.binseg import CHAPTER_FEATURES, DEFAULT_SMOOTH, binseg, segments
+from common.models.player_chapter import PlayerChapter
+
+# Per-game columns a season is loaded with (chronological order)
+SEASON_COLUMNS = (
+    "match_id", "match_recorded_at", "win", "kills", "deaths", "assists", "kda_ratio",
+    "cs_per_min", "damage_per_min", "vision_score_per_min", "champion_id", "champion_name",
+)
+_NUMERIC = ("win", "kills", "deaths", "assists", "kda_ratio", "cs_per_min", "damage_per_min", "vision_score_per_min")
+
+# Value that maps to a 100 score (linear, clipped) until role-relative percentiles are available
+SCORE_CAPS = {
+    "kda_score": ("kda_ratio", 6.0),
+    "cs_score": ("cs_per_min", 10.0),
+    "damage_score": ("damage_per_min", 1000.0),
+    "vision_score": ("vision_score_per_min", 2.5),
+}
+
+
+def season_arrays(rows: Sequence[tuple]) -> Dict[str, np.ndarray]:
+    """Rows in SEASON_COLUMNS order -> one array per column (NULL numerics -> NaN)."""
+    columns = list(zip(*rows)) if rows else [()] * len(SEASON_COLUMNS)
+    out: Dict[str, np.ndarray] = {}
+    for name, values in zip(SEASON_COLUMNS, columns):
+        if name in _NUMERIC:
+            out[name] = np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+        elif name == "champion_name":
+            out[name] = np.array(values, dtype=object)
+        else:
+            out[name] = np.array(values, dtype=np.int64)
+    return out
+
+
+def _prefix(x: np.ndarray) -> np.ndarray:
+    # NaNs contribute 0; counts of valid values are prefixed separately. Accumulate in float64
+    # whatever the column dtype (SeasonColumns keeps float32 / bool columns)
+    return np.concatenate([[0.0], np.cumsum(np.where(np.isnan(x), 0.0, x), dtype=np.float64)])
+
+
+def _date(ms: int):
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).date()
+
+
+def aggregate_chapters(
+    season: Mapping[str, np.ndarray],
+    breaks: Sequence[int],
+    player_id: int,
+    season_year: int,
+    chapter_offset: int = 0,
+    game_offset: int = 0,
+    icons: Optional[Dict[int, str]] = None,
+) -> List[Tuple[PlayerChapter, List[int]]]:
+    """
+    Chapter cards for the given segment ends, from prefix sums over the per-game arrays:
+    every chapter's means and top champion are O(1)/O(k) lookups, not a rescan of its games.
+    Returns (chapter, league_matches ids of its games) pairs in chronological order.
+    chapter_offset / game_offset shift chapter_index and the 1-based game indexes when only the
+    tail of a season is passed in.
+    """
+    icons = icons or {}
+    spans = segments(breaks)
+    if not spans:
+        return []
+    starts = np.array([a for a, _ in spans])
+    ends = np.array([b for _, b in spans])
+
+    sums = {name: _prefix(season[name]) for name in _NUMERIC}
+    valid = {name: np.concatenate([[0], np.cumsum(~np.isnan(season[name]))]) for name in _NUMERIC}
+
+    def mean(name: str) -> np.ndarray:
+        count = valid[name][ends] - valid[name][starts]
+        total = sums[name][ends] - sums[name][starts]
+        return np.divide(total, count, out=np.zeros(len(spans)), where=count > 0)
+
+    means = {name: mean(name) for name in _NUMERIC}
+    games = ends - starts
+
+    # champion counts: one-hot over the season's distinct champions, prefixed along games
+    champion_id, champion_name = season["champion_id"], season["champion_name"]
+    champ_ids, inverse = np.unique(champion_id, return_inverse=True)
+    one_hot = np.zeros((len(inverse) + 1, len(champ_ids)), dtype=np.int32)
+    one_hot[np.arange(1, len(inverse) + 1), inverse] = 1
+    champ_prefix = np.cumsum(one_hot, axis=0)
+    champ_counts = champ_prefix[ends] - champ_prefix[starts]
+    top = np.argmax(champ_counts, axis=1)
+
+    scores = {
+        score: np.clip(means[field] / cap * 100.0, 0.0, 100.0) for score, (field, cap) in SCORE_CAPS.items()
+    }
+
+    out = []
+    for i, (a, b) in enumerate(spans):
+        champ_id = int(champ_ids[top[i]])
+        champ_pos = a + int(np.flatnonzero(champion_id[a:b] == champ_id)[0])
+        chapter = PlayerChapter(
+            id=None,
+            player_id=player_id,
+            chapter_index=chapter_offset + i + 1,
+            season=season_year,
+            start_date=_date(int(season["match_recorded_at"][a])),
+            end_date=_date(int(season["match_recorded_at"][b - 1])),
+            start_game_idx=game_offset + a + 1,
+            end_game_idx=game_offset + b,
+            title=f"Chapter {chapter_offset + i + 1}",
+            top_champion_id=champ_id,
+            top_champion_name=str(champion_name[champ_pos]),
+            top_champion_icon_url=icons.get(champ_id),
+            top_champion_games=int(champ_counts[i, top[i]]),
+            games_count=int(games[i]),
+            win_rate=float(np.clip(means["win"][i], 0.0, 1.0)),
+            kda_score=float(scores["kda_score"][i]),
+            cs_score=float(scores["cs_score"][i]),
+            damage_score=float(scores["damage_score"][i]),
+            vision_score=float(scores["vision_score"][i]),
+            raw_metrics={name: float(means[name][i]) for name in _NUMERIC if name != "win"},
+        )
+        out.append((chapter, season["match_id"][a:b].tolist()))
+    return out
+
+
+def segment_season(season: Mapping[str, np.ndarray], **binseg_kwargs: Any) -> List[int]:
+    x = np.column_stack([season[name] for name in CHAPTER_FEATURES]) if len(season["match_id"]) else np.zeros((0, 1))
+    binseg_kwargs.setdefault("smooth", DEFAULT_SMOOTH)
+    return binseg(x, **binseg_kwargs)
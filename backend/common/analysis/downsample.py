@@ -0,0 +1,106 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+def rolling_mean_1d(y: np.ndarray, window: int) -> np.ndarray:
+    """Trailing rolling mean ignoring NaNs (shorter window at the start), via prefix sums."""
+    y = np.asarray(y, dtype=np.float64)
+    if window <= 1 or y.size == 0:
+        return y
+    valid = ~np.isnan(y)
+    csum = np.concatenate([[0.0], np.cumsum(np.where(valid, y, 0.0))])
+    ccount = np.concatenate([[0], np.cumsum(valid)])
+    idx = np.arange(1, y.size + 1)
+    lo = np.maximum(idx - window, 0)
+    count = ccount[idx] - ccount[lo]
+    return np.divide(csum[idx] - csum[lo], count, out=np.full(y.size, np.nan), where=count > 0)
+
+
+def lttb_indices(x: np.ndarray, ys: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets over one x axis and d y columns (ys: (n, d)).
+    Columns should be on comparable scales (callers z-score them); the triangle area of a
+    candidate is summed over columns so all metrics share one set of kept points.
+    Always keeps the first and last point. Returns sorted indices.
+    """
+    n = x.size
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1][:max(threshold, 0)], dtype=np.int64)
+    ys = np.where(np.isnan(ys), 0.0, ys)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        nxt_hi = max(nxt_hi, nxt_lo + 1)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = ys[nxt_lo:nxt_hi].mean(axis=0)
+        cx = x[lo:hi]
+        cy = ys[lo:hi]
+        area = np.abs((x[a] - avg_x) * (cy - ys[a]) - (x[a] - cx)[:, None] * (avg_y - ys[a])).sum(axis=1)
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    out[-1] = n - 1
+    return out
+
+
+def bucket_means(columns: Dict[str, np.ndarray], threshold: int) -> Dict[str, np.ndarray]:
+    """Average consecutive equal-width buckets of every column (NaN-aware)."""
+    n = len(next(iter(columns.values()))) if columns else 0
+    if threshold >= n or threshold <= 0:
+        return {name: np.asarray(col, dtype=np.float64) for name, col in columns.items()}
+    bucket = (np.arange(n) * threshold) // n
+    out = {}
+    for name, col in columns.items():
+        col = np.asarray(col, dtype=np.float64)
+        valid = ~np.isnan(col)
+        total = np.bincount(bucket, weights=np.where(valid, col, 0.0), minlength=threshold)
+        count = np.bincount(bucket, weights=valid, minlength=threshold)
+        out[name] = np.divide(total, count, out=np.full(threshold, np.nan), where=count > 0)
+    return out
+
+
+def downsample(
+    x: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    points: int,
+    mode: str = "lttb",
+    passthrough: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Reduce aligned columns to at most `points` rows.
+    mode="lttb": keep the visually significant games (exact values, shared indices);
+    mode="mean": bucket averages. `x` comes back under "x". passthrough columns (e.g. timestamps)
+    are sampled rather than averaged.
+    """
+    passthrough = passthrough or ()
+    x = np.asarray(x, dtype=np.float64)
+    metrics = {name: np.asarray(col, dtype=np.float64) for name, col in columns.items() if name not in passthrough}
+    if mode == "mean":
+        out = bucket_means({"x": x, **metrics}, points)
+        if points < x.size:
+            firsts = np.searchsorted((np.arange(x.size) * points) // x.size, np.arange(points))
+        else:
+            firsts = np.arange(x.size)
+        for name in passthrough:
+            out[name] = np.asarray(columns[name])[firsts]
+        return out
+
+    if metrics:
+        ys = np.column_stack(list(metrics.values()))
+        mean = np.nanmean(ys, axis=0) if ys.size else 0.0
+        std = np.nanstd(ys, axis=0) if ys.size else 1.0
+        std = np.where((std > 0) & ~np.isnan(std), std, 1.0)
+        ys = (ys - np.where(np.isnan(mean), 0.0, mean)) / std
+    else:
+        ys = np.zeros((x.size, 1))
+    keep = lttb_indices(x, ys, points)
+    out = {"x": x[keep]}
+    for name, col in columns.items():
+        out[name] = np.asarray(col)[keep]
+    return out
@@ -0,0 +1,55 @@
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# league_matches columns holding the parts of a match-v5 document the pipeline reads
+SLICE_COLUMNS = ("game_info", "participant", "teams")
+
+# Per-team sums over every participant (stored on the team slice as "totals")
+TEAM_TOTALS = ("kills", "totalDamageDealtToChampions")
+
+# (game_info, participant, teams): info without participants/teams, the stored player's own
+# participant entry (None when the puuid is not in the match), info.teams with "totals" added
+Slices = Tuple[Dict[str, Any], Optional[Dict[str, Any]], List[Dict[str, Any]]]
+
+COMPRESS_LEVEL = 6
+
+
+def split_document(raw: Dict[str, Any], puuid: str) -> Slices:
+    """Riot match-v5 document -> the narrow slices stored next to the compressed document."""
+    info = raw.get("info") or {}
+    participants = info.get("participants") or []
+    participant = next((p for p in participants if p.get("puuid") == puuid), None)
+
+    totals: Dict[Any, Dict[str, int]] = {}
+    for p in participants:
+        sums = totals.setdefault(p.get("teamId"), dict.fromkeys(TEAM_TOTALS, 0))
+        for key in TEAM_TOTALS:
+            sums[key] += p.get(key) or 0
+    teams = [dict(team) for team in info.get("teams") or []]
+    by_id = {team.get("teamId"): team for team in teams}
+    for team_id, sums in totals.items():
+        team = by_id.get(team_id)
+        if team is None:
+            team = by_id[team_id] = {"teamId": team_id}
+            teams.append(team)
+        team["totals"] = sums
+
+    game_info = {key: value for key, value in info.items() if key not in ("participants", "teams")}
+    return game_info, participant, teams
+
+
+def team_totals(teams: List[Dict[str, Any]], team_id: Any) -> Dict[str, int]:
+    for team in teams:
+        if team.get("teamId") == team_id:
+            return team.get("totals") or {}
+    return {}
+
+
+def compress_document(raw: Dict[str, Any]) -> bytes:
+    """Compact JSON, zlib-compressed: the cold copy kept in league_matches.raw_zlib."""
+    return zlib.compress(json.dumps(raw, separators=(",", ":")).encode("utf-8"), COMPRESS_LEVEL)
+
+
+def decompress_document(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
@@ -0,0 +1,191 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from common.analysis.match_document import Slices, split_document, team_totals
+from common.models.player_match_metrics import PlayerMatchMetrics
+
+# Riot teamPosition -> our role enum (TOP, JUNGLE, MIDDLE, BOTTOM, SUPPORT)
+ROLE_MAP = {"TOP": "TOP", "JUNGLE": "JUNGLE", "MIDDLE": "MIDDLE", "BOTTOM": "BOTTOM", "UTILITY": "SUPPORT"}
+LANE_MAP = {"TOP": "TOP", "JUNGLE": "JUNGLE", "MIDDLE": "MIDDLE", "MID": "MIDDLE", "BOTTOM": "BOTTOM", "BOT": "BOTTOM"}
+
+# Target-participant integer stats -> PlayerMatchMetrics column
+INT_FIELDS = {
+    "kills": "kills",
+    "deaths": "deaths",
+    "assists": "assists",
+    "visionScore": "vision_score",
+    "goldEarned": "gold_earned",
+    "totalDamageDealt": "total_damage_dealt",
+    "totalDamageTaken": "total_damage_taken",
+    "totalHeal": "total_heal",
+    "totalMinionsKilled": "total_minions_killed",
+    "neutralMinionsKilled": "neutral_minions_killed",
+    "wardsPlaced": "wards_placed",
+    "wardsKilled": "wards_killed",
+    "teamId": "team_id",
+    "participantId": "participant_id",
+    "championId": "champion_id",
+}
+BOOL_FIELDS = {
+    "win": "win",
+    "firstBloodKill": "first_blood",
+    "firstBloodAssist": "first_blood_assist",
+    "firstTowerKill": "first_tower",
+    "firstTowerAssist": "first_tower_assist",
+}
+
+# Column order of league_player_match_metrics used by inserts (everything but id)
+METRICS_COLUMNS = (
+    "match_id", "player_id", "champion_id", "champion_name", "role", "lane",
+    "cs_per_min", "gold_per_min", "damage_per_min", "damage_share", "kill_participation",
+    "kills", "deaths", "assists", "kda_ratio",
+    "win", "team_id", "participant_id", "game_duration",
+    "vision_score", "vision_score_per_min", "gold_earned", "total_damage_dealt", "total_damage_taken",
+    "total_heal", "total_minions_killed", "neutral_minions_killed", "wards_placed", "wards_killed",
+    "first_blood", "first_blood_assist", "first_tower", "first_tower_assist",
+    "items", "summoner_spells", "rune_setup", "skill_order", "damage_breakdown",
+    "objective_contribution", "analysis_json", "match_recorded_at",
+)
+
+
+def _column(rows: Sequence[Dict[str, Any]], key: str, dtype) -> np.ndarray:
+    return np.fromiter((row.get(key) or 0 for row in rows), dtype=dtype, count=len(rows))
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    out = np.full(num.shape, np.nan)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def extract_columns(raws: Sequence[Dict[str, Any]], puuids: Sequence[str]) -> Dict[str, Any]:
+    """
+    Columnar extraction for a batch of Riot match-v5 documents.
+    raws[i] is the match, puuids[i] the puuid of the player it was stored for.
+    """
+    return extract_slice_columns([split_document(raw, puuid) for raw, puuid in zip(raws, puuids)])
+
+
+def extract_slice_columns(slices: Sequence[Slices]) -> Dict[str, Any]:
+    """
+    Columnar extraction from the stored slices of a batch of matches (see split_document):
+    only the target participant, its team's totals and the game info are read, and all
+    per-minute/share metrics are computed on whole arrays. Returns a dict of columns, plus
+    "found" (bool mask: target participant present) and "index" (positions in `slices` of the
+    returned rows).
+    """
+    found = np.fromiter((s[1] is not None for s in slices), dtype=np.bool_, count=len(slices))
+    index = np.flatnonzero(found)
+    targets = [slices[i][1] for i in index]
+    totals = [team_totals(slices[i][2], target.get("teamId")) for i, target in zip(index, targets)]
+    team_kills = _column(totals, "kills", np.float64)
+    team_damage = _column(totals, "totalDamageDealtToChampions", np.float64)
+
+    cols: Dict[str, Any] = {name: _column(targets, key, np.int64) for key, name in INT_FIELDS.items()}
+    cols.update({name: _column(targets, key, np.bool_) for key, name in BOOL_FIELDS.items()})
+    champion_damage = _column(targets, "totalDamageDealtToChampions", np.float64)
+
+    infos = [slices[i][0] for i in index]
+    duration = _column(infos, "gameDuration", np.float64)
+    # before patch 11.20 gameDuration was in ms and gameEndTimestamp did not exist
+    in_ms = np.fromiter(("gameEndTimestamp" not in info for info in infos), dtype=np.bool_, count=len(infos))
+    duration = np.where(in_ms, duration / 1000.0, duration)
+    minutes = duration / 60.0
+
+    kills, deaths, assists = cols["kills"], cols["deaths"], cols["assists"]
+    cs = cols["total_minions_killed"] + cols["neutral_minions_killed"]
+
+    cols["game_duration"] = duration.astype(np.int64)
+    cols["cs_per_min"] = _ratio(cs, minutes)
+    cols["gold_per_min"] = _ratio(cols["gold_earned"], minutes)
+    cols["damage_per_min"] = _ratio(champion_damage, minutes)
+    cols["vision_score_per_min"] = _ratio(cols["vision_score"], minutes)
+    cols["damage_share"] = np.clip(_ratio(champion_damage, team_damage), 0.0, 1.0)
+    cols["kill_participation"] = np.clip(_ratio(kills + assists, team_kills), 0.0, 1.0)
+    cols["kda_ratio"] = (kills + assists) / np.maximum(deaths, 1)
+
+    cols["champion_name"] = [t.get("championName", "") for t in targets]
+    cols["role"] = [ROLE_MAP.get(t.get("teamPosition") or t.get("individualPosition") or "") for t in targets]
+    cols["lane"] = [LANE_MAP.get(t.get("lane") or "") for t in targets]
+    cols["items"] = [[t.get(f"item{k}", 0) for k in range(7)] for t in targets]
+    cols["summoner_spells"] = [[str(t.get("summoner1Id", "")), str(t.get("summoner2Id", ""))] for t in targets]
+    cols["rune_setup"] = [t.get("perks") for t in targets]
+    cols["damage_breakdown"] = [
+        {
+            "physical": t.get("physicalDamageDealtToChampions", 0),
+            "magic": t.get("magicDamageDealtToChampions", 0),
+            "true": t.get("trueDamageDealtToChampions", 0),
+            "total": t.get("totalDamageDealtToChampions", 0),
+        }
+        for t in targets
+    ]
+    cols["objective_contribution"] = [
+        {
+            "dragon_kills": t.get("dragonKills", 0),
+            "baron_kills": t.get("baronKills", 0),
+            "turret_takedowns": t.get("turretTakedowns", 0),
+            "objectives_stolen": t.get("objectivesStolen", 0),
+            "damage_to_objectives": t.get("damageDealtToObjectives", 0),
+        }
+        for t in targets
+    ]
+    cols["found"] = found
+    cols["index"] = index
+    return cols
+
+
+def _as_list(column) -> list:
+    # ndarray -> python scalars with NaN -> None (DB NULL)
+    if isinstance(column, np.ndarray):
+        if column.dtype.kind == "f":
+            return [None if v != v else v for v in column.tolist()]
+        return column.tolist()
+    return list(column)
+
+
+def metrics_rows(
+    cols: Dict[str, Any],
+    match_pks: Sequence[int],
+    player_ids: Sequence[int],
+    recorded_at: Sequence[int],
+) -> List[tuple]:
+    """Columns from extract_columns -> row tuples in METRICS_COLUMNS order (JSON fields still as python objects)."""
+    index = cols["index"].tolist()
+    per_row = {
+        "match_id": [match_pks[i] for i in index],
+        "player_id": [player_ids[i] for i in index],
+        "match_recorded_at": [recorded_at[i] for i in index],
+        # need the match timeline / agent analysis; filled by later stages
+        "skill_order": [None] * len(index),
+        "analysis_json": [None] * len(index),
+    }
+    columns = [per_row[name] if name in per_row else _as_list(cols[name]) for name in METRICS_COLUMNS]
+    return list(zip(*columns))
+
+
+def to_models(rows: Sequence[tuple]) -> List[PlayerMatchMetrics]:
+    return PlayerMatchMetrics.from_rows([(None, *row) for row in rows])
+
+
+def extract_metrics_rows(
+    raws: Sequence[Dict[str, Any]],
+    puuids: Sequence[str],
+    match_pks: Sequence[int],
+    player_ids: Sequence[int],
+    recorded_at: Optional[Sequence[int]] = None,
+) -> List[tuple]:
+    cols = extract_columns(raws, puuids)
+    if recorded_at is None:
+        recorded_at = [int((raw.get("info") or {}).get("gameCreation") or 0) for raw in raws]
+    return metrics_rows(cols, match_pks, player_ids, recorded_at)
+
+
+def extract_slice_rows(
+    slices: Sequence[Slices],
+    match_pks: Sequence[int],
+    player_ids: Sequence[int],
+    recorded_at: Sequence[int],
+) -> List[tuple]:
+    """extract_metrics_rows for matches stored split (league_matches slice columns)."""
+    return metrics_rows(extract_slice_columns(slices), match_pks, player_ids, recorded_at)
@@ -0,0 +1,161 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.analysis.similarity_index import NEUTRAL_SCORE, PLAYSTYLE_AXES
+
+ROLES = ("TOP", "JUNGLE", "MIDDLE", "BOTTOM", "SUPPORT")
+
+# Per-player aggregates (averaged over a role's games) that feed each axis; an axis is the mean
+# of its features' role-relative percentiles. *_delta features compare long (>= 30 min) games
+# against shorter ones.
+AXIS_FEATURES = {
+    "aggressiveness": ("kills_per_min", "damage_per_min", "first_blood_rate"),
+    "team_focus": ("kill_participation", "assists_per_min"),
+    "objective_control": ("objective_takedowns", "objective_damage_per_min", "first_tower_rate"),
+    "vision_control": ("vision_score_per_min", "wards_placed_per_min", "wards_killed_per_min"),
+    "farm_efficiency": ("cs_per_min", "gold_per_min"),
+    "late_game_scaling": ("late_kda_delta", "late_win_rate_delta"),
+}
+FEATURES = tuple(feature for axis in PLAYSTYLE_AXES for feature in AXIS_FEATURES[axis])
+_AXIS_COLUMNS = [[FEATURES.index(f) for f in AXIS_FEATURES[axis]] for axis in PLAYSTYLE_AXES]
+
+MIN_GAMES = 5                 # a (player, role) needs this many games to enter the distribution
+
+
+def _replace_sorted(values: np.ndarray, old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Remove `old` from and merge `new` into a sorted array in O(n + k log n); NaNs are ignored."""
+    old = np.sort(old[~np.isnan(old)])
+    if old.size:
+        pos = np.searchsorted(values, old, side="left")
+        # equal values removed together must hit consecutive slots
+        pos += np.arange(old.size) - np.searchsorted(old, old, side="left")
+        values = np.delete(values, pos)
+    new = np.sort(new[~np.isnan(new)])
+    if new.size:
+        values = np.insert(values, np.searchsorted(values, new), new)
+    return values
+
+
+class PercentileTables:
+    """
+    Per-role distribution tables: for every role and feature, the sorted per-player aggregates
+    of that role. A percentile is then two binary searches (mid-rank, so ties land in the middle),
+    done for whole batches at once with np.searchsorted.
+
+    The tables remember each player's current row so update() can swap a player's old values
+    for new ones without re-reading the role.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.distributions: Dict[str, List[np.ndarray]] = {
+            role: [np.empty(0) for _ in FEATURES] for role in ROLES
+        }
+        self.rows: Dict[Tuple[int, str], np.ndarray] = {}
+
+    @classmethod
+    def build(cls, aggregates: Iterable[Tuple[int, str, int, np.ndarray]], version=None) -> "PercentileTables":
+        """aggregates: (player_id, role, games, feature vector in FEATURES order)."""
+        tables = cls(version)
+        columns: Dict[str, List[np.ndarray]] = {role: [] for role in ROLES}
+        for player_id, role, games, values in aggregates:
+            if role in columns and games >= MIN_GAMES:
+                tables.rows[(player_id, role)] = values
+                columns[role].append(values)
+        for role, rows in columns.items():
+            if rows:
+                matrix = np.vstack(rows)
+                tables.distributions[role] = [np.sort(col[~np.isnan(col)]) for col in matrix.T]
+        return tables
+
+    def size(self, role: str) -> int:
+        return max((len(col) for col in self.distributions.get(role, ())), default=0)
+
+    def update(self, aggregates: Iterable[Tuple[int, str, int, np.ndarray]]):
+        """Replace the given players' rows (new games landed); rows under MIN_GAMES are dropped."""
+        old: Dict[str, List[np.ndarray]] = {role: [] for role in ROLES}
+        new: Dict[str, List[np.ndarray]] = {role: [] for role in ROLES}
+        for player_id, role, games, values in aggregates:
+            if role not in old:
+                continue
+            previous = self.rows.pop((player_id, role), None)
+            if previous is not None:
+                old[role].append(previous)
+            if games >= MIN_GAMES:
+                self.rows[(player_id, role)] = values
+                new[role].append(values)
+        empty = np.empty((0, len(FEATURES)))
+        for role in ROLES:
+            if not old[role] and not new[role]:
+                continue
+            removed = np.vstack(old[role]) if old[role] else empty
+            added = np.vstack(new[role]) if new[role] else empty
+            self.distributions[role] = [
+                _replace_sorted(col, removed[:, i], added[:, i]) for i, col in enumerate(self.distributions[role])
+            ]
+
+    def percentiles(self, role: str, values: np.ndarray) -> np.ndarray:
+        """(n, len(FEATURES)) raw aggregates -> 0~100 percentiles within the role (NaN stays NaN)."""
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        out = np.full(values.shape, np.nan)
+        for i, col in enumerate(self.distributions.get(role) or ()):
+            if col.size == 0:
+                continue
+            below = np.searchsorted(col, values[:, i], side="left")
+            at_or_below = np.searchsorted(col, values[:, i], side="right")
+            pct = (below + at_or_below) / (2.0 * col.size) * 100.0
+            out[:, i] = np.where(np.isnan(values[:, i]), np.nan, pct)
+        return out
+
+    def score(self, role: str, values: np.ndarray) -> np.ndarray:
+        """(n, len(FEATURES)) aggregates -> (n, 6) axis scores in PLAYSTYLE_AXES order."""
+        return axis_scores(self.percentiles(role, values))
+
+
+def axis_scores(pct: np.ndarray) -> np.ndarray:
+    """Feature percentiles -> axis scores (mean of the axis' features; no data -> NEUTRAL_SCORE)."""
+    axes = np.full((pct.shape[0], len(PLAYSTYLE_AXES)), NEUTRAL_SCORE)
+    for j, columns in enumerate(_AXIS_COLUMNS):
+        part = pct[:, columns]
+        counts = (~np.isnan(part)).sum(axis=1)
+        sums = np.where(np.isnan(part), 0.0, part).sum(axis=1)
+        axes[:, j] = np.divide(sums, counts, out=axes[:, j], where=counts > 0)
+    return np.round(axes, 2)
+
+
+def primary_roles(
+    aggregates: Sequence[Tuple[int, str, int, np.ndarray]]
+) -> Dict[int, Tuple[str, int, np.ndarray]]:
+    """The role each player played most (ties -> earlier in ROLES): player_id -> (role, games, values)."""
+    best: Dict[int, Tuple[str, int, np.ndarray]] = {}
+    for player_id, role, games, values in aggregates:
+        if role not in ROLES:
+            continue
+        current = best.get(player_id)
+        if current is None or (games, -ROLES.index(role)) > (current[1], -ROLES.index(current[0])):
+            best[player_id] = (role, games, values)
+    return best
+
+
+def score_players(
+    tables: PercentileTables, aggregates: Sequence[Tuple[int, str, int, np.ndarray]]
+) -> List[Tuple[int, str, np.ndarray, np.ndarray]]:
+    """
+    Axis scores for every player in `aggregates`, judged in their primary role.
+    Returns (player_id, role, axes (6,), percentiles (len(FEATURES),)); one vectorised pass per role.
+    """
+    by_role: Dict[str, List[Tuple[int, np.ndarray]]] = {}
+    for player_id, (role, _, values) in primary_roles(aggregates).items():
+        by_role.setdefault(role, []).append((player_id, values))
+    out = []
+    for role, players in by_role.items():
+        values = np.vstack([v for _, v in players])
+        pct = tables.percentiles(role, values)
+        axes = axis_scores(pct)
+        out.extend((pid, role, axes[i], pct[i]) for i, (pid, _) in enumerate(players))
+    return out
+
+
+def feature_vector(row: Sequence[Optional[float]]) -> np.ndarray:
+    return np.array([np.nan if v is None else float(v) for v in row], dtype=np.float64)
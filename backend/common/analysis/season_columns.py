@@ -0,0 +1,215 @@
+import json
+import struct
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"RSC1"
+
+# Roles are stored as int8 codes into this tuple (0 = NULL)
+ROLES = (None, "TOP", "JUNGLE", "MIDDLE", "BOTTOM", "SUPPORT")
+
+# league_player_match_metrics column -> dtype. Nullable numerics are float32 with NaN for NULL
+# (exact for integers below 2**24); NOT NULL counters and flags keep their integer/bool type.
+FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("match_id", "<i8"),
+    ("match_recorded_at", "<i8"),
+    ("win", "?"),
+    ("kills", "<i2"),
+    ("deaths", "<i2"),
+    ("assists", "<i2"),
+    ("kda_ratio", "<f4"),
+    ("cs_per_min", "<f4"),
+    ("gold_per_min", "<f4"),
+    ("damage_per_min", "<f4"),
+    ("damage_share", "<f4"),
+    ("kill_participation", "<f4"),
+    ("vision_score", "<f4"),
+    ("vision_score_per_min", "<f4"),
+    ("game_duration", "<f4"),
+    ("gold_earned", "<f4"),
+    ("total_damage_dealt", "<f4"),
+    ("total_damage_taken", "<f4"),
+    ("total_heal", "<f4"),
+    ("total_minions_killed", "<f4"),
+    ("neutral_minions_killed", "<f4"),
+    ("wards_placed", "<f4"),
+    ("wards_killed", "<f4"),
+    ("first_blood", "?"),
+    ("first_tower", "?"),
+)
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+
+_DTYPES = dict(FIELDS)
+_ROLE_EXPRESSION = f"COALESCE(array_position(ARRAY[{', '.join(repr(r) for r in ROLES[1:])}]::varchar[], role), 0)"
+
+
+def _select_expression(name: str) -> str:
+    # NULL -> NaN in SQL, so rows go straight into a structured array without a Python pass
+    return f"COALESCE({name}::float8, 'NaN')" if _DTYPES[name] == "<f4" else name
+
+
+def select_columns(fields: Sequence[str] = FIELD_NAMES) -> str:
+    """SELECT list for SeasonColumns.from_cursor(): `fields`, then champion_id, champion_name, role code."""
+    expressions = [_select_expression(name) for name in fields]
+    return ", ".join(expressions + ["champion_id", "champion_name", _ROLE_EXPRESSION])
+
+
+@lru_cache(maxsize=None)
+def _row_dtype(fields: Tuple[str, ...]) -> np.dtype:
+    codes = [("champion_id", "<i4"), ("champion_name", "O"), ("role", "i1")]
+    return np.dtype([(name, _DTYPES[name]) for name in fields] + codes)
+
+
+class SeasonColumns(Mapping):
+    """
+    One player's season of league_player_match_metrics as a struct of arrays: one typed NumPy
+    column per numeric field loaded (any subset of FIELDS), champions as uint16 codes into a per-season table and
+    roles as int8 codes into ROLES. Reads like the Dict[str, np.ndarray] of season_arrays(),
+    so it can be passed to aggregate_chapters / segment_season / the chart builders;
+    "champion_id", "champion_name" and "role" are decoded from their codes on access.
+
+    Build it with from_cursor() after executing a SELECT of select_columns(fields) (no per-row
+    objects are created) and cache it with to_bytes() / from_bytes().
+    """
+
+    __slots__ = ("columns", "champion_codes", "role_codes", "champion_ids", "champion_names")
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        champion_codes: np.ndarray,
+        role_codes: np.ndarray,
+        champion_ids: np.ndarray,
+        champion_names: Sequence[str],
+    ):
+        self.columns = columns
+        self.champion_codes = champion_codes
+        self.role_codes = role_codes
+        self.champion_ids = champion_ids
+        self.champion_names = tuple(champion_names)
+
+    # ---- construction ----
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple], fields: Sequence[str] = FIELD_NAMES) -> "SeasonColumns":
+        """Rows in select_columns(fields) order (chronological) -> columns."""
+        dtype = _row_dtype(tuple(fields))
+        table = np.array(rows, dtype=dtype) if len(rows) else np.zeros(0, dtype=dtype)
+        columns = {name: np.ascontiguousarray(table[name]) for name in fields}
+        champion_ids, first, codes = np.unique(table["champion_id"], return_index=True, return_inverse=True)
+        return cls(
+            columns,
+            codes.astype(np.uint16).reshape(-1),
+            np.ascontiguousarray(table["role"]),
+            champion_ids.astype(np.int32),
+            [table["champion_name"][i] for i in first],
+        )
+
+    @classmethod
+    def from_cursor(
+        cls, cursor, fields: Sequence[str] = FIELD_NAMES, batch_size: Optional[int] = None
+    ) -> "SeasonColumns":
+        """Consume the cursor's result (a SELECT of select_columns(fields))."""
+        if batch_size is None:
+            return cls.from_rows(cursor.fetchall(), fields)
+        rows = []
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return cls.from_rows(rows, fields)
+            rows.extend(batch)
+
+    # ---- mapping interface ----
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name in self.columns:
+            return self.columns[name]
+        if name == "champion_id":
+            return self.champion_ids[self.champion_codes]
+        if name == "champion_name":
+            return np.array(self.champion_names, dtype=object)[self.champion_codes]
+        if name == "role":
+            return np.array(ROLES, dtype=object)[self.role_codes]
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.columns
+        yield from ("champion_id", "champion_name", "role")
+
+    def __len__(self) -> int:
+        # number of columns (Mapping); use games for the number of rows
+        return len(self.columns) + 3
+
+    @property
+    def games(self) -> int:
+        return int(self.champion_codes.size)
+
+    @property
+    def nbytes(self) -> int:
+        names = sum(len(name) for name in self.champion_names)
+        return (
+            sum(column.nbytes for column in self.columns.values())
+            + self.champion_codes.nbytes + self.role_codes.nbytes + self.champion_ids.nbytes + names
+        )
+
+    def tail(self, start: int) -> "SeasonColumns":
+        """Games [start:] as views over the same buffers."""
+        return SeasonColumns(
+            {name: column[start:] for name, column in self.columns.items()},
+            self.champion_codes[start:],
+            self.role_codes[start:],
+            self.champion_ids,
+            self.champion_names,
+        )
+
+    # ---- bytes ----
+
+    def to_bytes(self) -> bytes:
+        """
+        MAGIC "RSC1" | uint32 LE header length | header JSON | column buffers (8-byte aligned).
+        The header carries the row count, per-column dtype/offset and the champion table.
+        """
+        arrays = dict(self.columns)
+        arrays["_champion"] = self.champion_codes
+        arrays["_role"] = self.role_codes
+        arrays["_champion_ids"] = self.champion_ids
+        header = {"games": self.games, "champion_names": list(self.champion_names), "columns": []}
+        buffers = []
+        offset = 0
+        for name, array in arrays.items():
+            raw = np.ascontiguousarray(array).tobytes()
+            header["columns"].append(
+                {"name": name, "dtype": array.dtype.str, "offset": offset, "length": int(array.size)}
+            )
+            padding = -len(raw) % 8
+            buffers.append(raw + b"\0" * padding)
+            offset += len(raw) + padding
+
+        head = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        head += b" " * (-(len(MAGIC) + 4 + len(head)) % 8)
+        return b"".join([MAGIC, struct.pack("<I", len(head)), head, *buffers])
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "SeasonColumns":
+        """Inverse of to_bytes(); columns are read-only views into blob (no copy)."""
+        if blob[:4] != MAGIC:
+            raise ValueError("Not a season columns blob")
+        (head_len,) = struct.unpack_from("<I", blob, 4)
+        start = 8 + head_len
+        header = json.loads(blob[8:start])
+        arrays = {
+            col["name"]: np.frombuffer(
+                blob, dtype=np.dtype(col["dtype"]), count=col["length"], offset=start + col["offset"]
+            )
+            for col in header["columns"]
+        }
+        return cls(
+            {name: array for name, array in arrays.items() if not name.startswith("_")},
+            arrays["_champion"],
+            arrays["_role"],
+            arrays["_champion_ids"],
+            header["champion_names"],
+        )
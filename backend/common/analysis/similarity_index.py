@@ -0,0 +1,127 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# PlayerPlaystyle axes, all 0~100, in vector order
+PLAYSTYLE_AXES = (
+    "aggressiveness", "team_focus", "objective_control", "vision_control", "farm_efficiency", "late_game_scaling",
+)
+NEUTRAL_SCORE = 50.0          # stands in for a NULL axis
+MAX_DISTANCE = 100.0 * np.sqrt(len(PLAYSTYLE_AXES))
+METRICS = ("cosine", "euclidean")
+
+
+def playstyle_vectors(rows: Sequence[Sequence[Optional[float]]]) -> np.ndarray:
+    """Rows of axis values in PLAYSTYLE_AXES order -> (n, 6) float matrix, NULL -> NEUTRAL_SCORE."""
+    x = np.array(
+        [[np.nan if v is None else float(v) for v in row] for row in rows], dtype=np.float64
+    ).reshape(len(rows), len(PLAYSTYLE_AXES))
+    return np.where(np.isnan(x), NEUTRAL_SCORE, x)
+
+
+class SimilarityIndex:
+    """
+    Immutable in-memory index over pro playstyle vectors.
+
+    Rows are sorted by (role, region) into one C-contiguous matrix, so every partition is a
+    slice (a view, no copy) and a role-only filter is a slice too. Unit-normalised rows and
+    squared norms are precomputed: a batch of queries against a partition is one matrix multiply
+    followed by argpartition for the top k.
+
+    Scores are similarities in [0, 1]: cosine as is (the axes are non-negative), euclidean as
+    1 - distance / MAX_DISTANCE.
+    """
+
+    def __init__(self, ids: Sequence[int], roles: Sequence[str], regions: Sequence[str], vectors: np.ndarray, version=None):
+        order = sorted(range(len(ids)), key=lambda i: (roles[i], regions[i], ids[i]))
+        self.version = version
+        self.ids = np.asarray([ids[i] for i in order], dtype=np.int64)
+        self.roles = [roles[i] for i in order]
+        self.regions = [regions[i] for i in order]
+        self.vectors = np.ascontiguousarray(np.asarray(vectors, dtype=np.float64).reshape(len(ids), -1)[order])
+        norms = np.linalg.norm(self.vectors, axis=1)
+        self.unit = np.ascontiguousarray(self.vectors / np.where(norms > 0, norms, 1.0)[:, None])
+        self.sq_norms = (self.vectors ** 2).sum(axis=1)
+
+        self.partitions: Dict[Tuple[str, str], slice] = {}
+        self.role_slices: Dict[str, slice] = {}
+        for pos, key in enumerate(zip(self.roles, self.regions)):
+            part = self.partitions.get(key)
+            self.partitions[key] = slice(part.start if part else pos, pos + 1)
+            part = self.role_slices.get(key[0])
+            self.role_slices[key[0]] = slice(part.start if part else pos, pos + 1)
+        # a region spans every role, so it is the one filter that needs a gather
+        regions = np.asarray(self.regions, dtype=object)
+        self.region_rows = {region: np.flatnonzero(regions == region) for region in set(self.regions)}
+        self.vectors.flags.writeable = False
+        self.unit.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence], version=None) -> "SimilarityIndex":
+        """Rows of (pro_player_id, role, region, *PLAYSTYLE_AXES)."""
+        rows = list(rows)
+        return cls(
+            [r[0] for r in rows],
+            [r[1] for r in rows],
+            [r[2] for r in rows],
+            playstyle_vectors([r[3:] for r in rows]),
+            version=version,
+        )
+
+    def _rows(self, role: Optional[str], region: Optional[str]):
+        if role is not None and region is not None:
+            return self.partitions.get((role, region), slice(0, 0))
+        if role is not None:
+            return self.role_slices.get(role, slice(0, 0))
+        if region is not None:
+            return self.region_rows.get(region, slice(0, 0))
+        return slice(0, len(self))
+
+    def scores(self, queries: np.ndarray, metric: str = "cosine", role: Optional[str] = None, region: Optional[str] = None):
+        """
+        Similarity of every query (m, 6) to every pro of the selected partition.
+        Returns (pro ids (p,), scores (m, p)).
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}")
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+        rows = self._rows(role, region)
+        ids = self.ids[rows]
+        if metric == "cosine":
+            norms = np.linalg.norm(q, axis=1)
+            q_unit = q / np.where(norms > 0, norms, 1.0)[:, None]
+            sim = q_unit @ self.unit[rows].T
+            return ids, np.clip(sim, 0.0, 1.0)
+        # |q - v|² = |q|² - 2 q·v + |v|²
+        sq = (q ** 2).sum(axis=1)[:, None] - 2.0 * (q @ self.vectors[rows].T) + self.sq_norms[rows]
+        return ids, np.clip(1.0 - np.sqrt(np.maximum(sq, 0.0)) / MAX_DISTANCE, 0.0, 1.0)
+
+    def top_k(
+        self,
+        queries: np.ndarray,
+        k: int = 5,
+        metric: str = "cosine",
+        role: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched top-k: (m, 6) queries -> (ids (m, k'), scores (m, k')), best first, k' = min(k, partition size)."""
+        ids, sim = self.scores(queries, metric, role, region)
+        k = min(k, sim.shape[1])
+        if k <= 0:
+            return np.empty((sim.shape[0], 0), dtype=np.int64), np.empty((sim.shape[0], 0))
+        if k < sim.shape[1]:
+            part = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(sim.shape[1]), sim.shape)
+        part_scores = np.take_along_axis(sim, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        best = np.take_along_axis(part, order, axis=1)
+        return ids[best], np.take_along_axis(part_scores, order, axis=1)
+
+    def query(self, vector: Sequence[float], k: int = 5, **kwargs) -> List[Tuple[int, float]]:
+        """Single vector -> [(pro_player_id, score), ...] best first."""
+        ids, scores = self.top_k(np.asarray(vector, dtype=np.float64)[None, :], k, **kwargs)
+        return list(zip(ids[0].tolist(), scores[0].tolist()))
@@ -1,33 +1,73 @@
-import json
-from typing import Any, Dict
-import boto3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from common.lambda_call.invoker import (
+    LambdaInvoker,
+    MatchFetchResult,
+    MatchRequest,
+    build_payload,
+    get_invoker,
+)
 
-lambda_client = boto3.client("lambda")
 lambda_function_name = "fetch-user-match-history"
+MATCH_IDS_PATH = ("body", "matchIds")
 
 def fetch_matches_via_lambda(riot_id: str, region: str, year: int, role: str, max_out: int) -> Dict[str, Any]:
     """
     Fetch user matches via Lambda function.
     Lambda function calls League API and returns match data.
     """
-    payload = {
-        "riotId": riot_id,
-        "region": region,
-        "year": year,
-        "role": role,
-        "max": max_out,
-    }
-
-    response = lambda_client.invoke(
-        FunctionName=lambda_function_name,
-        InvocationType="RequestResponse",
-        Payload=json.dumps(payload).encode("utf-8"),
-    )
-
-    raw = response["Payload"].read().decode("utf-8", "ignore")
-    doc = json.loads(raw)
-    body = doc.get("body")
-    return body
+    payload = build_payload(riot_id, region, year, role, max_out)
+    return get_invoker().invoke(lambda_function_name, payload)
+
+def iter_matches_via_lambda(riot_id: str, region: str, year: int, role: str, max_out: int) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of fetch_matches_via_lambda.
+    Yields match objects one at a time as the Lambda payload is parsed, so callers can
+    persist them without ever building the full match list.
+    """
+    payload = build_payload(riot_id, region, year, role, max_out)
+    return get_invoker().invoke_stream(lambda_function_name, payload)
+
+def fetch_match_ids_via_lambda(
+    riot_id: str,
+    region: str,
+    year: int,
+    role: str,
+    max_out: int,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+) -> List[str]:
+    """
+    Ask the Lambda for match ids only (no match bodies), newest first.
+    start_time / end_time: epoch seconds; only matches played at/after start_time and at/before
+    end_time are listed (Riot match-v5 startTime / endTime).
+    """
+    extra: Dict[str, Any] = {"idsOnly": True}
+    if start_time is not None:
+        extra["startTime"] = start_time
+    if end_time is not None:
+        extra["endTime"] = end_time
+    payload = build_payload(riot_id, region, year, role, max_out, **extra)
+    return list(get_invoker().invoke_stream(lambda_function_name, payload, path=MATCH_IDS_PATH))
+
+def iter_matches_by_ids_via_lambda(
+    riot_id: str, region: str, year: int, role: str, match_ids: Sequence[str]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Fetch the bodies of the given match ids only, streamed one match at a time.
+    """
+    payload = build_payload(riot_id, region, year, role, len(match_ids), matchIds=list(match_ids))
+    return get_invoker().invoke_stream(lambda_function_name, payload)
+
+def fetch_matches_many(
+    requests: Iterable[MatchRequest], invoker: Optional[LambdaInvoker] = None
+) -> Iterator[MatchFetchResult]:
+    """
+    Fetch many users' matches concurrently.
+    requests: [(riot_id, region, year, role, max), ...]
+    Yields a MatchFetchResult per request as soon as its invoke completes.
+    """
+    return (invoker or get_invoker()).invoke_many(lambda_function_name, requests)
 
 if __name__ == "__main__":
-    fetch_matches_via_lambda("Lagusa#JP1", "jp1", 2025, "AUTO", 1)
\ No newline at end of file
+    fetch_matches_via_lambda("Lagusa#JP1", "jp1", 2025, "AUTO", 1)
@@ -1,8 +1,13 @@
-import json
-from typing import Any, Dict
-import boto3
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from common.lambda_call.invoker import (
+    LambdaInvoker,
+    MatchFetchResult,
+    MatchRequest,
+    build_payload,
+    get_invoker,
+)
 
-lambda_client = boto3.client("lambda")
 lambda_function_name = "fetch-user-match-history-S3"
 
 def fetch_matches_from_s3(riot_id: str, region: str, year: int, role: str, max_out: int) -> Dict[str, Any]:
@@ -10,24 +15,26 @@ def fetch_matches_from_s3(riot_id: str, region: str, year: int, role: str, max_o
     Fetch user matches via Lambda function.
     Lambda function get prepared data from S3 and returns match data.
     """
-    payload = {
-        "riotId": riot_id,
-        "region": region,
-        "year": year,
-        "role": role,
-        "max": max_out,
-    }
+    payload = build_payload(riot_id, region, year, role, max_out)
+    return get_invoker().invoke(lambda_function_name, payload)
 
-    response = lambda_client.invoke(
-        FunctionName=lambda_function_name,
-        InvocationType="RequestResponse",
-        Payload=json.dumps(payload).encode("utf-8"),
-    )
+def iter_matches_from_s3(riot_id: str, region: str, year: int, role: str, max_out: int) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of fetch_matches_from_s3.
+    Yields match objects one at a time as the Lambda payload is parsed, so callers can
+    persist them without ever building the full match list.
+    """
+    payload = build_payload(riot_id, region, year, role, max_out)
+    return get_invoker().invoke_stream(lambda_function_name, payload)
 
-    raw = response["Payload"].read().decode("utf-8", "ignore")
-    doc = json.loads(raw)
-    body = doc.get("body")
-    return body
+def fetch_matches_from_s3_many(
+    requests: Iterable[MatchRequest], invoker: Optional[LambdaInvoker] = None
+) -> Iterator[MatchFetchResult]:
+    """
+    S3 counterpart of fetch_matches_many.
+    Yields a MatchFetchResult per request as soon as its invoke completes.
+    """
+    return (invoker or get_invoker()).invoke_many(lambda_function_name, requests)
 
 if __name__ == "__main__":
-    fetch_matches_from_s3("Lagusa#JP1", "jp1", 2025, "AUTO", 20)
\ No newline at end of file
+    fetch_matches_from_s3("Lagusa#JP1", "jp1", 2025, "AUTO", 20)
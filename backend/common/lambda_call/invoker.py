@@ -0,0 +1,191 @@
+import json
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import boto3
+from botocore.config import Config
+
+from common.lambda_call.stream import MATCHES_PATH, iter_payload_items
+from common.utils.env_util import get_env
+
+# (riot_id, region, year, role, max_out) – same order as fetch_matches_via_lambda
+MatchRequest = Tuple[str, str, int, str, int]
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_REGION_CONCURRENCY = 4
+DEFAULT_READ_TIMEOUT = 900  # Lambda max execution time (s)
+
+
+def build_payload(riot_id: str, region: str, year: int, role: str, max_out: int, **extra: Any) -> Dict[str, Any]:
+    payload = {
+        "riotId": riot_id,
+        "region": region,
+        "year": year,
+        "role": role,
+        "max": max_out,
+    }
+    payload.update(extra)
+    return payload
+
+
+def decode_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    raw = response["Payload"].read().decode("utf-8", "ignore")
+    doc = json.loads(raw)
+    return doc.get("body")
+
+
+@dataclass
+class MatchFetchResult:
+    request: MatchRequest
+    body: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class LambdaInvoker:
+    """
+    Shared Lambda invocation engine.
+    One pooled boto3 client + one bounded thread pool per process.
+    Batch calls are scheduled so that no region has more than its limit in flight.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        region_concurrency: int = DEFAULT_REGION_CONCURRENCY,
+        region_limits: Optional[Dict[str, int]] = None,
+        endpoint_url: Optional[str] = None,
+    ):
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.max_workers = max_workers
+        self.region_concurrency = region_concurrency
+        self.region_limits = dict(region_limits or {})
+        self.endpoint_url = endpoint_url
+
+    @property
+    def client(self):
+        # boto3 clients are thread-safe; build lazily so importing this module never hits AWS config
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    config = Config(
+                        max_pool_connections=self.max_workers,
+                        connect_timeout=5,
+                        read_timeout=DEFAULT_READ_TIMEOUT,
+                        retries={"max_attempts": 3, "mode": "adaptive"},
+                        tcp_keepalive=True,
+                    )
+                    self._client = boto3.client("lambda", endpoint_url=self.endpoint_url, config=config)
+        return self._client
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="lambda-invoke"
+                    )
+        return self._executor
+
+    def limit_for(self, region: str) -> int:
+        return max(1, self.region_limits.get(region, self.region_concurrency))
+
+    def _invoke_raw(self, function_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.client.invoke(
+            FunctionName=function_name,
+            InvocationType="RequestResponse",
+            Payload=json.dumps(payload).encode("utf-8"),
+        )
+
+    def invoke(self, function_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return decode_response(self._invoke_raw(function_name, payload))
+
+    def invoke_stream(
+        self, function_name: str, payload: Dict[str, Any], path: Sequence[str] = MATCHES_PATH
+    ) -> Iterator[Any]:
+        """
+        Invoke and yield the items of the array at `path` one by one while the payload is read.
+        Neither the raw document nor the full decoded list is ever held in memory.
+        """
+        response = self._invoke_raw(function_name, payload)
+        yield from iter_payload_items(response["Payload"], path)
+
+    def invoke_many(self, function_name: str, requests: Iterable[MatchRequest]) -> Iterator[MatchFetchResult]:
+        """
+        Fan out one invoke per request and yield results as they complete (not in input order).
+        A failed invoke is reported on its result instead of aborting the whole batch.
+        """
+        pending: Dict[str, Deque[MatchRequest]] = {}
+        for request in requests:
+            pending.setdefault(request[1], deque()).append(request)
+
+        in_flight: Dict[Any, MatchRequest] = {}
+        running: Dict[str, int] = {region: 0 for region in pending}
+
+        def fill():
+            # round-robin over regions so one huge region cannot starve the others
+            progressed = True
+            while progressed and len(in_flight) < self.max_workers:
+                progressed = False
+                for region, queue in pending.items():
+                    if not queue or running[region] >= self.limit_for(region):
+                        continue
+                    if len(in_flight) >= self.max_workers:
+                        break
+                    request = queue.popleft()
+                    future = self.executor.submit(self.invoke, function_name, build_payload(*request))
+                    in_flight[future] = request
+                    running[region] += 1
+                    progressed = True
+
+        fill()
+        try:
+            while in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    request = in_flight.pop(future)
+                    running[request[1]] -= 1
+                    try:
+                        yield MatchFetchResult(request=request, body=future.result())
+                    except Exception as e:
+                        yield MatchFetchResult(request=request, error=e)
+                fill()
+        finally:
+            # consumer stopped early: drop queued work, let running invokes finish in the background
+            for future in in_flight:
+                future.cancel()
+
+    def shutdown(self, wait_for_running: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait_for_running)
+            self._executor = None
+
+
+_default_invoker: Optional[LambdaInvoker] = None
+_default_lock = threading.Lock()
+
+
+def get_invoker() -> LambdaInvoker:
+    """Process-wide invoker, configured from env (LAMBDA_MAX_WORKERS, LAMBDA_REGION_CONCURRENCY, LAMBDA_ENDPOINT_URL)."""
+    global _default_invoker
+    if _default_invoker is None:
+        with _default_lock:
+            if _default_invoker is None:
+                env = get_env()
+                _default_invoker = LambdaInvoker(
+                    max_workers=env.int("LAMBDA_MAX_WORKERS", default=DEFAULT_MAX_WORKERS),
+                    region_concurrency=env.int("LAMBDA_REGION_CONCURRENCY", default=DEFAULT_REGION_CONCURRENCY),
+                    endpoint_url=env("LAMBDA_ENDPOINT_URL", default=None),
+                )
+    return _default_invoker
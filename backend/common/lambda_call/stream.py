@@ -0,0 +1,224 @@
+import codecs
+import json
+import re
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+# Where the match list lives inside the Lambda document: {"statusCode": ..., "body": {"matches": [...]}}
+MATCHES_PATH = ("body", "matches")
+CHUNK_SIZE = 64 * 1024
+
+_STRUCT = re.compile(r'["{}\[\]]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[,}\]\s]")
+_NON_WS = re.compile(r"\S")
+_DECODER = json.JSONDecoder()
+# longest token the decoder can reject only because the window cut it ("-Infinit", "tru", "\u00e")
+_CUT_TOKEN = len("-Infinity")
+
+
+class _TextStream:
+    """
+    Sliding window over a chunked UTF-8 byte stream.
+    Only the part from `mark` (value being captured) or `pos` onward is kept in memory.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")("ignore")
+        self._done = False
+        self.buf = ""
+        self.pos = 0
+        self.mark: Optional[int] = None
+
+    def more(self) -> bool:
+        while not self._done:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._done = True
+                text = self._decoder.decode(b"", final=True)
+            else:
+                text = self._decoder.decode(chunk)
+            if not text:
+                continue
+            keep = self.pos if self.mark is None else self.mark
+            self.buf = self.buf[keep:] + text
+            self.pos -= keep
+            if self.mark is not None:
+                self.mark -= keep
+            return True
+        return False
+
+    def search(self, pattern: "re.Pattern[str]") -> "re.Match[str]":
+        while True:
+            m = pattern.search(self.buf, self.pos)
+            if m is not None:
+                return m
+            self.pos = len(self.buf)
+            if not self.more():
+                raise ValueError("Truncated JSON payload")
+
+    def peek(self) -> str:
+        while True:
+            m = _NON_WS.search(self.buf, self.pos)
+            if m is not None:
+                self.pos = m.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self.more():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON payload, got {found!r}")
+        self.pos += 1
+
+    def skip_string(self):
+        self.pos += 1
+        while True:
+            m = self.search(_STRING_END)
+            if m.group() == '"':
+                self.pos = m.end()
+                return
+            # backslash escape: make sure the escaped char is buffered before jumping over it
+            self.pos = m.start()
+            while self.pos + 1 >= len(self.buf):
+                if not self.more():
+                    raise ValueError("Truncated JSON payload")
+            self.pos += 2
+
+    def skip_container(self):
+        depth = 0
+        while True:
+            m = self.search(_STRUCT)
+            char = m.group()
+            if char == '"':
+                self.pos = m.start()
+                self.skip_string()
+                continue
+            depth += 1 if char in "{[" else -1
+            self.pos = m.end()
+            if depth == 0:
+                return
+
+    def skip_value(self):
+        char = self.peek()
+        if char == '"':
+            self.skip_string()
+        elif char in ("{", "["):
+            self.skip_container()
+        elif char:
+            self.pos = self.search(_SCALAR_END).start()
+        else:
+            raise ValueError("Truncated JSON payload")
+
+    def decode_value(self) -> Any:
+        """
+        Decode the next value with the C decoder straight out of the window.
+        On a cut-off value the window is grown geometrically and decoding retried,
+        so a value is re-scanned O(log(size / CHUNK_SIZE)) times at most.
+        """
+        self.peek()
+        self.mark = self.pos
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # a number cut by the window edge ("12" of "12.5") decodes fine, so a scalar only
+                # counts once the character after it ends it
+                complete = isinstance(value, (str, list, dict)) or _SCALAR_END.match(self.buf, end)
+                if complete or self._done:
+                    self.pos = end
+                    self.mark = None
+                    return value
+            except json.JSONDecodeError as err:
+                # an unterminated string or an error in the last few characters may just be the window
+                # edge; anything earlier is malformed and more data will not fix it
+                cut = err.msg.startswith("Unterminated string") or len(self.buf) - err.pos < _CUT_TOKEN
+                if not cut:
+                    raise ValueError(f"Malformed JSON payload: {err.msg} at offset {err.pos - self.pos}") from err
+                if self._done:
+                    raise ValueError("Truncated JSON payload")
+            target = 2 * (len(self.buf) - self.pos)
+            while len(self.buf) - self.pos < target and self.more():
+                pass
+
+    def capture(self, skip: Callable[[], None]) -> str:
+        self.peek()
+        self.mark = self.pos
+        skip()
+        text = self.buf[self.mark:self.pos]
+        self.mark = None
+        return text
+
+
+def _iter_array(stream: _TextStream) -> Iterator[Any]:
+    stream.expect("[")
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        yield stream.decode_value()
+        char = stream.peek()
+        stream.pos += 1
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+
+
+def _iter_decoded(value: Any, path: Sequence[str]) -> Iterator[Any]:
+    for key in path:
+        if isinstance(value, list):
+            break
+        if not isinstance(value, dict):
+            return
+        value = value.get(key)
+    if isinstance(value, list):
+        yield from value
+
+
+def iter_json_items(chunks: Iterable[bytes], path: Sequence[str] = MATCHES_PATH) -> Iterator[Any]:
+    """
+    Incrementally parse a JSON document and yield the elements of the array found at `path`,
+    one decoded element at a time. Sibling values are skipped without being decoded.
+
+    If an array is reached before `path` is exhausted (e.g. a body that is the match list itself),
+    that array is streamed. A string value on the path (double-encoded body) has to be decoded whole.
+    """
+    stream = _TextStream(chunks)
+    depth = 0
+    stream.expect("{")
+    while depth < len(path):
+        char = stream.peek()
+        if char == "}" or not char:
+            return
+        if char == ",":
+            stream.pos += 1
+            continue
+        key = json.loads(stream.capture(stream.skip_string))
+        stream.expect(":")
+        if key != path[depth]:
+            stream.skip_value()
+            continue
+
+        char = stream.peek()
+        depth += 1
+        if char == "[":
+            yield from _iter_array(stream)
+            return
+        if char == '"':
+            decoded = json.loads(json.loads(stream.capture(stream.skip_string)))
+            yield from _iter_decoded(decoded, path[depth:])
+            return
+        if char != "{" or depth == len(path):
+            return
+        stream.expect("{")
+
+
+def iter_payload_items(payload, path: Sequence[str] = MATCHES_PATH, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Stream items out of a boto3 Lambda `Payload` (botocore StreamingBody or any file-like object)."""
+    if hasattr(payload, "iter_chunks"):
+        chunks = payload.iter_chunks(chunk_size)
+    else:
+        chunks = iter(lambda: payload.read(chunk_size), b"")
+    return iter_json_items(chunks, path)
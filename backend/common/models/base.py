@@ -0,0 +1,87 @@
+import sys
+from dataclasses import MISSING, fields, make_dataclass
+from dataclasses import field as dataclass_field
+from itertools import starmap
+from typing import Dict, Iterable, List, Sequence, Type, TypeVar
+
+T = TypeVar("T", bound="Model")
+
+# Frozen<Name> variant -> the model it was made from, and back
+_source: Dict[type, type] = {}
+_frozen: Dict[type, type] = {}
+
+
+class Model:
+    """
+    Base of the row dataclasses in common.models (declared with @dataclass(slots=True), so
+    instances carry no __dict__).
+
+    from_row / from_rows build instances from DB tuples in field order; trailing fields missing
+    from the row take their defaults. frozen() returns an immutable variant with the same fields
+    (and methods) for batch code that hands rows to other threads or caches and must not see
+    them change.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_row(cls: Type[T], row: Sequence) -> T:
+        source = _source.get(cls)
+        if source is None:
+            return cls(*row)
+        obj = source(*row)
+        obj.__class__ = cls
+        return obj
+
+    @classmethod
+    def from_rows(cls: Type[T], rows: Iterable[Sequence]) -> List[T]:
+        source = _source.get(cls)
+        if source is None:
+            return list(starmap(cls, rows))
+        built = list(starmap(source, rows))
+        for obj in built:
+            obj.__class__ = cls
+        return built
+
+    @classmethod
+    def frozen(cls: Type[T]) -> Type[T]:
+        return frozen_variant(cls)
+
+
+def frozen_variant(cls: type) -> type:
+    """
+    Frozen, slotted copy of a model dataclass (Frozen<Name>), created once per class.
+
+    It has the same slot layout as the model, so from_row / from_rows build instances with the
+    model's generated __init__ and then switch their class: several times faster than the
+    frozen dataclass __init__, which sets every field through object.__setattr__.
+    """
+    if cls.__dataclass_params__.frozen:
+        return cls
+    variant = _frozen.get(cls)
+    if variant is None:
+        spec = []
+        for f in fields(cls):
+            kwargs = {"default": f.default} if f.default is not MISSING else {}
+            if f.default_factory is not MISSING:
+                kwargs = {"default_factory": f.default_factory}
+            spec.append((f.name, f.type, dataclass_field(**kwargs)))
+        # methods, properties and classmethods declared on the model (not the generated dunders)
+        namespace = {
+            name: value
+            for name, value in cls.__dict__.items()
+            if not name.startswith("__") and name not in cls.__dataclass_fields__
+        }
+        namespace.update(__module__=cls.__module__, __doc__=f"Immutable {cls.__name__}.")
+        variant = make_dataclass(
+            f"Frozen{cls.__name__}",
+            spec,
+            bases=(Model,),
+            namespace=namespace,
+            frozen=True,
+            slots=True,
+        )
+        _frozen[cls], _source[variant] = variant, cls
+        # importable next to the model, so instances pickle (cache entries, process pools)
+        setattr(sys.modules[cls.__module__], variant.__name__, variant)
+    return variant
@@ -1,14 +1,15 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+from common.models.base import Model
 
 
 # =========================================================
 # Champion (league_champions)
 # =========================================================
-@dataclass
-class Champion:
+@dataclass(slots=True)
+class Champion(Model):
     id: Optional[int]                     # BIGSERIAL PK (DB 생성)
     champion_id: int                      # UNIQUE
     champion_key: str                     # UNIQUE
@@ -0,0 +1,16 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime
+
+from common.models.base import Model
+
+
+# =========================================================
+# ChampionCatalogVersion (league_champion_catalog_version)
+# =========================================================
+@dataclass(slots=True)
+class ChampionCatalogVersion(Model):
+    version: str                           # Data Dragon version league_champions was seeded from
+    locale: str = "en_US"
+    updated_at: Optional[datetime] = None  # timestamptz; bumped on every seed that changed rows
@@ -1,13 +1,15 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+from common.models.base import Model
+
 
 # =========================================================
 # ChampionRecommendation (league_champion_recommendations)
 # =========================================================
-@dataclass
-class ChampionRecommendation:
+@dataclass(slots=True)
+class ChampionRecommendation(Model):
     id: Optional[int]
     player_id: int
     champion_id: int
@@ -1,18 +1,47 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+
+from common.models.base import Model
 
 
 # =========================================================
 # Match (league_matches)
 # =========================================================
-@dataclass
-class Match:
+@dataclass(slots=True)
+class Match(Model):
     id: Optional[int]
-    match_id: str                          # UNIQUE
+    match_id: str                          # UNIQUE with match_timestamp (partition key)
     player_id: int                         # FK -> league_players.id
-    raw_data: Dict[str, Any]               # jsonb
+    raw_data: Optional[Dict[str, Any]]     # full document; stored as jsonb, or zlib in raw_zlib when split
     match_timestamp: int                   # epoch(ms) or (s) – DB 그대로
     is_processed: bool = False
 
+    # split storage (common.analysis.match_document); None for rows stored whole
+    game_info: Optional[Dict[str, Any]] = None        # jsonb, info without participants/teams
+    participant: Optional[Dict[str, Any]] = None      # jsonb, the player's own participant entry
+    teams: Optional[List[Dict[str, Any]]] = None      # jsonb, info.teams + per-team totals
+
+    @property
+    def is_split(self) -> bool:
+        return self.game_info is not None
+
+    @classmethod
+    def from_riot(cls, raw: Dict[str, Any], player_id: int, puuid: Optional[str] = None) -> Match:
+        """
+        Riot match-v5 document -> Match (league_matches row, not yet stored).
+        With the player's puuid the row is stored split: narrow slices plus the compressed document.
+        """
+        info = raw.get("info") or {}
+        match = cls(
+            id=None,
+            match_id=raw["metadata"]["matchId"],
+            player_id=player_id,
+            raw_data=raw,
+            match_timestamp=int(info.get("gameCreation") or info.get("gameStartTimestamp") or 0),
+        )
+        if puuid is not None:
+            from common.analysis.match_document import split_document
+
+            match.game_info, match.participant, match.teams = split_document(raw, puuid)
+        return match
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from datetime import datetime
+
+from common.models.base import Model
+
+
+# =========================================================
+# MatchSyncState (league_match_sync_state)
+# =========================================================
+@dataclass(slots=True)
+class MatchSyncState(Model):
+    player_id: int                         # PK, FK -> league_players.id
+    last_match_timestamp: int = 0          # high-water mark; same unit as Match.match_timestamp
+    last_match_id: Optional[str] = None
+    last_synced_at: Optional[datetime] = None   # timestamptz
+    body_misses: Dict[str, int] = field(default_factory=dict)  # jsonb; match id -> syncs without its body
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+from common.models.base import Model
+
+
+# =========================================================
+# PipelineJobStage (league_pipeline_job_stages)
+# =========================================================
+@dataclass(slots=True)
+class PipelineJobStage(Model):
+    stage: str                             # fetch, metrics, chapters, playstyle, similarity, recommendations
+    status: str = "pending"                # pending, running, succeeded, failed
+    attempts: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None      # last attempt
+    detail: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+# =========================================================
+# PipelineJob (league_pipeline_jobs)
+# =========================================================
+@dataclass(slots=True)
+class PipelineJob(Model):
+    id: Optional[int]
+    player_id: int
+    puuid: str
+    season: int
+    status: str = "queued"                 # queued, running, succeeded, failed
+    stage: Optional[str] = None            # running now / failed last
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    stages: List[PipelineJobStage] = field(default_factory=list)
+
+    @property
+    def progress(self) -> float:
+        """Share of stages finished, 0..1."""
+        if not self.stages:
+            return 0.0
+        return sum(s.status == "succeeded" for s in self.stages) / len(self.stages)
@@ -1,13 +1,15 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+from common.models.base import Model
+
 
 # =========================================================
 # Player (league_players)
 # =========================================================
-@dataclass
-class Player:
+@dataclass(slots=True)
+class Player(Model):
     id: Optional[int]                     # BIGSERIAL PK
     game_name: str
     tag_line: str = ""
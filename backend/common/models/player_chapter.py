@@ -1,13 +1,16 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from typing import Optional, Dict, Any
 from datetime import datetime
 
+from common.models.base import Model
+
+
 # =========================================================
 # PlayerChapter (league_player_chapters)
 # =========================================================
-@dataclass
-class PlayerChapter:
+@dataclass(slots=True)
+class PlayerChapter(Model):
     id: Optional[int]
     player_id: int
     chapter_index: int
@@ -1,15 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Sequence
+
+from common.models.base import Model
+
 
 # =========================================================
 # PlayerMatchMetrics (league_player_match_metrics)
 # =========================================================
-@dataclass
-class PlayerMatchMetrics:
+@dataclass(slots=True)
+class PlayerMatchMetrics(Model):
     id: Optional[int]
-    match_id: int                          # UNIQUE, FK -> league_matches.id
+    match_id: int                          # FK (with match_recorded_at) -> league_matches (id, match_timestamp)
     player_id: int                         # FK -> league_players.id
 
     champion_id: int
@@ -56,5 +58,17 @@ class PlayerMatchMetrics:
     objective_contribution: Optional[Dict[str, Any]] = None
     analysis_json: Optional[Dict[str, Any]] = None
 
-    match_recorded_at: int = 0             # = match_timestamp; for indexing
+    match_recorded_at: int = 0             # = match_timestamp; partition key
+
+    @classmethod
+    def from_riot(
+        cls,
+        raws: Sequence[Dict[str, Any]],
+        puuids: Sequence[str],
+        match_pks: Sequence[int],
+        player_ids: Sequence[int],
+    ) -> List[PlayerMatchMetrics]:
+        """Riot match-v5 documents -> one unsaved row per match the puuid played in (vectorized extraction)."""
+        from common.analysis.match_metrics import extract_metrics_rows
 
+        return cls.from_rows([(None, *row) for row in extract_metrics_rows(raws, puuids, match_pks, player_ids)])
@@ -1,13 +1,15 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+
+from common.models.base import Model
+
 
 # =========================================================
 # PlayerPlaystyle (league_player_playstyle)
 # =========================================================
-@dataclass
-class PlayerPlaystyle:
+@dataclass(slots=True)
+class PlayerPlaystyle(Model):
     id: Optional[int]
     player_id: Optional[int]                 # UNIQUE, nullable
     pro_player_id: Optional[int]             # UNIQUE, nullable
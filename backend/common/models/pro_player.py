@@ -1,13 +1,15 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+from common.models.base import Model
+
 
 # =========================================================
 # ProPlayer (league_pro_players)
 # =========================================================
-@dataclass
-class ProPlayer:
+@dataclass(slots=True)
+class ProPlayer(Model):
     id: Optional[int]
     name: str
     team: Optional[str]
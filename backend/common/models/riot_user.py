@@ -1,14 +1,16 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass
+from typing import Optional
 from datetime import datetime
 
+from common.models.base import Model
+
 
 # =========================================================
 # RiotUser (league_riot_users)
 # =========================================================
-@dataclass
-class RiotUser:
+@dataclass(slots=True)
+class RiotUser(Model):
     riot_id: str                          # PK, e.g. "gameName#tagLine"
     region: str
     main_role: str                        # 'TOP','JUNGLE','MIDDLE','BOTTOM','SUPPORT'
@@ -1,13 +1,15 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+from common.models.base import Model
+
 
 # =========================================================
 # SimilarityMatch (league_similarity_matches)
 # =========================================================
-@dataclass
-class SimilarityMatch:
+@dataclass(slots=True)
+class SimilarityMatch(Model):
     id: Optional[int]
     player_id: int
     pro_player_id: int
@@ -0,0 +1,682 @@
+import io
+import json
+import pickle
+import threading
+import time
+from dataclasses import FrozenInstanceError
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from django.core.management import call_command
+
+from common.analysis.match_document import compress_document, decompress_document, split_document
+from common.analysis.match_metrics import METRICS_COLUMNS, extract_metrics_rows, extract_slice_rows, to_models
+from common.analysis.binseg import binseg, binseg_batch, segments
+from common.analysis.chapter_aggregates import aggregate_chapters, season_arrays
+from common.analysis.champion_recommender import CoPlayModel
+from common.analysis.playstyle import FEATURES, PercentileTables, score_players
+from common.analysis.season_columns import SeasonColumns
+from common.analysis.similarity_index import SimilarityIndex
+from common.analysis.downsample import bucket_means, downsample, lttb_indices, rolling_mean_1d
+from common.lambda_call.fetch_matches import fetch_matches_many
+from common.lambda_call.invoker import LambdaInvoker
+from common.lambda_call.stream import iter_json_items
+from common.models.match import Match
+from common.models.pipeline_job import PipelineJob, PipelineJobStage
+from common.models.player_match_metrics import PlayerMatchMetrics
+from common.utils.command_util import BatchCommand
+from common.utils.db_util import statement_timeout
+from scripts.seed_champions import champion_rows, diff_champions
+
+
+class StubLambdaClient:
+    """Local stand-in for boto3's lambda client: echoes the payload back as the body."""
+
+    def __init__(self, delay=0.01, fail_riot_ids=()):
+        self.delay = delay
+        self.fail_riot_ids = set(fail_riot_ids)
+        self.lock = threading.Lock()
+        self.running = {}
+        self.max_running = {}
+        self.calls = 0
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        payload = json.loads(Payload)
+        region = payload["region"]
+        with self.lock:
+            self.calls += 1
+            self.running[region] = self.running.get(region, 0) + 1
+            self.max_running[region] = max(self.max_running.get(region, 0), self.running[region])
+        try:
+            time.sleep(self.delay)
+            if payload["riotId"] in self.fail_riot_ids:
+                raise RuntimeError("lambda failed")
+            matches = [{"metadata": {"matchId": f"{payload['riotId']}_{i}"}} for i in range(payload.get("max", 0))]
+            doc = {"statusCode": 200, "body": {"function": FunctionName, "request": payload, "matches": matches}}
+            return {"Payload": io.BytesIO(json.dumps(doc).encode("utf-8"))}
+        finally:
+            with self.lock:
+                self.running[region] -= 1
+
+
+class LambdaInvokerTests(TestCase):
+    def test_invoke_returns_body(self):
+        """Test LambdaInvoker.invoke decodes the body from the Lambda payload"""
+        invoker = LambdaInvoker(client=StubLambdaClient(delay=0))
+        body = invoker.invoke("fn", {"riotId": "a#1", "region": "jp1"})
+        self.assertEqual(body["request"]["riotId"], "a#1")
+        invoker.shutdown()
+
+    def test_fetch_matches_many_returns_every_request(self):
+        """Test fetch_matches_many yields one result per request"""
+        invoker = LambdaInvoker(client=StubLambdaClient(), max_workers=8)
+        requests = [(f"p{i}#JP1", "jp1", 2025, "AUTO", 10) for i in range(20)]
+
+        results = list(fetch_matches_many(requests, invoker=invoker))
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual({r.request for r in results}, set(requests))
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(results[0].body["function"], "fetch-user-match-history")
+        invoker.shutdown()
+
+    def test_fetch_matches_many_respects_region_limits(self):
+        """Test per-region concurrency limits are never exceeded"""
+        client = StubLambdaClient(delay=0.02)
+        invoker = LambdaInvoker(client=client, max_workers=10, region_concurrency=3, region_limits={"kr": 1})
+        requests = [(f"p{i}", region, 2025, "AUTO", 10) for i in range(12) for region in ("jp1", "kr", "na1")]
+
+        results = list(fetch_matches_many(requests, invoker=invoker))
+
+        self.assertEqual(len(results), 36)
+        self.assertLessEqual(client.max_running["jp1"], 3)
+        self.assertLessEqual(client.max_running["na1"], 3)
+        self.assertEqual(client.max_running["kr"], 1)
+        invoker.shutdown()
+
+    def test_fetch_matches_many_reports_errors_per_request(self):
+        """Test a failing invoke does not abort the batch"""
+        invoker = LambdaInvoker(client=StubLambdaClient(fail_riot_ids={"bad"}), max_workers=4)
+        requests = [("good", "jp1", 2025, "AUTO", 1), ("bad", "jp1", 2025, "AUTO", 1)]
+
+        results = {r.request[0]: r for r in fetch_matches_many(requests, invoker=invoker)}
+
+        self.assertTrue(results["good"].ok)
+        self.assertFalse(results["bad"].ok)
+        self.assertIsInstance(results["bad"].error, RuntimeError)
+        invoker.shutdown()
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class StreamingDecodeTests(TestCase):
+    def setUp(self):
+        self.matches = [
+            {"metadata": {"matchId": "JP1_1"}, "info": {"note": "brace } [ \\\" quote", "n": [1, 2]}},
+            {"metadata": {"matchId": "JP1_2"}, "info": {"name": "라구사", "win": True, "x": None}},
+            {"metadata": {"matchId": "JP1_3"}, "info": {"gameDuration": 1800.5}},
+        ]
+
+    def test_streams_matches_across_small_chunks(self):
+        """Test items are decoded correctly whatever the chunk boundaries are"""
+        doc = {"statusCode": 200, "headers": {"x": "[{"}, "body": {"count": 3, "matches": self.matches}}
+        data = json.dumps(doc, ensure_ascii=False).encode("utf-8")
+        for size in (1, 3, 7, 64, len(data)):
+            self.assertEqual(list(iter_json_items(chunked(data, size))), self.matches)
+
+    def test_number_cut_at_chunk_boundary(self):
+        """Test a number split right after its "." or "e" is not decoded as the truncated integer"""
+        cases = [
+            ([b'{"body": {"matches": [12.', b'5]}}'], [12.5]),
+            ([b'{"body": {"matches": [1e', b"3, 7]}}"], [1000.0, 7]),
+            ([b'{"body": {"matches": [12', b".5]}}"], [12.5]),
+        ]
+        for chunks, expected in cases:
+            self.assertEqual(list(iter_json_items(chunks)), expected)
+
+    def test_yields_lazily(self):
+        """Test the first match is yielded before the rest of the payload is read"""
+        data = json.dumps({"body": {"matches": self.matches}}).encode("utf-8")
+        consumed = []
+
+        def chunks():
+            for chunk in chunked(data, 16):
+                consumed.append(chunk)
+                yield chunk
+
+        first = next(iter_json_items(chunks()))
+        self.assertEqual(first, self.matches[0])
+        self.assertLess(sum(map(len, consumed)), len(data))
+
+    def test_double_encoded_and_list_bodies(self):
+        """Test string-encoded bodies and bodies that are the match list itself"""
+        encoded = json.dumps({"body": json.dumps({"matches": self.matches})}).encode("utf-8")
+        as_list = json.dumps({"body": self.matches}).encode("utf-8")
+        self.assertEqual(list(iter_json_items(chunked(encoded, 5))), self.matches)
+        self.assertEqual(list(iter_json_items(chunked(as_list, 5))), self.matches)
+
+    def test_missing_and_empty(self):
+        """Test a missing path or empty array yields nothing"""
+        self.assertEqual(list(iter_json_items([b'{"body": {"matches": []}}'])), [])
+        self.assertEqual(list(iter_json_items([b'{"statusCode": 500, "body": null}'])), [])
+
+    def test_truncated_payload_raises(self):
+        """Test a truncated payload raises ValueError"""
+        with self.assertRaises(ValueError):
+            list(iter_json_items([b'{"body": {"matches": [{"a": 1}, {"b": ']))
+
+    def test_malformed_element_raises_without_reading_on(self):
+        """Test a malformed element raises the decode error instead of waiting for more data"""
+        doc = b'{"body": {"matches": [{"a": 1}, {"b" 2}, ' + b'{"c": 3}, ' * 1000 + b'{"d": 4}]}}'
+        chunks = iter([doc[i:i + 64] for i in range(0, len(doc), 64)])
+        items = iter_json_items(chunks)
+        self.assertEqual(next(items), {"a": 1})
+        with self.assertRaisesRegex(ValueError, "Expecting ':' delimiter"):
+            next(items)
+        self.assertIsNotNone(next(chunks, None))
+
+    def test_invoke_stream(self):
+        """Test LambdaInvoker.invoke_stream against the stub Lambda"""
+        invoker = LambdaInvoker(client=StubLambdaClient(delay=0))
+        items = list(invoker.invoke_stream("fn", {"riotId": "a", "region": "jp1", "max": 3}))
+        self.assertEqual([m["metadata"]["matchId"] for m in items], ["a_0", "a_1", "a_2"])
+
+
+def riot_participant(puuid, team_id, kills=1, deaths=1, assists=1, damage=1000, **extra):
+    participant = {
+        "puuid": puuid,
+        "teamId": team_id,
+        "kills": kills,
+        "deaths": deaths,
+        "assists": assists,
+        "totalDamageDealtToChampions": damage,
+        "championId": 1,
+        "championName": "Annie",
+        "teamPosition": "UTILITY",
+        "totalMinionsKilled": 150,
+        "neutralMinionsKilled": 30,
+        "goldEarned": 9000,
+        "visionScore": 30,
+        "win": team_id == 100,
+    }
+    participant.update(extra)
+    return participant
+
+
+def riot_match_doc(target_puuid, duration=1800, **target_stats):
+    participants = [riot_participant(target_puuid, 100, **target_stats)]
+    participants += [riot_participant(f"ally{i}", 100) for i in range(4)]
+    participants += [riot_participant(f"enemy{i}", 200, kills=3) for i in range(5)]
+    return {
+        "metadata": {"matchId": "JP1_1"},
+        "info": {"gameCreation": 1, "gameDuration": duration, "gameEndTimestamp": 2, "participants": participants},
+    }
+
+
+class MatchMetricsTests(TestCase):
+    def test_extract_metrics_values(self):
+        """Test per-minute and share metrics for the target participant"""
+        raw = riot_match_doc("me", kills=6, deaths=2, assists=4, damage=6000)
+
+        rows = extract_metrics_rows([raw], ["me"], match_pks=[11], player_ids=[7], recorded_at=[99])
+        metrics = to_models(rows)[0]
+
+        self.assertEqual(len(rows[0]), len(METRICS_COLUMNS))
+        self.assertEqual((metrics.match_id, metrics.player_id, metrics.match_recorded_at), (11, 7, 99))
+        self.assertEqual(metrics.role, "SUPPORT")
+        self.assertAlmostEqual(metrics.cs_per_min, 180 / 30)
+        self.assertAlmostEqual(metrics.gold_per_min, 300)
+        self.assertAlmostEqual(metrics.damage_per_min, 200)
+        self.assertAlmostEqual(metrics.damage_share, 6000 / 10000)
+        self.assertAlmostEqual(metrics.kill_participation, 10 / 10)
+        self.assertAlmostEqual(metrics.kda_ratio, 5)
+        self.assertTrue(metrics.win)
+        self.assertEqual(metrics.game_duration, 1800)
+
+    def test_extract_metrics_batch_alignment(self):
+        """Test a batch keeps rows aligned and drops matches without the player"""
+        raws = [riot_match_doc("a", kills=2), riot_match_doc("x"), riot_match_doc("c", duration=0)]
+
+        rows = extract_metrics_rows(raws, ["a", "b", "c"], match_pks=[1, 2, 3], player_ids=[10, 20, 30])
+        metrics = to_models(rows)
+
+        self.assertEqual([m.match_id for m in metrics], [1, 3])
+        self.assertEqual(metrics[0].kills, 2)
+        self.assertIsNone(metrics[1].cs_per_min)
+
+    def test_legacy_duration_in_ms(self):
+        """Test gameDuration is read as ms when gameEndTimestamp is absent"""
+        raw = riot_match_doc("me")
+        raw["info"]["gameDuration"] = 1_800_000
+        del raw["info"]["gameEndTimestamp"]
+
+        metrics = to_models(extract_metrics_rows([raw], ["me"], [1], [1]))[0]
+
+        self.assertEqual(metrics.game_duration, 1800)
+
+    def test_split_document_slices(self):
+        """Test the stored slices carry the target, team totals and game info, and extract like the document"""
+        raws = [riot_match_doc("me", kills=6, damage=6000), riot_match_doc("x")]
+        raws[0]["info"]["teams"] = [{"teamId": 200, "win": False, "bans": []}]
+
+        game_info, participant, teams = split_document(raws[0], "me")
+
+        self.assertEqual(participant["puuid"], "me")
+        self.assertNotIn("participants", game_info)
+        self.assertEqual(game_info["gameDuration"], 1800)
+        self.assertEqual(
+            {team["teamId"]: team["totals"] for team in teams},
+            {
+                200: {"kills": 15, "totalDamageDealtToChampions": 5000},
+                100: {"kills": 10, "totalDamageDealtToChampions": 10000},
+            },
+        )
+        self.assertEqual(teams[0]["bans"], [])
+        self.assertIsNone(split_document(raws[1], "me")[1])
+        slices = [split_document(raw, "me") for raw in raws]
+        self.assertEqual(
+            extract_slice_rows(slices, [1, 2], [7, 7], [5, 6]),
+            extract_metrics_rows(raws, ["me", "me"], [1, 2], [7, 7], [5, 6]),
+        )
+        self.assertEqual(decompress_document(compress_document(raws[0])), raws[0])
+
+
+def stepped_series(levels, lengths, d=3, noise=0.3, seed=0):
+    rng = np.random.default_rng(seed)
+    blocks = [np.full((n, d), level) + rng.normal(0, noise, (n, d)) for level, n in zip(levels, lengths)]
+    return np.vstack(blocks)
+
+
+class BinsegTests(TestCase):
+    def test_detects_mean_shifts(self):
+        """Test Binseg finds the change points of a multivariate step series"""
+        x = stepped_series([0, 3, -2], [40, 50, 30])
+
+        breaks = binseg(x)
+
+        self.assertEqual(len(breaks), 3)
+        self.assertEqual(breaks[-1], 120)
+        self.assertLessEqual(abs(breaks[0] - 40), 2)
+        self.assertLessEqual(abs(breaks[1] - 90), 2)
+        self.assertEqual(segments(breaks)[1], (breaks[0], breaks[1]))
+
+    def test_segment_count_bounds(self):
+        """Test min/max segment counts and min segment size are respected"""
+        flat = stepped_series([0], [100])
+        many = stepped_series([0, 5, 0, 5, 0, 5, 0, 5], [15] * 8)
+
+        self.assertEqual(len(binseg(flat, min_segments=2)), 2)
+        self.assertEqual(len(binseg(many, max_segments=5, penalty=None)), 5)
+        self.assertEqual(binseg(flat[:8], min_size=5), [8])
+        for start, end in segments(binseg(many, max_segments=5, min_size=10, penalty=None)):
+            self.assertGreaterEqual(end - start, 10)
+
+    def test_batch_matches_single(self):
+        """Test binseg_batch returns the same breaks as per-series calls, in order"""
+        series = [stepped_series([0, i % 4], [30, 30 + i], seed=i) for i in range(6)]
+
+        self.assertEqual(binseg_batch(series, chunk_size=2), [binseg(x) for x in series])
+
+
+class ChapterAggregateTests(TestCase):
+    @staticmethod
+    def rows_for_season():
+        day = 86_400_000
+        return [
+            # match_id, recorded_at, win, k, d, a, kda, cs/min, dmg/min, vision/min, champion_id, name
+            (100 + i, 1_735_689_600_000 + i * day, i % 2, 5, 2, 5, 5.0, 6.0 + i, 500.0, None if i == 1 else 1.0,
+             1 if i < 4 else 2, "Annie" if i < 4 else "Olaf")
+            for i in range(10)
+        ]
+
+    def setUp(self):
+        self.rows = self.rows_for_season()
+
+    def test_chapter_values(self):
+        """Test chapter aggregates equal direct means over each chapter's games"""
+        season = season_arrays(self.rows)
+
+        chapters = aggregate_chapters(season, [4, 10], player_id=7, season_year=2025, icons={2: "olaf.png"})
+
+        (first, first_ids), (second, second_ids) = chapters
+        self.assertEqual(first_ids, [100, 101, 102, 103])
+        self.assertEqual((first.start_game_idx, first.end_game_idx, first.games_count), (1, 4, 4))
+        self.assertAlmostEqual(first.win_rate, 0.5)
+        self.assertAlmostEqual(first.cs_score, np.mean([6, 7, 8, 9]) / 10 * 100)
+        self.assertAlmostEqual(first.vision_score, 1.0 / 2.5 * 100)
+        self.assertEqual((first.top_champion_id, first.top_champion_name, first.top_champion_games), (1, "Annie", 4))
+        self.assertEqual(str(first.start_date), "2025-01-01")
+        self.assertEqual((second.chapter_index, second.top_champion_icon_url), (2, "olaf.png"))
+        self.assertEqual(len(second_ids), 6)
+
+    def test_offsets_for_tail(self):
+        """Test chapter/game offsets when only the season tail is re-derived"""
+        season = season_arrays(self.rows[6:])
+
+        [(chapter, _)] = aggregate_chapters(season, [4], 7, 2025, chapter_offset=2, game_offset=40)
+
+        self.assertEqual((chapter.chapter_index, chapter.start_game_idx, chapter.end_game_idx), (3, 41, 44))
+
+
+class SeasonColumnsTests(TestCase):
+    FIELDS = (
+        "match_id", "match_recorded_at", "win", "kills", "deaths", "assists", "kda_ratio",
+        "cs_per_min", "damage_per_min", "vision_score_per_min",
+    )
+
+    def setUp(self):
+        # ChapterAggregateTests' season as the SQL returns it: NULL already NaN, role code last
+        self.rows = [
+            row[:9] + (np.nan if row[9] is None else row[9],) + row[10:] + (3 if i < 5 else 0,)
+            for i, row in enumerate(ChapterAggregateTests.rows_for_season())
+        ]
+
+    def test_typed_columns_and_interned_codes(self):
+        """Test rows become typed columns with champion and role codes decoded on access"""
+        season = SeasonColumns.from_rows(self.rows, self.FIELDS)
+
+        self.assertEqual(season.games, 10)
+        self.assertEqual(season["kills"].dtype, np.int16)
+        self.assertEqual(season["cs_per_min"].dtype, np.float32)
+        self.assertTrue(np.isnan(season["vision_score_per_min"][1]))
+        self.assertEqual(season.champion_names, ("Annie", "Olaf"))
+        self.assertEqual(season["champion_id"].tolist(), [1] * 4 + [2] * 6)
+        self.assertEqual(season["champion_name"][5], "Olaf")
+        self.assertEqual(season["role"].tolist(), ["MIDDLE"] * 5 + [None] * 5)
+
+    def test_bytes_round_trip(self):
+        """Test to_bytes/from_bytes restores every column, code and the champion table"""
+        season = SeasonColumns.from_rows(self.rows, self.FIELDS)
+
+        restored = SeasonColumns.from_bytes(season.to_bytes())
+
+        self.assertEqual(list(restored), list(season))
+        for name in season:
+            np.testing.assert_array_equal(restored[name], season[name])
+        with self.assertRaises(ValueError):
+            SeasonColumns.from_bytes(b"nope")
+
+    def test_chapters_match_dict_of_arrays(self):
+        """Test aggregate_chapters gives the same chapters from SeasonColumns and season_arrays"""
+        legacy = ChapterAggregateTests.rows_for_season()
+        columns = SeasonColumns.from_rows(self.rows, self.FIELDS)
+
+        expected = aggregate_chapters(season_arrays(legacy), [4, 10], 7, 2025)
+        actual = aggregate_chapters(columns, [4, 10], 7, 2025)
+        tail = aggregate_chapters(columns.tail(6), [4], 7, 2025, chapter_offset=2, game_offset=6)
+
+        for (want, want_ids), (got, got_ids) in zip(expected, actual):
+            self.assertEqual(got_ids, want_ids)
+            self.assertEqual(got.top_champion_name, want.top_champion_name)
+            self.assertAlmostEqual(got.cs_score, want.cs_score, places=4)
+            self.assertAlmostEqual(got.win_rate, want.win_rate)
+        self.assertEqual(tail[0][1], [106, 107, 108, 109])
+
+
+class DownsampleTests(TestCase):
+    def test_lttb_keeps_endpoints_and_spike(self):
+        """Test lttb_indices keeps the threshold, the endpoints and an outlier game"""
+        x = np.arange(1000, dtype=np.float64)
+        y = np.zeros(1000)
+        y[437] = 50.0
+
+        keep = lttb_indices(x, y[:, None], 20)
+
+        self.assertEqual(len(keep), 20)
+        self.assertEqual((keep[0], keep[-1]), (0, 999))
+        self.assertIn(437, keep)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+
+    def test_bucket_means_nan_aware(self):
+        """Test bucket_means averages equal buckets and skips NaNs"""
+        out = bucket_means({"v": np.array([1.0, 3.0, np.nan, 4.0, 5.0, 7.0])}, 3)
+
+        np.testing.assert_allclose(out["v"], [2.0, 4.0, 6.0])
+
+    def test_rolling_mean_short_window_at_start(self):
+        """Test rolling_mean_1d uses a shorter window for the first games"""
+        np.testing.assert_allclose(rolling_mean_1d(np.array([1.0, 0.0, 1.0, 1.0]), 2), [1.0, 0.5, 0.5, 1.0])
+
+    def test_downsample_modes(self):
+        """Test downsample keeps rows aligned in lttb mode and samples passthrough columns in mean mode"""
+        x = np.arange(1, 101)
+        columns = {"kda": np.linspace(0, 5, 100), "timestamp": np.arange(100, dtype=np.int64) * 1000}
+
+        lttb = downsample(x, columns, 10)
+        mean = downsample(x, columns, 10, mode="mean", passthrough=("timestamp",))
+
+        self.assertEqual(len(lttb["x"]), 10)
+        np.testing.assert_array_equal(lttb["timestamp"], (lttb["x"] - 1) * 1000)
+        np.testing.assert_allclose(mean["x"], np.arange(10) * 10 + 5.5)
+        np.testing.assert_array_equal(mean["timestamp"], np.arange(10) * 10000)
+        self.assertEqual(len(downsample(x, columns, 500)["x"]), 100)
+
+
+class SimilarityIndexTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.n = 300
+        self.roles = rng.choice(["TOP", "MIDDLE", "SUPPORT"], self.n).tolist()
+        self.regions = rng.choice(["KR", "NA"], self.n).tolist()
+        self.vectors = rng.uniform(0, 100, (self.n, 6))
+        self.index = SimilarityIndex(list(range(100, 100 + self.n)), self.roles, self.regions, self.vectors)
+
+    def test_partitions_are_contiguous(self):
+        """Test every (role, region) partition is a slice holding only its pros"""
+        for (role, region), rows in self.index.partitions.items():
+            self.assertTrue(all(r == role for r in self.index.roles[rows]))
+            self.assertTrue(all(r == region for r in self.index.regions[rows]))
+        self.assertEqual(sum(s.stop - s.start for s in self.index.partitions.values()), self.n)
+
+    def test_top_k_matches_brute_force(self):
+        """Test batched top-k equals a full scan for both metrics"""
+        queries = np.random.default_rng(1).uniform(0, 100, (20, 6))
+        members = [i for i in range(self.n) if self.roles[i] == "MIDDLE" and self.regions[i] == "KR"]
+        candidates = self.vectors[members]
+        unit = candidates / np.linalg.norm(candidates, axis=1)[:, None]
+
+        cos_ids, _ = self.index.top_k(queries, 3, role="MIDDLE", region="KR")
+        euc_ids, _ = self.index.top_k(queries, 3, metric="euclidean", role="MIDDLE", region="KR")
+
+        for q, got_cos, got_euc in zip(queries, cos_ids, euc_ids):
+            expected_cos = [members[i] + 100 for i in np.argsort(-(unit @ (q / np.linalg.norm(q))))[:3]]
+            expected_euc = [members[i] + 100 for i in np.argsort(np.linalg.norm(candidates - q, axis=1))[:3]]
+            self.assertEqual(got_cos.tolist(), expected_cos)
+            self.assertEqual(got_euc.tolist(), expected_euc)
+
+    def test_query_scores(self):
+        """Test a pro's own vector scores 1.0 and unknown partitions return nothing"""
+        best_id, best_score = self.index.query(self.vectors[7], k=1, metric="euclidean")[0]
+
+        self.assertEqual(best_id, 107)
+        self.assertAlmostEqual(best_score, 1.0, places=4)
+        self.assertEqual(self.index.query(self.vectors[7], role="JUNGLE"), [])
+        self.assertEqual(len(self.index.query(self.vectors[7], k=4, region="NA")), 4)
+
+
+def role_aggregates(n, role="MIDDLE", seed=0, games=10):
+    rng = np.random.default_rng(seed)
+    return [(i, role, games, rng.uniform(0, 10, len(FEATURES))) for i in range(n)]
+
+
+class PlaystyleScoringTests(TestCase):
+    def test_percentiles_mid_rank(self):
+        """Test percentiles use binary search with ties in the middle"""
+        values = np.zeros((4, len(FEATURES)))
+        values[:, 0] = [1.0, 2.0, 2.0, 3.0]
+        tables = PercentileTables.build([(i, "TOP", 10, row) for i, row in enumerate(values)])
+
+        query = np.zeros((3, len(FEATURES)))
+        query[:, 0] = [0.5, 2.0, 9.0]
+        pct = tables.percentiles("TOP", query)[:, 0]
+
+        np.testing.assert_allclose(pct, [0.0, 50.0, 100.0])
+
+    def test_update_matches_rebuild(self):
+        """Test swapping players' rows incrementally gives the same tables as a rebuild"""
+        before = role_aggregates(200)
+        changed = [(pid, role, games, values + 1.5) for pid, role, games, values in role_aggregates(30, seed=1)]
+        changed[0] = (0, "MIDDLE", 2, changed[0][3])  # dropped: under MIN_GAMES now
+        after = {agg[0]: agg for agg in before}
+        after.update({agg[0]: agg for agg in changed})
+
+        tables = PercentileTables.build(before)
+        tables.update(changed)
+        rebuilt = PercentileTables.build(after.values())
+
+        for got, expected in zip(tables.distributions["MIDDLE"], rebuilt.distributions["MIDDLE"]):
+            np.testing.assert_array_equal(got, expected)
+        self.assertEqual(tables.size("MIDDLE"), 199)
+
+    def test_score_players_primary_role(self):
+        """Test players are scored in the role they played most, with neutral axes when data is missing"""
+        tables = PercentileTables.build(role_aggregates(50, "SUPPORT"))
+        empty = np.full(len(FEATURES), np.nan)
+        aggregates = [(7, "TOP", 3, empty), (7, "SUPPORT", 12, np.full(len(FEATURES), 100.0))]
+
+        [(player_id, role, axes, pct)] = score_players(tables, aggregates)
+
+        self.assertEqual((player_id, role), (7, "SUPPORT"))
+        np.testing.assert_allclose(axes, 100.0)
+        self.assertEqual(len(pct), len(FEATURES))
+        np.testing.assert_allclose(tables.score("JUNGLE", empty[None, :]), 50.0)
+
+
+class ChampionRecommenderTests(TestCase):
+    # (player_id, role, champion_id, games, wins): Ahri(103) players also win on Syndra(134)
+    ROWS = [
+        (1, "MIDDLE", 103, 20, 12), (1, "MIDDLE", 134, 10, 8),
+        (2, "MIDDLE", 103, 15, 8), (2, "MIDDLE", 134, 12, 9), (2, "MIDDLE", 7, 3, 0),
+        (3, "MIDDLE", 7, 8, 4), (3, "MIDDLE", 61, 8, 5),
+        (4, "MIDDLE", 103, 30, 15),
+        (4, "SUPPORT", 412, 5, 3),
+    ]
+
+    def test_recommends_co_played_champion(self):
+        """Test a player gets the champion co-played with their pool, never one already in it"""
+        model = CoPlayModel.build(self.ROWS, names={103: "Ahri", 134: "Syndra"})
+
+        [picks] = model.recommend("MIDDLE", [4])
+
+        self.assertEqual(picks[0][0], 134)
+        self.assertEqual(picks[0][2], 103)
+        self.assertNotIn(103, [c for c, _, _ in picks])
+        self.assertNotIn(412, [c for c, _, _ in picks])
+        self.assertEqual(model.primary_role(4), "MIDDLE")
+        self.assertIn("Ahri", model.reason("MIDDLE", 134, 103))
+
+    def test_incremental_update_matches_rebuild(self):
+        """Test folding new games into the model equals building it from scratch"""
+        newer = [(2, "MIDDLE", 103, 20, 11), (2, "MIDDLE", 61, 4, 3), (5, "MIDDLE", 134, 6, 2)]
+        merged = [row for row in self.ROWS if row[0] != 2] + newer
+
+        model = CoPlayModel.build(self.ROWS)
+        model.update(newer)
+        rebuilt = CoPlayModel.build(merged)
+
+        np.testing.assert_allclose(model.matrices["MIDDLE"].toarray(), rebuilt.matrices["MIDDLE"].toarray(), atol=1e-12)
+        np.testing.assert_allclose(model.popularity["MIDDLE"], rebuilt.popularity["MIDDLE"], atol=1e-12)
+        np.testing.assert_array_equal(model.games["MIDDLE"], rebuilt.games["MIDDLE"])
+
+
+class SeedChampionsDiffTests(TestCase):
+    DATA = {
+        "Ahri": {"id": "Ahri", "key": "103", "name": "Ahri", "title": "the Nine-Tailed Fox", "image": {"full": "Ahri.png"}},
+        "Annie": {"id": "Annie", "key": "1", "name": "Annie", "title": "the Dark Child", "image": {"full": "Annie.png"}},
+        "Syndra": {"id": "Syndra", "key": "134", "name": "Syndra", "title": "the Dark Sovereign"},
+    }
+
+    def test_diff_counts(self):
+        """Test champions are split into created, updated and unchanged rows"""
+        desired = champion_rows(self.DATA, "15.20.1")
+        current = {
+            1: desired[1],
+            103: (103, "Ahri", "Ahri", "old title", desired[103][4]),
+        }
+
+        created, updated, unchanged = diff_champions(current, desired)
+
+        self.assertEqual([row[0] for row in created], [134])
+        self.assertEqual([row[0] for row in updated], [103])
+        self.assertEqual([row[0] for row in unchanged], [1])
+        self.assertTrue(desired[134][4].endswith("/cdn/15.20.1/img/champion/Syndra.png"))
+
+
+class ModelTests(TestCase):
+    def test_slotted_rows_with_defaults(self):
+        """Test models have no __dict__ and from_row fills trailing fields from their defaults"""
+        job = PipelineJob.from_row((3, 7, "p", 2025))
+
+        self.assertFalse(hasattr(job, "__dict__"))
+        self.assertEqual((job.id, job.status, job.stages), (3, "queued", []))
+        self.assertIsNot(job.stages, PipelineJob.from_row((4, 7, "p", 2025)).stages)
+        self.assertEqual(PipelineJobStage.from_rows([("fetch",), ("metrics", "succeeded")])[1].status, "succeeded")
+
+    def test_frozen_variant(self):
+        """Test the frozen variant keeps fields and methods, refuses writes and pickles"""
+        Frozen = PipelineJob.frozen()
+        stages = [PipelineJobStage("fetch", "succeeded"), PipelineJobStage("metrics")]
+        job = Frozen.from_row((3, 7, "p", 2025, "running", "metrics", None, None, None, None, stages))
+
+        self.assertIs(PipelineJob.frozen(), Frozen)
+        self.assertIsInstance(job, Frozen)
+        self.assertEqual(job, Frozen(3, 7, "p", 2025, "running", "metrics", stages=stages))
+        self.assertEqual(job.progress, 0.5)
+        with self.assertRaises(FrozenInstanceError):
+            job.status = "failed"
+        self.assertEqual(pickle.loads(pickle.dumps(job)), job)
+
+    def test_from_riot(self):
+        """Test Match and PlayerMatchMetrics build straight from Riot match-v5 documents"""
+        raw = {
+            "metadata": {"matchId": "KR_1"},
+            "info": {
+                "gameCreation": 1_700_000_000_000,
+                "gameDuration": 1800,
+                "participants": [{"puuid": "me", "championId": 103, "championName": "Ahri", "teamId": 100}],
+            },
+        }
+
+        match = Match.from_riot(raw, player_id=7)
+        [metrics] = PlayerMatchMetrics.from_riot([raw], ["me"], [11], [7])
+
+        self.assertEqual((match.match_id, match.match_timestamp, match.is_processed), ("KR_1", 1_700_000_000_000, False))
+        self.assertEqual((metrics.id, metrics.match_id, metrics.champion_name), (None, 11, "Ahri"))
+        self.assertEqual(metrics.match_recorded_at, 1_700_000_000_000)
+
+
+class StatementTimeoutTests(TestCase):
+    def test_statement_timeout_sets_and_resets(self):
+        """Test statement_timeout overrides the session value for the block and RESETs it after"""
+        connection = MagicMock(needs_rollback=False)
+        cursor = connection.cursor.return_value.__enter__.return_value
+
+        with patch("common.utils.db_util.connections", {"default": connection}):
+
+            @statement_timeout(0)
+            def job():
+                cursor.execute("SELECT 1")
+
+            job()
+
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        self.assertEqual(statements, ["SET statement_timeout = %s", "SELECT 1", "RESET statement_timeout"])
+        self.assertEqual(cursor.execute.call_args_list[0].args[1], [0])
+
+    def test_batch_command_lifts_the_timeout(self):
+        """Test a BatchCommand's handle() runs with statement_timeout lifted"""
+        connection = MagicMock(needs_rollback=False)
+        cursor = connection.cursor.return_value.__enter__.return_value
+
+        class Command(BatchCommand):
+            def handle(self, *args, **options):
+                cursor.execute("SELECT 1")
+
+        with patch("common.utils.db_util.connections", {"default": connection}):
+            call_command(Command())
+
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        self.assertEqual(statements, ["SET statement_timeout = %s", "SELECT 1", "RESET statement_timeout"])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from common.utils.db_util import statement_timeout
+
+
+class BatchCommand(BaseCommand):
+    """
+    Base for management commands doing batch work. Their statements run past the
+    DB_STATEMENT_TIMEOUT_MS meant for web requests, so the command runs with the timeout lifted.
+    """
+
+    def execute(self, *args, **options):
+        with statement_timeout(0):
+            return super().execute(*args, **options)
@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connections
+
+
+@contextmanager
+def statement_timeout(milliseconds: int, using: str = "default"):
+    """
+    Override the connection's statement_timeout (0 = no limit) for the block, then RESET it to
+    the DB_STATEMENT_TIMEOUT_MS the connection was opened with. Also usable as a decorator.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute("SET statement_timeout = %s", [int(milliseconds)])
+    try:
+        yield
+    finally:
+        if connection.connection is not None and not connection.needs_rollback:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET statement_timeout")
+
+
+def db_sync_to_async(func):
+    """
+    sync_to_async for blocking DB (or Lambda) work that async views want to run side by side.
+    Calls go to the thread pool (thread_sensitive=False), so each gets its own connection;
+    like a request, stale connections are dropped before and after (CONN_MAX_AGE still applies).
+    """
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
@@ -116,6 +116,18 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Connections are kept open per worker thread for DB_CONN_MAX_AGE seconds (0 = per request,
+# None = forever) and health-checked before reuse. statement_timeout applies to every query on
+# the connection; batch commands lift it by subclassing common.utils.command_util.BatchCommand.
+# To share connections across processes, point DB_HOST/DB_PORT at pgbouncer in session mode
+# (statement_timeout is a session setting, so transaction mode would leak it between clients).
+# Django's own pool isn't an option: it needs psycopg 3, and the services use psycopg2-only APIs
+# (execute_values, Json, copy_expert, mogrify).
+DB_CONN_MAX_AGE = env.int("DB_CONN_MAX_AGE", default=60)
+DB_CONN_HEALTH_CHECKS = env.bool("DB_CONN_HEALTH_CHECKS", default=True)
+DB_CONNECT_TIMEOUT = env.int("DB_CONNECT_TIMEOUT", default=5)
+DB_STATEMENT_TIMEOUT_MS = env.int("DB_STATEMENT_TIMEOUT_MS", default=15000)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -124,6 +136,12 @@ DATABASES = {
         "PASSWORD": env("DB_PASSWORD"),
         "HOST": env("DB_HOST"),
         "PORT": env("DB_PORT"),
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+        "OPTIONS": {
+            "connect_timeout": DB_CONNECT_TIMEOUT,
+            "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
+        },
         "TEST": {
             "NAME": f"test_{env('DB_NAME')}",
         },
@@ -160,6 +178,32 @@ REST_FRAMEWORK = {
     # "PAGE_SIZE": 20,
 }
 
+# Shared cache (similarity index, playstyle tables, rendered rift pages). Local memory per
+# process unless REDIS_URL is set (needs the redis package).
+REDIS_URL = env("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# seconds a rendered rift page stays cached; writes invalidate earlier (apps/rift/page_cache.py)
+RIFT_PAGE_CACHE_TIMEOUT = env.int("RIFT_PAGE_CACHE_TIMEOUT", default=3600)
+
+# How synced matches are stored in league_matches: "split" (narrow slices the pipeline reads +
+# the zlib-compressed document in raw_zlib) or "full" (the whole document as raw_data jsonb)
+RIFT_MATCH_STORAGE = env("RIFT_MATCH_STORAGE", default="split")
+
+# "orjson" (falls back to stdlib when orjson is not installed) or "stdlib"
+JSON_RENDERER_BACKEND = env("JSON_RENDERER_BACKEND", default="orjson")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=120),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=360),
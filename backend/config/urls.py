@@ -36,4 +36,5 @@ urlpatterns = [
     path("api/auth/login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/auth/", include("apps.user.urls")),
+    path("api/rift/", include("apps.rift.urls")),
 ]
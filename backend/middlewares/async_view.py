@@ -0,0 +1,44 @@
+from asgiref.sync import sync_to_async
+from django.utils.decorators import classonlymethod
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose HTTP handlers are `async def`, served natively under ASGI.
+
+    Django marks the view as a coroutine (all handlers async), so the request never holds a
+    worker thread while the handler awaits. Authentication, permissions and content negotiation
+    (initial()) may hit the database and run via sync_to_async; exceptions still go through
+    custom_exception_handler, and the returned Response is rendered by the usual renderer
+    classes (OkJSONRenderer).
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if not cls.view_is_async:
+            raise TypeError(f"{cls.__qualname__} must define its HTTP handlers with async def")
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if hasattr(response, "__await__"):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -1,3 +1,4 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.core.exceptions import PermissionDenied
 from django.http import Http404, JsonResponse
 from rest_framework.exceptions import (
@@ -45,54 +46,72 @@ def custom_exception_handler(exc, context):
 
 
 class ErrorMiddleware:
+    """Turns exceptions into {"result": false, ...} JSON. Sync and async capable (WSGI and ASGI)."""
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         try:
             return self.get_response(request)
+        except Exception as exc:
+            return self.error_response(request, exc)
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        except Exception as exc:
+            return self.error_response(request, exc)
+
+    def error_response(self, request, exc):
         # custom exceptions
-        except BadRequestError as e:
+        if isinstance(exc, BadRequestError):
             return JsonResponse(
-                {"result": False, "error_message": e.message},
-                status=e.status,
+                {"result": False, "error_message": exc.message},
+                status=exc.status,
             )
 
         # rest framework exceptions
-        except ValidationError as e:
+        if isinstance(exc, ValidationError):
             return JsonResponse(
                 {
                     "result": False,
-                    "error_message": str(e.detail if hasattr(e, "detail") else e),
+                    "error_message": str(exc.detail if hasattr(exc, "detail") else exc),
                 },
                 status=400,
             )
-        except NotAuthenticated:
+        if isinstance(exc, NotAuthenticated):
             return JsonResponse(
                 {"result": False, "error_message": "Authentication required."},
                 status=401,
             )
-        except AuthenticationFailed:
+        if isinstance(exc, AuthenticationFailed):
             return JsonResponse(
                 {"result": False, "error_message": "Authentication failed."},
                 status=401,
             )
-        except (DRFPermissionDenied, PermissionDenied):
+        if isinstance(exc, (DRFPermissionDenied, PermissionDenied)):
             return JsonResponse(
                 {"result": False, "error_message": "Permission denied."},
                 status=403,
             )
-        except Http404:
+        if isinstance(exc, Http404):
             return JsonResponse(
                 {"result": False, "error_message": "Resource not found."},
                 status=404,
             )
 
         # cover all other exceptions
-        except Exception:
-            if request.path.startswith("/api/"):
-                return JsonResponse(
-                    {"result": False, "error_message": "Internal server error."},
-                    status=500,
-                )
-            raise
+        if request.path.startswith("/api/"):
+            return JsonResponse(
+                {"result": False, "error_message": "Internal server error."},
+                status=500,
+            )
+        raise exc
@@ -1,32 +1,101 @@
+import numpy as np
+from django.conf import settings
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
+
+
+class NumpyJSONEncoder(JSONEncoder):
+    """DRF's encoder plus NumPy scalars and arrays; NaN becomes null like it does with orjson."""
+
+    def default(self, obj):
+        if isinstance(obj, np.ndarray):
+            if obj.dtype.kind == "f":
+                return np.where(np.isnan(obj), None, obj).tolist()
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            value = obj.item()
+            return None if isinstance(value, float) and value != value else value
+        return super().default(obj)
+
+
+_fallback_default = NumpyJSONEncoder().default
 
 
 class OkJSONRenderer(JSONRenderer):
+    """
+    Wraps successful payloads as {"result": true, "data": ...}.
+
+    The envelope is spliced around the serialized payload as bytes instead of building a new
+    dict around it. Serialization goes through orjson when settings.JSON_RENDERER_BACKEND is
+    "orjson" (the default) and it is installed, otherwise through DRF's stdlib JSONRenderer.
+    Both understand datetimes and NumPy values.
+    """
+
     charset = "utf-8"
+    encoder_class = NumpyJSONEncoder
+
+    def use_orjson(self, accepted_media_type, renderer_context) -> bool:
+        if orjson is None or getattr(settings, "JSON_RENDERER_BACKEND", "orjson") != "orjson":
+            return False
+        # pretty-printing (browsable API, "; indent=4") stays on the stdlib path
+        return not self.get_indent(accepted_media_type, renderer_context or {})
+
+    def dumps(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if self.use_orjson(accepted_media_type, renderer_context):
+            return orjson.dumps(data, default=_fallback_default, option=ORJSON_OPTIONS)
+        if data is None:
+            return b"null"
+        return super().render(data, accepted_media_type, renderer_context)
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         response = renderer_context.get("response") if renderer_context else None
 
         if response is not None and getattr(response, "exception", False):
-            return super().render(data, accepted_media_type, renderer_context)
+            return self.dumps(data, accepted_media_type, renderer_context)
 
         payload = data
 
         if isinstance(payload, dict) and "result" in payload:
-            return super().render(payload, accepted_media_type, renderer_context)
+            return self.dumps(payload, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(
+                {"result": True, "data": self._unpaginate(payload)}, accepted_media_type, renderer_context
+            )
 
         if isinstance(payload, dict) and {"count", "results"}.issubset(payload.keys()):
-            payload = {
-                "items": payload.get("results", []),
-                "pagination": {
-                    "count": payload.get("count", 0),
-                    "next": payload.get("next"),
-                    "previous": payload.get("previous"),
-                },
-            }
-
-        wrapped = {
-            "result": True,
-            "data": payload,
+            return b"".join(
+                [
+                    b'{"result":true,"data":{"items":',
+                    self.dumps(payload.get("results", []), accepted_media_type, renderer_context),
+                    b',"pagination":',
+                    self.dumps(self._pagination(payload), accepted_media_type, renderer_context),
+                    b"}}",
+                ]
+            )
+
+        return b"".join(
+            [b'{"result":true,"data":', self.dumps(payload, accepted_media_type, renderer_context), b"}"]
+        )
+
+    @staticmethod
+    def _pagination(payload):
+        return {
+            "count": payload.get("count", 0),
+            "next": payload.get("next"),
+            "previous": payload.get("previous"),
         }
-        return super().render(wrapped, accepted_media_type, renderer_context)
+
+    def _unpaginate(self, payload):
+        if isinstance(payload, dict) and {"count", "results"}.issubset(payload.keys()):
+            return {"items": payload.get("results", []), "pagination": self._pagination(payload)}
+        return payload
@@ -1,7 +1,15 @@
-from collections import OrderedDict
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict, namedtuple
+from typing import List, Optional, Sequence
 
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# (timestamp, id) of the row a page continues from; reverse walks towards newer rows
+Position = namedtuple("Position", ["timestamp", "id", "reverse"])
 
 
 class Pagination(PageNumberPagination):
@@ -27,3 +35,144 @@ class Pagination(PageNumberPagination):
                 ]
             )
         )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over one player's rows in raw SQL, newest first.
+
+    Pages are keyed on (player_id, <timestamp> DESC, id DESC), so every page is a range scan of
+    ix_matches_player_ts / ix_metrics_player_ts from the previous page's last row: no OFFSET and
+    no COUNT(*). The response keeps Pagination's items/pagination envelope; "count" is null
+    unless the client asks for ?count=approx.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    # approximate counts are exact up to this many rows, then the planner's estimate
+    exact_count_limit = 1000
+    invalid_cursor_message = "Invalid cursor."
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # ---- cursor encoding ----
+
+    @staticmethod
+    def encode_cursor(position: Position) -> str:
+        raw = f"{position.timestamp}.{position.id}.{int(position.reverse)}"
+        return urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, request) -> Optional[Position]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode("ascii")
+            timestamp, row_id, reverse = raw.split(".")
+            return Position(int(timestamp), int(row_id), reverse == "1")
+        except (ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # ---- queries ----
+
+    def paginate_query(
+        self, cursor, request, *, table: str, columns: Sequence[str], timestamp_column: str, player_id: int
+    ) -> List[tuple]:
+        """One page of `columns` rows (which must include id and timestamp_column), newest first."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        reverse = position is not None and position.reverse
+
+        where, params = "player_id = %s", [player_id]
+        if position is not None:
+            # the plain bound lets the planner prune the time partitions the row comparison excludes
+            op = ">" if reverse else "<"
+            where += f" AND {timestamp_column} {op}= %s AND ({timestamp_column}, id) {op} (%s, %s)"
+            params += [position.timestamp, position.timestamp, position.id]
+        order = "ASC" if reverse else "DESC"
+        cursor.execute(
+            f"""
+            SELECT {", ".join(columns)} FROM {table}
+            WHERE {where}
+            ORDER BY {timestamp_column} {order}, id {order}
+            LIMIT %s
+            """,
+            params + [self.page_size + 1],
+        )
+        rows = cursor.fetchall()
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        ts_idx, id_idx = list(columns).index(timestamp_column), list(columns).index("id")
+        self.first = Position(rows[0][ts_idx], rows[0][id_idx], True) if rows else None
+        self.last = Position(rows[-1][ts_idx], rows[-1][id_idx], False) if rows else None
+        if not rows and position is not None:
+            # walked off either end: link back the way we came
+            self.first = self.last = Position(position.timestamp, position.id, not reverse)
+            self.has_next, self.has_previous = reverse, not reverse
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "approx":
+            self.count = self.approximate_count(cursor, table, player_id)
+        return rows
+
+    def approximate_count(self, cursor, table: str, player_id: int) -> int:
+        """Exact up to exact_count_limit (a short index-only scan), the planner's estimate above it."""
+        cursor.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE player_id = %s LIMIT %s) AS head",
+            (player_id, self.exact_count_limit + 1),
+        )
+        counted = cursor.fetchone()[0]
+        if counted <= self.exact_count_limit:
+            return counted
+        cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} WHERE player_id = %s", (player_id,))
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return max(counted, int(plan[0]["Plan"]["Plan Rows"]))
+
+    # ---- response ----
+
+    def _link(self, position: Optional[Position]) -> Optional[str]:
+        if position is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.encode_cursor(position))
+
+    def get_next_link(self) -> Optional[str]:
+        return self._link(self.last) if self.has_next else None
+
+    def get_previous_link(self) -> Optional[str]:
+        return self._link(self.first) if self.has_previous else None
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("items", data),
+                    (
+                        "pagination",
+                        OrderedDict(
+                            [
+                                ("count", self.count),
+                                ("next", self.get_next_link()),
+                                ("previous", self.get_previous_link()),
+                            ]
+                        ),
+                    ),
+                ]
+            )
+        )
@@ -1,20 +1,29 @@
 # Create your tests here.
+import asyncio
+import json
+from datetime import datetime
+from datetime import timezone as dt_timezone
 from unittest import TestCase
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
+import numpy as np
+from asgiref.sync import iscoroutinefunction
 from django.http import JsonResponse
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
 from rest_framework.exceptions import (
     AuthenticationFailed,
     NotAuthenticated,
+    NotFound,
     ValidationError,
 )
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
 
 from common.exceptions.bad_request_error import BadRequestError
 from middlewares.error_middleware import ErrorMiddleware, custom_exception_handler
 from middlewares.ok_middleware import OkJSONRenderer
-from middlewares.pagenation import Pagination
+from middlewares.pagenation import KeysetPagination, Pagination, Position
 
 
 class ErrorMiddlewareTests(TestCase):
@@ -241,6 +250,52 @@ class OkJSONRendererTests(TestCase):
         self.assertIn(b"result", result)
         self.assertIn(b"data", result)
 
+    def test_ok_json_renderer_numpy_and_datetime(self):
+        """Test OkJSONRenderer writes NumPy values (NaN as null) and datetimes on both backends"""
+        data = {
+            "kda": np.array([1.5, np.nan, 3.0]),
+            "games": np.int64(7),
+            "at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+        }
+
+        for backend in ("orjson", "stdlib"):
+            with self.subTest(backend=backend), override_settings(JSON_RENDERER_BACKEND=backend):
+                body = json.loads(self.renderer.render(data, renderer_context=self.renderer_context))
+                self.assertIs(body["result"], True)
+                self.assertEqual(body["data"]["kda"], [1.5, None, 3.0])
+                self.assertEqual(body["data"]["games"], 7)
+                self.assertTrue(body["data"]["at"].startswith("2025-01-02T03:04:05"))
+
+    def test_ok_json_renderer_backends_match(self):
+        """Test both backends produce the same envelope for paginated and plain data"""
+        payloads = [
+            {"count": 2, "results": [{"id": 1}, {"id": 2}], "next": None, "previous": None},
+            {"message": "Success", "data": [1, 2, 3]},
+            None,
+        ]
+
+        for data in payloads:
+            with override_settings(JSON_RENDERER_BACKEND="orjson"):
+                fast = self.renderer.render(data, renderer_context=self.renderer_context)
+            with override_settings(JSON_RENDERER_BACKEND="stdlib"):
+                slow = self.renderer.render(data, renderer_context=self.renderer_context)
+            self.assertEqual(json.loads(fast), json.loads(slow))
+
+    def test_ok_json_renderer_without_orjson(self):
+        """Test OkJSONRenderer falls back to the stdlib encoder when orjson is missing"""
+        with patch("middlewares.ok_middleware.orjson", None):
+            result = self.renderer.render({"id": 1}, renderer_context=self.renderer_context)
+
+        self.assertEqual(json.loads(result), {"result": True, "data": {"id": 1}})
+
+    def test_ok_json_renderer_indent(self):
+        """Test OkJSONRenderer keeps pretty-printing when an indent is requested"""
+        data = {"count": 1, "results": [{"id": 1}], "next": None, "previous": None}
+
+        result = self.renderer.render(data, "application/json; indent=2", self.renderer_context)
+        self.assertIn(b"\n  ", result)
+        self.assertEqual(json.loads(result)["data"]["items"], [{"id": 1}])
+
 
 class PaginationTests(TestCase):
     def setUp(self):
@@ -299,3 +354,95 @@ class PaginationTests(TestCase):
                 self.assertEqual(
                     response.data["pagination"]["previous"], "http://example.com/prev"
                 )
+
+
+class KeysetPaginationTests(TestCase):
+    columns = ("id", "match_recorded_at")
+
+    def setUp(self):
+        self.pagination = KeysetPagination()
+        self.cursor = MagicMock()
+
+    def paginate(self, query="", rows=()):
+        self.cursor.fetchall.return_value = list(rows)
+        request = Request(APIRequestFactory().get(f"/api/rift/players/p/metrics/{query}"))
+        return self.pagination.paginate_query(
+            self.cursor,
+            request,
+            table="league_player_match_metrics",
+            columns=self.columns,
+            timestamp_column="match_recorded_at",
+            player_id=7,
+        )
+
+    def test_keyset_pagination_first_page(self):
+        """Test the first page seeks the index without OFFSET or COUNT and links to the next page"""
+        rows = self.paginate("?page_size=2", [(3, 300), (2, 200), (1, 100)])
+
+        sql, params = self.cursor.execute.call_args[0]
+        self.assertNotIn("OFFSET", sql)
+        self.assertIn("ORDER BY match_recorded_at DESC, id DESC", sql)
+        self.assertEqual(params, [7, 3])
+        self.assertEqual(rows, [(3, 300), (2, 200)])
+
+        response = self.pagination.get_paginated_response([{"id": 3}, {"id": 2}])
+        pagination = response.data["pagination"]
+        self.assertIsNone(pagination["count"])
+        self.assertIsNone(pagination["previous"])
+        self.assertIn(f"cursor={KeysetPagination.encode_cursor(Position(200, 2, False))}", pagination["next"])
+
+    def test_keyset_pagination_cursor_roundtrip(self):
+        """Test a next cursor continues strictly after the last row"""
+        cursor = KeysetPagination.encode_cursor(Position(200, 2, False))
+        rows = self.paginate(f"?page_size=2&cursor={cursor}", [(1, 100)])
+
+        sql, params = self.cursor.execute.call_args[0]
+        self.assertIn("(match_recorded_at, id) < (%s, %s)", sql)
+        self.assertIn("match_recorded_at <= %s", sql)
+        self.assertEqual(params, [7, 200, 200, 2, 3])
+        self.assertEqual(rows, [(1, 100)])
+        self.assertIsNone(self.pagination.get_next_link())
+        self.assertIsNotNone(self.pagination.get_previous_link())
+
+    def test_keyset_pagination_previous_page(self):
+        """Test a reverse cursor walks towards newer rows and returns them newest first"""
+        cursor = KeysetPagination.encode_cursor(Position(100, 1, True))
+        rows = self.paginate(f"?page_size=2&cursor={cursor}", [(2, 200), (3, 300)])
+
+        sql, params = self.cursor.execute.call_args[0]
+        self.assertIn("(match_recorded_at, id) > (%s, %s)", sql)
+        self.assertIn("ORDER BY match_recorded_at ASC, id ASC", sql)
+        self.assertEqual(rows, [(3, 300), (2, 200)])
+        self.assertIsNone(self.pagination.get_previous_link())
+        self.assertIsNotNone(self.pagination.get_next_link())
+
+    def test_keyset_pagination_invalid_cursor(self):
+        """Test a malformed cursor is rejected with NotFound"""
+        with self.assertRaises(NotFound):
+            self.paginate("?cursor=not-a-cursor")
+
+    def test_keyset_pagination_approximate_count(self):
+        """Test ?count=approx counts exactly below the limit and uses the planner estimate above it"""
+        self.cursor.fetchone.return_value = (12,)
+        self.paginate("?count=approx", [(1, 100)])
+        self.assertEqual(self.pagination.count, 12)
+
+        self.cursor.fetchone.side_effect = [(1001,), ([{"Plan": {"Plan Rows": 5000}}],)]
+        self.paginate("?count=approx", [(1, 100)])
+        self.assertEqual(self.pagination.count, 5000)
+        self.assertIn("EXPLAIN", self.cursor.execute.call_args[0][0])
+
+
+class AsyncErrorMiddlewareTests(TestCase):
+    def test_error_middleware_async_chain(self):
+        """Test ErrorMiddleware stays async under ASGI and converts exceptions the same way"""
+
+        async def get_response(request):
+            raise BadRequestError("Test error", status=400)
+
+        middleware = ErrorMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = asyncio.run(middleware(RequestFactory().get("/api/test/")))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)["error_message"], "Test error")
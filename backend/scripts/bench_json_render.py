@@ -0,0 +1,103 @@
+"""
+Benchmark: OkJSONRenderer on a page of PlayerMatchMetrics, stdlib backend vs. orjson, plus the
+pre-splice renderer (wrap the payload in a new dict, then json.dumps everything).
+
+Pure CPU, no database needed.
+
+    cd backend && python -m scripts.bench_json_render --rows 2000 --repeat 20
+"""
+import argparse
+import os
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.test import override_settings  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from common.models.player_match_metrics import PlayerMatchMetrics  # noqa: E402
+from middlewares.ok_middleware import OkJSONRenderer, orjson  # noqa: E402
+
+
+def synthetic_metrics(n: int):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(n):
+        row = asdict(PlayerMatchMetrics(
+            id=i, match_id=10_000 + i, player_id=1, champion_id=i % 170, champion_name=f"Champ{i % 170}",
+            role="MIDDLE", lane="MID", cs_per_min=7.25, gold_per_min=412.5, damage_per_min=801.3,
+            damage_share=0.27, kill_participation=0.61, kills=i % 12, deaths=i % 7, assists=i % 15,
+            kda_ratio=3.4, win=bool(i % 2), team_id=100, participant_id=3, game_duration=1830,
+            vision_score=31, vision_score_per_min=1.02, gold_earned=12_600, total_damage_dealt=180_000,
+            items=[3089, 3157, 3020, 4645, 3135, 3165, 3363], summoner_spells=["Flash", "Ignite"],
+            rune_setup={"primary": 8100, "secondary": 8200, "perks": [8112, 8139, 8138, 8135]},
+            skill_order=["Q", "W", "E"] * 6,
+            damage_breakdown={"physical": 0.12, "magic": 0.83, "true": 0.05},
+            objective_contribution={"dragon_kills": 1, "turret_takedowns": 3, "damage_to_objectives": 5400},
+            match_recorded_at=1_735_689_600_000 + i,
+        ))
+        row["recorded_at"] = start + timedelta(minutes=i)
+        rows.append(row)
+    return {"count": n, "results": rows, "next": None, "previous": None}
+
+
+def legacy_render(renderer: JSONRenderer, data, context):
+    """OkJSONRenderer before the byte-spliced envelope."""
+    payload = {
+        "items": data["results"],
+        "pagination": {"count": data["count"], "next": data["next"], "previous": data["previous"]},
+    }
+    return renderer.render({"result": True, "data": payload}, renderer_context=context)
+
+
+def timed(cases, repeat: int):
+    """Best-of-repeat per case; cases run round-robin so machine noise hits them evenly."""
+    best = {name: float("inf") for name, _, _ in cases}
+    sizes = {}
+    for _ in range(repeat):
+        for name, backend, fn in cases:
+            with override_settings(JSON_RENDERER_BACKEND=backend):
+                start = time.perf_counter()
+                sizes[name] = len(fn())
+                best[name] = min(best[name], time.perf_counter() - start)
+    return [(name, best[name], sizes[name]) for name, _, _ in cases]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    data = synthetic_metrics(args.rows)
+    context = {"response": None}
+    renderer = OkJSONRenderer()
+
+    def render():
+        return renderer.render(data, renderer_context=context)
+
+    cases = [
+        ("legacy (dict wrap + json)", "stdlib", lambda: legacy_render(JSONRenderer(), data, context)),
+        ("stdlib backend", "stdlib", render),
+    ]
+    if orjson is not None:
+        cases.append(("orjson backend", "orjson", render))
+    else:
+        print("orjson is not installed; skipping the orjson backend")
+    results = timed(cases, args.repeat)
+
+    baseline = results[0][1]
+    for name, seconds, size in results:
+        print(
+            f"{name:26}: {seconds * 1000:8.2f} ms  {args.rows / seconds:>12,.0f} rows/s  "
+            f"{size / 1024:,.0f} KiB  {baseline / seconds:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
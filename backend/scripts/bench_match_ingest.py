@@ -0,0 +1,91 @@
+"""
+Benchmark: COPY-based bulk_load_matches vs. naive per-row INSERT into league_matches.
+
+Runs against the database from .env on temp copies of league_matches (no FK, same indexes) and
+league_match_ids, so nothing is written to the real tables.
+
+    cd backend && python -m scripts.bench_match_ingest --rows 5000
+"""
+import argparse
+import json
+import time
+
+import psycopg2
+
+from apps.rift.services.matches import bulk_load_matches
+from common.models.match import Match
+from common.utils.env_util import get_env
+
+BENCH_TABLE = "bench_league_matches"
+BENCH_IDS = "bench_league_match_ids"
+
+
+def synthetic_matches(n: int, offset: int = 0):
+    participant = {f"stat{i}": i for i in range(120)}
+    for i in range(offset, offset + n):
+        raw = {
+            "metadata": {"matchId": f"BENCH_{i}", "participants": [f"puuid-{p}" for p in range(10)]},
+            "info": {"gameCreation": 1_700_000_000_000 + i, "gameDuration": 1800, "participants": [participant] * 10},
+        }
+        yield Match(id=None, match_id=raw["metadata"]["matchId"], player_id=1, raw_data=raw,
+                    match_timestamp=raw["info"]["gameCreation"])
+
+
+def naive_insert(cur, matches):
+    inserted = 0
+    for m in matches:
+        cur.execute(
+            f"""
+            INSERT INTO {BENCH_TABLE} (match_id, player_id, raw_data, match_timestamp, is_processed)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (match_id, match_timestamp) DO NOTHING
+            """,
+            (m.match_id, m.player_id, json.dumps(m.raw_data), m.match_timestamp, m.is_processed),
+        )
+        inserted += cur.rowcount
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    env = get_env()
+    conn = psycopg2.connect(
+        dbname=env("DB_NAME"), user=env("DB_USER"), password=env("DB_PASSWORD"),
+        host=env("DB_HOST"), port=env("DB_PORT"),
+    )
+    cur = conn.cursor()
+    cur.execute(f"CREATE TEMP TABLE {BENCH_TABLE} (LIKE league_matches INCLUDING ALL)")
+    cur.execute(f"CREATE TEMP TABLE {BENCH_IDS} (LIKE league_match_ids INCLUDING ALL)")
+    conn.commit()
+
+    start = time.perf_counter()
+    inserted = naive_insert(cur, synthetic_matches(args.rows))
+    conn.commit()
+    naive = time.perf_counter() - start
+    print(f"naive INSERT : {inserted} rows in {naive:.2f}s ({inserted / naive:,.0f} rows/s)")
+
+    cur.execute(f"TRUNCATE {BENCH_TABLE}")
+    conn.commit()
+    start = time.perf_counter()
+    report = bulk_load_matches(cur, synthetic_matches(args.rows), table=BENCH_TABLE, id_table=BENCH_IDS)
+    conn.commit()
+    bulk = time.perf_counter() - start
+    print(f"COPY + merge : {report.inserted} rows in {bulk:.2f}s ({report.inserted / bulk:,.0f} rows/s)")
+
+    # half already present: exercises the ON CONFLICT path
+    start = time.perf_counter()
+    half_loaded = synthetic_matches(args.rows, offset=args.rows // 2)
+    report = bulk_load_matches(cur, half_loaded, table=BENCH_TABLE, id_table=BENCH_IDS)
+    conn.commit()
+    print(f"COPY re-load : inserted={report.inserted} skipped={report.skipped} in {time.perf_counter() - start:.2f}s")
+    print(f"speedup      : {naive / bulk:.1f}x")
+
+    cur.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
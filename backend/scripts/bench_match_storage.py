@@ -0,0 +1,247 @@
+"""
+Benchmark: league_matches storage footprint and per-match load time, documents stored whole
+(raw_data jsonb) vs. split (game_info / participant / teams slices + zlib document in raw_zlib).
+
+Runs against the database from .env on two temp copies of league_matches, loaded through
+bulk_load_matches with synthetic match-v5 documents (10 participants with challenges, perks and
+teams; the average JSON size is printed), so nothing is written to the real tables.
+
+    cd backend && python -m scripts.bench_match_storage --rows 5000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import psycopg2
+
+from apps.rift.services.matches import bulk_load_matches, relation_size
+from common.analysis.match_document import decompress_document, split_document
+from common.analysis.match_metrics import INT_FIELDS, extract_slice_rows
+from common.models.match import Match
+from common.utils.env_util import get_env
+
+FULL_TABLE = "bench_matches_full"
+SPLIT_TABLE = "bench_matches_split"
+ID_TABLE = "bench_match_ids"
+
+PARTICIPANT_INTS = list(INT_FIELDS) + [
+    "allInPings", "assistMePings", "baitPings", "baronKills", "basicPings", "bountyLevel", "champExperience",
+    "champLevel", "championTransform", "commandPings", "consumablesPurchased", "damageDealtToBuildings",
+    "damageDealtToObjectives", "damageDealtToTurrets", "damageSelfMitigated", "dangerPings",
+    "detectorWardsPlaced", "doubleKills", "dragonKills", "enemyMissingPings", "enemyVisionPings",
+    "getBackPings", "goldSpent", "holdPings", "inhibitorKills", "inhibitorTakedowns", "inhibitorsLost",
+    "itemsPurchased", "killingSprees", "largestCriticalStrike", "largestKillingSpree", "largestMultiKill",
+    "longestTimeSpentLiving", "magicDamageDealt", "magicDamageDealtToChampions", "magicDamageTaken",
+    "needVisionPings", "nexusKills", "nexusLost", "nexusTakedowns", "objectivesStolen",
+    "objectivesStolenAssists", "onMyWayPings", "pentaKills", "physicalDamageDealt",
+    "physicalDamageDealtToChampions", "physicalDamageTaken", "profileIcon", "pushPings", "quadraKills",
+    "sightWardsBoughtInGame", "spell1Casts", "spell2Casts", "spell3Casts", "spell4Casts", "summoner1Casts",
+    "summoner1Id", "summoner2Casts", "summoner2Id", "summonerLevel", "timeCCingOthers", "timePlayed",
+    "totalAllyJungleMinionsKilled", "totalDamageDealtToChampions", "totalDamageShieldedOnTeammates",
+    "totalEnemyJungleMinionsKilled", "totalHealsOnTeammates", "totalTimeCCDealt", "totalTimeSpentDead",
+    "totalUnitsHealed", "tripleKills", "trueDamageDealt", "trueDamageDealtToChampions", "trueDamageTaken",
+    "turretKills", "turretTakedowns", "turretsLost", "unrealKills", "visionClearedPings",
+    "visionWardsBoughtInGame", "item0", "item1", "item2", "item3", "item4", "item5", "item6",
+] + [f"playerScore{i}" for i in range(12)]
+CHALLENGES = [f"{name}{suffix}" for name in (
+    "abilityUses", "acesBefore15Minutes", "alliedJungleMonsterKills", "baronTakedowns",
+    "blastConeOppositeOpponentCount", "bountyGold", "buffsStolen", "completeSupportQuestInTime",
+    "controlWardsPlaced", "damagePerMinute",
+    "damageTakenOnTeamPercentage", "dancedWithRiftHerald", "deathsByEnemyChamps", "dodgeSkillShotsSmallWindow",
+    "doubleAces", "dragonTakedowns", "earlyLaningPhaseGoldExpAdvantage", "effectiveHealAndShielding",
+    "elderDragonKillsWithOpposingSoul", "enemyChampionImmobilizations", "enemyJungleMonsterKills",
+    "epicMonsterKillsNearEnemyJungler", "epicMonsterSteals", "firstTurretKilled", "flawlessAces",
+    "fullTeamTakedown", "gameLength", "goldPerMinute", "hadOpenNexus", "immobilizeAndKillWithAlly",
+    "initialBuffCount", "initialCrabCount", "jungleCsBefore10Minutes", "junglerTakedownsNearDamagedEpicMonster",
+    "kTurretsDestroyedBeforePlatesFall", "kda", "killAfterHiddenWithAlly", "killParticipation",
+    "killedChampTookFullTeamDamageSurvived", "killingSprees", "killsNearEnemyTurret",
+) for suffix in ("", "Total", "Max")]
+
+
+def synthetic_matches(n: int, rng: np.random.Generator, puuid: str):
+    """Documents shaped like match-v5; participant 0 is `puuid`. Stats are mostly small counts."""
+    for i in range(n):
+        participants = []
+        for slot in range(10):
+            ints = rng.geometric(0.02, len(PARTICIPANT_INTS)).tolist()
+            participant = dict(zip(PARTICIPANT_INTS, ints))
+            participant.update(
+                puuid=puuid if slot == 0 else f"puuid-{i}-{slot}-" + "x" * 60,
+                teamId=100 if slot < 5 else 200,
+                participantId=slot + 1,
+                championName="Champion",
+                riotIdGameName=f"player{slot}",
+                riotIdTagline="KR1",
+                summonerId="s" * 47,
+                teamPosition=("TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY")[slot % 5],
+                individualPosition="Invalid",
+                lane="NONE",
+                role="SOLO",
+                win=slot < 5,
+                firstBloodKill=False,
+                firstBloodAssist=False,
+                firstTowerKill=False,
+                firstTowerAssist=False,
+                gameEndedInSurrender=False,
+                eligibleForProgression=True,
+                challenges=dict(zip(CHALLENGES, np.round(rng.random(len(CHALLENGES)) * 100, 4).tolist())),
+                perks={
+                    "statPerks": {"defense": 5002, "flex": 5008, "offense": 5005},
+                    "styles": [
+                        {"description": "primaryStyle", "style": 8100, "selections": [
+                            {"perk": 8112 + k, "var1": int(v), "var2": 0, "var3": 0}
+                            for k, v in enumerate(rng.integers(0, 3000, 4))
+                        ]},
+                        {"description": "subStyle", "style": 8200, "selections": [
+                            {"perk": 8226 + k, "var1": int(v), "var2": 0, "var3": 0}
+                            for k, v in enumerate(rng.integers(0, 3000, 2))
+                        ]},
+                    ],
+                },
+                missions={f"playerScore{k}": 0 for k in range(12)},
+            )
+            participants.append(participant)
+        objectives = {
+            name: {"first": False, "kills": int(rng.integers(0, 10))}
+            for name in ("baron", "champion", "dragon", "horde", "inhibitor", "riftHerald", "tower")
+        }
+        raw = {
+            "metadata": {
+                "dataVersion": "2",
+                "matchId": f"BENCH_{i}",
+                "participants": [p["puuid"] for p in participants],
+            },
+            "info": {
+                "endOfGameResult": "GameComplete",
+                "gameCreation": 1_735_689_600_000 + i * 3_600_000,
+                "gameDuration": int(rng.integers(900, 2700)),
+                "gameEndTimestamp": 1_735_689_600_000 + i * 3_600_000 + 2_000_000,
+                "gameId": 7_000_000_000 + i,
+                "gameMode": "CLASSIC",
+                "gameName": "teambuilder-match-7000000000",
+                "gameStartTimestamp": 1_735_689_600_000 + i * 3_600_000 + 30_000,
+                "gameType": "MATCHED_GAME",
+                "gameVersion": "15.1.648.1234",
+                "mapId": 11,
+                "platformId": "KR",
+                "queueId": 420,
+                "tournamentCode": "",
+                "participants": participants,
+                "teams": [
+                    {
+                        "teamId": team,
+                        "win": team == 100,
+                        "bans": [
+                            {"championId": int(c), "pickTurn": k + 1} for k, c in enumerate(rng.integers(1, 900, 5))
+                        ],
+                        "objectives": objectives,
+                    }
+                    for team in (100, 200)
+                ],
+            },
+        }
+        yield raw
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=1000, help="Matches per load (like an extraction batch).")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    env = get_env()
+    conn = psycopg2.connect(
+        dbname=env("DB_NAME"), user=env("DB_USER"), password=env("DB_PASSWORD"),
+        host=env("DB_HOST"), port=env("DB_PORT"),
+    )
+    cur = conn.cursor()
+    for table in (FULL_TABLE, SPLIT_TABLE):
+        cur.execute(f"CREATE TEMP TABLE {table} (LIKE league_matches INCLUDING ALL)")
+    cur.execute(f"CREATE TEMP TABLE {ID_TABLE} (LIKE league_match_ids INCLUDING ALL)")
+
+    puuid = "p" * 78
+    raws = list(synthetic_matches(args.rows, np.random.default_rng(0), puuid))
+    document_bytes = sum(len(json.dumps(raw, separators=(",", ":"))) for raw in raws) / len(raws)
+    for table, target in ((FULL_TABLE, None), (SPLIT_TABLE, puuid)):
+        start = time.perf_counter()
+        bulk_load_matches(cur, (Match.from_riot(raw, 1, target) for raw in raws), table=table, id_table=ID_TABLE)
+        conn.commit()
+        print(f"load {table:20}: {args.rows / (time.perf_counter() - start):8,.0f} matches/s")
+    conn.autocommit = True
+    cur.execute(f"VACUUM ANALYZE {FULL_TABLE}, {SPLIT_TABLE}")
+    print(f"\nsynthetic document: {document_bytes / 1024:.1f} KiB of compact JSON")
+
+    cur.execute(
+        f"""
+        SELECT AVG(pg_column_size(raw_data)) FROM {FULL_TABLE}
+        UNION ALL
+        SELECT AVG(COALESCE(pg_column_size(game_info), 0) + COALESCE(pg_column_size(participant), 0)
+                   + COALESCE(pg_column_size(teams), 0)) FROM {SPLIT_TABLE}
+        UNION ALL
+        SELECT AVG(pg_column_size(raw_zlib)) FROM {SPLIT_TABLE}
+        """
+    )
+    whole, slices, blob = (row[0] for row in cur.fetchall())
+    full_size, split_size = relation_size(cur, FULL_TABLE), relation_size(cur, SPLIT_TABLE)
+    print(f"whole  : table {full_size / 2**20:8.1f} MiB  raw_data {whole / 1024:6.1f} KiB/match")
+    print(
+        f"split  : table {split_size / 2**20:8.1f} MiB  slices {slices / 1024:6.1f} KiB/match (hot), "
+        f"raw_zlib {blob / 1024:.1f} KiB/match (cold)  ({full_size / split_size:.1f}x smaller)"
+    )
+
+    def batch_ids(table):
+        cur.execute(f"SELECT id FROM {table} ORDER BY id LIMIT %s", (args.batch,))
+        return [row[0] for row in cur.fetchall()]
+
+    def load_whole(ids=batch_ids(FULL_TABLE)):
+        cur.execute(f"SELECT id, match_timestamp, raw_data::text FROM {FULL_TABLE} WHERE id = ANY(%s)", (ids,))
+        rows = cur.fetchall()
+        return lambda: extract_slice_rows(
+            [split_document(json.loads(text), puuid) for _, _, text in rows],
+            [row[0] for row in rows], [1] * len(rows), [row[1] for row in rows],
+        )
+
+    def load_split(ids=batch_ids(SPLIT_TABLE)):
+        cur.execute(
+            f"SELECT id, match_timestamp, game_info::text, participant::text, teams::text FROM {SPLIT_TABLE} "
+            "WHERE id = ANY(%s)",
+            (ids,),
+        )
+        rows = cur.fetchall()
+        return lambda: extract_slice_rows(
+            [(json.loads(g), json.loads(p), json.loads(t)) for _, _, g, p, t in rows],
+            [row[0] for row in rows], [1] * len(rows), [row[1] for row in rows],
+        )
+
+    def load_cold(ids=batch_ids(SPLIT_TABLE)):
+        cur.execute(f"SELECT id, raw_zlib FROM {SPLIT_TABLE} WHERE id = ANY(%s)", (ids,))
+        rows = cur.fetchall()
+        return lambda: [decompress_document(bytes(blob)) for _, blob in rows]
+
+    batch = min(args.batch, args.rows)
+    print(f"\nper match, batches of {batch}, best of {args.repeat}:")
+    for name, load in (("whole raw_data", load_whole), ("split slices", load_split), ("cold raw_zlib", load_cold)):
+        query = best_of(load, args.repeat)
+        work = best_of(load(), args.repeat)
+        print(
+            f"  {name:15}: query {query / batch * 1e6:7.1f} us + decode/extract {work / batch * 1e6:7.1f} us "
+            f"= {(query + work) / batch * 1e6:7.1f} us"
+        )
+
+    cur.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
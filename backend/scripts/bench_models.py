@@ -0,0 +1,103 @@
+"""
+Microbenchmark: per-instance memory and construction rate of the common.models row classes.
+
+Compares, per model, the old plain @dataclass (rebuilt here from the same fields, with a
+per-instance __dict__) against the slotted model built with cls(*row) and Model.from_row, and
+the frozen variant via cls(*row) and from_row. Pure CPU, no database needed.
+
+    cd backend && python -m scripts.bench_models --rows 200000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import MISSING, fields, make_dataclass
+from dataclasses import field as dataclass_field
+
+from common.models.match import Match
+from common.models.player_chapter import PlayerChapter
+from common.models.player_match_metrics import PlayerMatchMetrics
+from common.models.similarity_match import SimilarityMatch
+
+ITEMS = [3089, 3157, 3020, 4645, 3135, 3165, 3363]
+
+SAMPLE_ROWS = {
+    Match: (1, "KR_7000000001", 7, {"metadata": {}, "info": {}}, 1_735_689_600_000, True),
+    PlayerMatchMetrics: (
+        1, 2, 7, 103, "Ahri", "MIDDLE", "MIDDLE", 7.25, 412.5, 801.3, 0.27, 0.61, 7, 3, 9, 5.3, True,
+        100, 3, 1830, 31, 1.02, 12_600, 180_000, 21_000, 3_100, 210, 12, 9, 2, False, True, False, False,
+        ITEMS, ["Flash", "Ignite"], {"primary": 8100}, None, {"magic": 0.83}, {"dragon_kills": 1}, None,
+        1_735_689_600_000,
+    ),
+    SimilarityMatch: (1, 7, 3, 0.91, None),
+    PlayerChapter: (
+        1, 7, 1, 2025, None, None, 1, 120, "Chapter 1", "", 103, "Ahri", None, 80, 120, 0.55,
+        61.0, 70.5, 55.2, 40.1, None,
+    ),
+}
+
+
+def plain_dataclass(cls):
+    """The model as it was before slots: same fields, instances with a __dict__."""
+    spec = []
+    for f in fields(cls):
+        if f.default_factory is not MISSING:
+            spec.append((f.name, f.type, dataclass_field(default_factory=f.default_factory)))
+        elif f.default is not MISSING:
+            spec.append((f.name, f.type, dataclass_field(default=f.default)))
+        else:
+            spec.append((f.name, f.type))
+    return make_dataclass(f"Plain{cls.__name__}", spec)
+
+
+def construct_rate(build, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(rows)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best
+
+
+def per_instance_bytes(build, rows) -> float:
+    """Bytes allocated per retained instance (the list holding them excluded)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build(rows)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    container = len(built) * 8
+    del built
+    return (after - before - container) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for cls, sample in SAMPLE_ROWS.items():
+        # distinct tuples, shared field values: only the instances themselves are measured
+        rows = [tuple(sample) for _ in range(args.rows)]
+        plain = plain_dataclass(cls)
+        frozen = cls.frozen()
+        cases = [
+            ("plain @dataclass  cls(*row)", lambda rows: [plain(*row) for row in rows]),
+            ("slots             cls(*row)", lambda rows: [cls(*row) for row in rows]),
+            ("slots             from_rows", cls.from_rows),
+            ("slots+frozen      cls(*row)", lambda rows: [frozen(*row) for row in rows]),
+            ("slots+frozen      from_rows", frozen.from_rows),
+        ]
+        print(f"{cls.__name__} ({len(fields(cls))} fields, {args.rows:,} rows)")
+        base = None
+        for name, build in cases:
+            rate = construct_rate(build, rows, args.repeat)
+            size = per_instance_bytes(build, rows)
+            base = base or rate
+            print(f"  {name}: {rate / 1e6:6.2f} M/s ({rate / base:4.1f}x)  {size:7.0f} B/instance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Benchmark: league_matches + league_player_match_metrics as single heaps vs. range-partitioned
+by season (apps.rift.services.partitions), on a synthetic multi-season dataset.
+
+Builds both layouts in scratch schemas (bench_heap, bench_part) of the database from .env,
+with the same indexes as the real tables, and runs the real query paths against each through
+search_path: one player's season (load_season), newest-first history pages (KeysetPagination's
+query), a season rebuild of the champion rollups, VACUUM after churn in the current season, and
+retiring the oldest season (DELETE vs. detach_season). Both schemas are dropped afterwards
+(unless --keep); detach_season also bumps the page-cache versions of player ids 1..--players.
+
+    cd backend && python -m scripts.bench_partitions --players 2000 --games 60 --seasons 5
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from apps.rift.services import champion_stats, partitions  # noqa: E402
+from apps.rift.services.chapters import load_season, season_bounds  # noqa: E402
+from common.utils.db_util import statement_timeout  # noqa: E402
+
+HEAP, PART = "bench_heap", "bench_part"
+ROLLUPS = (champion_stats.PLAYER_TABLE, champion_stats.ROLE_TABLE)
+ROLES = ("TOP", "JUNGLE", "MIDDLE", "BOTTOM", "SUPPORT")
+
+MATCH_INSERT = """
+    INSERT INTO league_matches (match_id, player_id, match_timestamp, is_processed, game_info, participant, teams,
+                                raw_zlib)
+    SELECT 'KR_' || %(season)s || '_' || p || '_' || g, p, ts, TRUE, '{}', '{}', '[]', '\\x00'
+    FROM (
+        SELECT p, g, %(start)s + floor(random() * %(span)s)::bigint AS ts
+        FROM generate_series(1, %(players)s) p, generate_series(1, %(games)s) g
+    ) s
+    ORDER BY ts  -- arrival order: players interleaved as they sync
+"""
+METRICS_INSERT = f"""
+    INSERT INTO league_player_match_metrics (
+        match_id, player_id, champion_id, champion_name, role, cs_per_min, gold_per_min, damage_per_min,
+        kill_participation, kills, deaths, assists, kda_ratio, win, game_duration, vision_score_per_min,
+        wards_placed, wards_killed, first_blood, first_tower, objective_contribution, match_recorded_at
+    )
+    SELECT id, player_id, c, 'Champion' || c, (ARRAY{list(ROLES)})[1 + player_id %% 5],
+           4 + random() * 6, 300 + random() * 200, 400 + random() * 600, random(),
+           k, d, a, (k + a)::float / GREATEST(d, 1), random() < 0.5, 900 + (random() * 1800)::int,
+           random() * 3, (random() * 20)::int, (random() * 6)::int, random() < 0.1, random() < 0.1,
+           jsonb_build_object('dragon_kills', (random() * 3)::int, 'damage_to_objectives', (random() * 9000)::int),
+           match_timestamp
+    FROM (
+        SELECT id, player_id, match_timestamp, 1 + (player_id * 7 + (random() * 5)::int) %% 160 AS c,
+               (random() * 12)::int AS k, (random() * 9)::int AS d, (random() * 15)::int AS a
+        FROM league_matches
+        WHERE match_timestamp >= %(start)s AND match_timestamp < %(end)s
+        ORDER BY match_timestamp
+    ) m
+"""
+PAGE_QUERY = """
+    SELECT id, match_recorded_at FROM league_player_match_metrics
+    WHERE player_id = %s AND match_recorded_at <= %s AND (match_recorded_at, id) < (%s, %s)
+    ORDER BY match_recorded_at DESC, id DESC
+    LIMIT 21
+"""
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def create_layout(cursor, schema: str, seasons, partitioned: bool):
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {schema}")
+    for table, key in partitions.PARTITIONED.items():
+        scheme = f" PARTITION BY RANGE ({key})" if partitioned else ""
+        cursor.execute(f"CREATE TABLE {schema}.{table} (LIKE public.{table} INCLUDING ALL){scheme}")
+        # own id sequence, so the run leaves the real one alone
+        cursor.execute(f"CREATE SEQUENCE {schema}.{table}_id_seq")
+        cursor.execute(f"ALTER TABLE {schema}.{table} ALTER COLUMN id SET DEFAULT nextval('{schema}.{table}_id_seq')")
+        if partitioned:
+            default = partitions.default_partition(table)
+            cursor.execute(f"CREATE TABLE {schema}.{default} PARTITION OF {schema}.{table} DEFAULT")
+    for table in ROLLUPS:
+        cursor.execute(f"CREATE TABLE {schema}.{table} (LIKE public.{table} INCLUDING ALL)")
+    cursor.execute(f"SET search_path TO {schema}, public")
+    if partitioned:
+        for season in seasons:
+            partitions.create_season(cursor, season)
+
+
+def load(cursor, schema: str, seasons, players: int, games: int) -> float:
+    cursor.execute(f"SET search_path TO {schema}, public")
+    cursor.execute("SELECT setseed(0.42)")
+    started = time.perf_counter()
+    for season in seasons:
+        start, end = season_bounds(season)
+        params = {"season": season, "start": start, "end": end, "span": end - start, "players": players,
+                  "games": games}
+        cursor.execute(MATCH_INSERT, params)
+        cursor.execute(METRICS_INSERT, params)
+    return time.perf_counter() - started
+
+
+def sizes(cursor, schema: str, season: int):
+    """(total bytes, index bytes) of both tables, and of the season's partitions when partitioned."""
+    cursor.execute(
+        """
+        SELECT COALESCE(SUM(pg_total_relation_size(c.oid)), 0), COALESCE(SUM(pg_indexes_size(c.oid)), 0),
+               COALESCE(SUM(pg_total_relation_size(c.oid)) FILTER (WHERE c.relname LIKE %s), 0),
+               COALESCE(SUM(pg_indexes_size(c.oid)) FILTER (WHERE c.relname LIKE %s), 0)
+        FROM pg_class c
+        WHERE c.relnamespace = %s::regnamespace AND c.relkind = 'r'
+          AND c.relname LIKE ANY (ARRAY['league_matches%%', 'league_player_match_metrics%%'])
+        """,
+        (f"%_s{season}", f"%_s{season}", schema),
+    )
+    return cursor.fetchone()
+
+
+def scanned_relations(cursor, sql: str, params) -> int:
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    relations, nodes = set(), [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Relation Name" in node:
+            relations.add(node["Relation Name"])
+        nodes.extend(node.get("Plans", ()))
+    return len(relations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--games", type=int, default=60, help="Games per player per season.")
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=200, help="Random players per read benchmark.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="Leave the scratch schemas (e.g. to EXPLAIN in psql).")
+    args = parser.parse_args()
+
+    current = datetime.now(timezone.utc).year
+    seasons = list(range(current - args.seasons + 1, current + 1))
+    oldest, newest = seasons[0], seasons[-1]
+    rows = args.players * args.games * len(seasons)
+    print(f"{rows:,} matches + {rows:,} metrics rows: {args.players} players x {args.games} games x seasons {seasons}")
+
+    with statement_timeout(0), connection.cursor() as cursor:
+        results = {}
+        for schema, partitioned in ((HEAP, False), (PART, True)):
+            with transaction.atomic():
+                create_layout(cursor, schema, seasons, partitioned)
+                seconds = load(cursor, schema, seasons, args.players, args.games)
+            cursor.execute(f"VACUUM ANALYZE {schema}.league_matches, {schema}.league_player_match_metrics")
+            results[schema] = {"load": seconds}
+            print(f"load {schema:10}: {2 * rows / seconds:10,.0f} rows/s")
+
+        rng = random.Random(0)
+        sample = [rng.randint(1, args.players) for _ in range(args.samples)]
+        print(f"\nbest of {args.repeat}, {args.samples} random players per read:")
+        for schema in (HEAP, PART):
+            cursor.execute(f"SET search_path TO {schema}, public")
+            r = results[schema]
+            total, indexes, season_total, season_indexes = sizes(cursor, schema, newest)
+            r["size"] = (total, indexes, season_total, season_indexes)
+            r["season"] = best_of(lambda: [load_season(cursor, p, newest) for p in sample], args.repeat)
+            r["old_season"] = best_of(lambda: [load_season(cursor, p, oldest) for p in sample], args.repeat)
+            first_page = (PAGE_QUERY, lambda p: (p, 2**62, 2**62, 2**62))
+            old_start = season_bounds(oldest + 1)[0]
+            old_page = (PAGE_QUERY, lambda p: (p, old_start, old_start, 0))
+            for name, (sql, params) in (("first_page", first_page), ("old_page", old_page)):
+                r[name] = best_of(lambda: [cursor.execute(sql, params(p)) or cursor.fetchall() for p in sample],
+                                  args.repeat)
+            start, end = season_bounds(newest)
+            r["season_scanned"] = scanned_relations(
+                cursor,
+                "SELECT * FROM league_player_match_metrics WHERE player_id = %s "
+                "AND match_recorded_at >= %s AND match_recorded_at < %s",
+                (sample[0], start, end),
+            )
+
+            def rebuild():
+                with transaction.atomic():
+                    champion_stats.rebuild(cursor, newest)
+
+            r["rebuild"] = best_of(rebuild, args.repeat)
+            # churn: re-extract 5% of the current season, then vacuum what it touched
+            cursor.execute(
+                "UPDATE league_player_match_metrics SET kills = kills WHERE match_recorded_at >= %s AND id %% 20 = 0",
+                (start,),
+            )
+            target = (partitions.partition_name("league_player_match_metrics", newest) if schema == PART
+                      else "league_player_match_metrics")
+            r["vacuum"] = timed(lambda: cursor.execute(f"VACUUM {schema}.{target}"))
+
+            def retire():
+                with transaction.atomic():
+                    if schema == PART:
+                        partitions.detach_season(cursor, oldest)
+                    else:
+                        bounds = season_bounds(oldest)
+                        cursor.execute(
+                            "DELETE FROM league_player_match_metrics WHERE match_recorded_at >= %s "
+                            "AND match_recorded_at < %s", bounds,
+                        )
+                        cursor.execute(
+                            "DELETE FROM league_matches WHERE match_timestamp >= %s AND match_timestamp < %s",
+                            bounds,
+                        )
+
+            r["retire"] = timed(retire)
+
+        cursor.execute("RESET search_path")
+        if not args.keep:
+            for schema in (HEAP, PART):
+                cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+
+    heap, part = results[HEAP], results[PART]
+    mib = 2**20
+    print(
+        f"  size                     heap {heap['size'][0] / mib:9.1f} MiB (indexes {heap['size'][1] / mib:.1f})   "
+        f"partitioned {part['size'][0] / mib:9.1f} MiB (indexes {part['size'][1] / mib:.1f}; "
+        f"season {newest} {part['size'][2] / mib:.1f}, indexes {part['size'][3] / mib:.1f})"
+    )
+    for name, label, per in (
+        ("season", f"load_season {newest}", args.samples),
+        ("old_season", f"load_season {oldest}", args.samples),
+        ("first_page", "history first page", args.samples),
+        ("old_page", f"history page in {oldest}", args.samples),
+        ("rebuild", f"rebuild rollups {newest}", 1),
+        ("vacuum", "VACUUM after 5% churn", 1),
+        ("retire", f"retire season {oldest}", 1),
+    ):
+        unit, scale = ("us", 1e6) if per > 1 else ("ms", 1e3)
+        print(
+            f"  {label:24} heap {heap[name] / per * scale:9.1f} {unit}   partitioned "
+            f"{part[name] / per * scale:9.1f} {unit}  ({heap[name] / part[name]:5.1f}x)"
+        )
+    print(f"  relations a season read scans: heap {heap['season_scanned']}, partitioned {part['season_scanned']}")
+
+
+if __name__ == "__main__":
+    main()
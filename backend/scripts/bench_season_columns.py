@@ -0,0 +1,154 @@
+"""
+Benchmark: one player's season as a list of PlayerMatchMetrics dataclasses (every column, then
+feature_matrix() for segmentation) vs. SeasonColumns built straight from the rows, plus the
+SeasonColumns bytes round trip used for caching.
+
+Synthetic rows by default (pure CPU, no database); --puuid reads a real season instead and
+includes the query in both paths.
+
+    cd backend && python -m scripts.bench_season_columns --games 1500 --repeat 20
+    cd backend && python -m scripts.bench_season_columns --puuid <puuid> --season 2025
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from dataclasses import fields
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from common.analysis.binseg import CHAPTER_FEATURES, feature_matrix  # noqa: E402
+from common.analysis.season_columns import FIELD_NAMES, SeasonColumns, select_columns  # noqa: E402
+from common.models.player_match_metrics import PlayerMatchMetrics  # noqa: E402
+
+METRIC_COLUMNS = [f.name for f in fields(PlayerMatchMetrics)]
+
+
+def synthetic_rows(n: int):
+    """(full PlayerMatchMetrics rows, select_columns() rows) for n games."""
+    full, columnar = [], []
+    for i in range(n):
+        metrics = PlayerMatchMetrics(
+            id=i, match_id=10_000 + i, player_id=1, champion_id=i % 40, champion_name=f"Champ{i % 40}",
+            role="MIDDLE", lane="MIDDLE", cs_per_min=7.25, gold_per_min=412.5, damage_per_min=801.3,
+            damage_share=0.27, kill_participation=0.61, kills=i % 12, deaths=i % 7, assists=i % 15,
+            kda_ratio=3.4, win=bool(i % 2), team_id=100, participant_id=3, game_duration=1830,
+            vision_score=31, vision_score_per_min=1.02, gold_earned=12_600, total_damage_dealt=180_000,
+            total_damage_taken=21_000, total_heal=3_100, total_minions_killed=210, neutral_minions_killed=12,
+            wards_placed=9, wards_killed=2,
+            items=[3089, 3157, 3020, 4645, 3135, 3165, 3363], summoner_spells=["Flash", "Ignite"],
+            rune_setup={"primary": 8100, "secondary": 8200, "perks": [8112, 8139, 8138, 8135]},
+            skill_order=["Q", "W", "E"] * 6,
+            damage_breakdown={"physical": 0.12, "magic": 0.83, "true": 0.05},
+            objective_contribution={"dragon_kills": 1, "turret_takedowns": 3, "damage_to_objectives": 5400},
+            analysis_json={"lane_phase": {"cs_diff_10": 4, "gold_diff_10": 210}},
+            match_recorded_at=1_735_689_600_000 + i * 3_600_000,
+        )
+        full.append(tuple(getattr(metrics, name) for name in METRIC_COLUMNS))
+        values = [getattr(metrics, name) for name in FIELD_NAMES]
+        columnar.append(tuple(values) + (metrics.champion_id, metrics.champion_name, 3))
+    return full, columnar
+
+
+def fetch_rows(puuid: str, season: int):
+    from django.db import connection
+
+    from apps.rift.services.chapters import season_bounds
+
+    start, end = season_bounds(season)
+    where = """
+        FROM league_player_match_metrics
+        WHERE player_id = (SELECT id FROM league_players WHERE puuid = %s)
+          AND match_recorded_at >= %s AND match_recorded_at < %s
+        ORDER BY match_recorded_at, match_id
+    """
+
+    def query(select):
+        def run():
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT {select} {where}", (puuid, start, end))
+                return cursor.fetchall()
+
+        return run
+
+    return query(", ".join(METRIC_COLUMNS)), query(select_columns())
+
+
+def dataclasses_path(rows):
+    metrics = [PlayerMatchMetrics(*row) for row in rows]
+    return metrics, feature_matrix(metrics, CHAPTER_FEATURES)
+
+
+def columns_path(rows):
+    return SeasonColumns.from_rows(rows)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained(fn) -> int:
+    """Bytes still allocated by fn()'s result (tracemalloc, Python + NumPy allocations)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--puuid", help="Benchmark this player's stored season instead of synthetic rows.")
+    parser.add_argument("--season", type=int, default=2025)
+    args = parser.parse_args()
+
+    if args.puuid:
+        full_query, columnar_query = fetch_rows(args.puuid, args.season)
+        cases = [
+            ("dataclasses + feature_matrix", lambda: dataclasses_path(full_query())),
+            ("SeasonColumns", lambda: columns_path(columnar_query())),
+        ]
+        games = len(columnar_query())
+    else:
+        full, columnar = synthetic_rows(args.games)
+        cases = [
+            ("dataclasses + feature_matrix", lambda: dataclasses_path(full)),
+            ("SeasonColumns", lambda: columns_path(columnar)),
+        ]
+        games = args.games
+
+    print(f"{games} games, best of {args.repeat}" + (" (including the query)" if args.puuid else ""))
+    results = [(name, best_of(fn, args.repeat), retained(fn)) for name, fn in cases]
+    base_time, base_mem = results[0][1], results[0][2]
+    for name, seconds, size in results:
+        print(
+            f"{name:30}: {seconds * 1000:8.2f} ms ({base_time / seconds:5.1f}x)  "
+            f"{size / 1024:9,.0f} KiB ({base_mem / max(size, 1):5.1f}x)"
+        )
+
+    season = cases[1][1]()
+    blob = season.to_bytes()
+    dump = best_of(season.to_bytes, args.repeat)
+    load = best_of(lambda: SeasonColumns.from_bytes(blob), args.repeat)
+    print(
+        f"{'bytes blob':30}: {len(blob) / 1024:,.0f} KiB, "
+        f"to_bytes {dump * 1e6:,.0f} us, from_bytes {load * 1e6:,.0f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
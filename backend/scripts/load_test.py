@@ -0,0 +1,68 @@
+"""
+Load test: fire requests at a running server and report latency percentiles.
+
+Used to compare per-request connections with persistent ones, e.g.
+
+    DB_CONN_MAX_AGE=0  gunicorn config.wsgi -w 4 --threads 4 -b 127.0.0.1:8000 &
+    cd backend && python -m scripts.load_test --puuid <puuid> --requests 4000 --concurrency 16
+    DB_CONN_MAX_AGE=60 gunicorn config.wsgi -w 4 --threads 4 -b 127.0.0.1:8000 &
+    cd backend && python -m scripts.load_test --puuid <puuid> --requests 4000 --concurrency 16
+
+Every request gets a unique ?_= so the rift page cache never answers it and each one reaches
+the database.
+"""
+import argparse
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch(url: str) -> tuple:
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as exc:
+        status = exc.code
+    return time.perf_counter() - started, status
+
+
+def percentile(sorted_values, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--puuid", required=True)
+    parser.add_argument("--path", default="/api/rift/players/{puuid}/metrics/?page_size=20")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=100)
+    args = parser.parse_args()
+
+    path = args.path.format(puuid=args.puuid)
+    sep = "&" if "?" in path else "?"
+    urls = [f"{args.base_url}{path}{sep}_={i}" for i in range(args.warmup + args.requests)]
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(fetch, urls[:args.warmup]))
+        started = time.perf_counter()
+        results = list(pool.map(fetch, urls[args.warmup:]))
+        wall = time.perf_counter() - started
+
+    latencies = sorted(seconds * 1000 for seconds, _ in results)
+    errors = sum(1 for _, status in results if status >= 400)
+    print(f"requests  : {len(results)} ({errors} errors) at concurrency {args.concurrency}")
+    print(f"throughput: {len(results) / wall:,.0f} req/s")
+    print(
+        f"latency ms: p50 {percentile(latencies, 0.50):.1f}  p90 {percentile(latencies, 0.90):.1f}  "
+        f"p99 {percentile(latencies, 0.99):.1f}  mean {statistics.fmean(latencies):.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
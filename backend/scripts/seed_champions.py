@@ -1,6 +1,21 @@
-import os
-import requests
+"""
+Seed league_champions from Data Dragon.
+
+    cd backend && python -m scripts.seed_champions                      # latest version, online
+    cd backend && python -m scripts.seed_champions --file champion.json # cached file, no network
+    cd backend && python -m scripts.seed_champions --force              # re-diff even if the version matches
+
+The table is diffed against the champion list and only new/changed rows are written, in a
+single statement. Nothing is written when league_champion_catalog_version already holds the
+same version and locale.
+"""
+import argparse
+import json
+
 import psycopg2
+import requests
+from psycopg2.extras import execute_values
+
 from common.utils.env_util import get_env
 
 # =========================================================
@@ -10,6 +25,9 @@ VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
 CHAMPION_LIST_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/data/{locale}/champion.json"
 ICON_BASE = "https://ddragon.leagueoflegends.com/cdn/{version}/img/champion/{filename}"
 
+# league_champions columns compared and written (champion_id is the conflict key)
+COLUMNS = ("champion_id", "champion_key", "name", "title", "image_url")
+
 
 def get_latest_version():
     resp = requests.get(VERSIONS_URL, timeout=15)
@@ -18,7 +36,61 @@ def get_latest_version():
     return versions[0]
 
 
+def download_champions(version, locale):
+    url = CHAMPION_LIST_URL.format(version=version, locale=locale)
+    print(f"🌐 Fetching champions from {url}")
+    resp = requests.get(url, timeout=30)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def load_champion_file(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def champion_rows(data, version):
+    """Data Dragon "data" mapping -> {champion_id: row tuple in COLUMNS order}."""
+    rows = {}
+    for champ in data.values():
+        champion_key = champ["id"]
+        champion_id = int(champ["key"])
+        filename = champ.get("image", {}).get("full", f"{champion_key}.png")
+        rows[champion_id] = (
+            champion_id,
+            champion_key,
+            champ.get("name", champion_key),
+            champ.get("title", ""),
+            ICON_BASE.format(version=version, filename=filename),
+        )
+    return rows
+
+
+def diff_champions(current, desired):
+    """
+    current / desired: {champion_id: row}. Returns (created, updated, unchanged) row lists;
+    champions missing from `desired` are left alone (Data Dragon never removes champions).
+    """
+    created, updated, unchanged = [], [], []
+    for champion_id, row in desired.items():
+        existing = current.get(champion_id)
+        if existing is None:
+            created.append(row)
+        elif tuple(existing) != row:
+            updated.append(row)
+        else:
+            unchanged.append(row)
+    return created, updated, unchanged
+
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="Local Data Dragon champion.json (its version field is used).")
+    parser.add_argument("--version", help="Data Dragon version to download (default: latest).")
+    parser.add_argument("--locale", default="en_US")
+    parser.add_argument("--force", action="store_true", help="Diff and write even if the version is unchanged.")
+    args = parser.parse_args()
+
     # =====================================================
     # 1) Load environment variables
     # =====================================================
@@ -31,59 +103,80 @@ def main():
         "port": env("DB_PORT"),
     }
 
+    print(f"🗄️  Connecting to database {db_config['dbname']} at {db_config['host']}:{db_config['port']}")
+    conn = psycopg2.connect(**db_config)
+    cur = conn.cursor()
+    cur.execute("SELECT version, locale FROM league_champion_catalog_version WHERE id = 1")
+    stored = cur.fetchone()
+
     # =====================================================
-    # 2) Fetch champion data
+    # 2) Resolve version + champion data (file first, then network)
     # =====================================================
-    print("🔍 Fetching latest Data Dragon version...")
-    version = get_latest_version()
-    print(f"✅ Using Data Dragon version: {version}")
+    locale = args.locale
+    payload = None
+    if args.file:
+        payload = load_champion_file(args.file)
+        version = payload.get("version") or args.version
+        if not version:
+            raise SystemExit(f"❌ {args.file} has no version field; pass --version.")
+        print(f"📄 Using {args.file} (Data Dragon version {version})")
+    else:
+        print("🔍 Fetching latest Data Dragon version...")
+        version = args.version or get_latest_version()
+        print(f"✅ Using Data Dragon version: {version}")
 
-    locale = "en_US"
-    url = CHAMPION_LIST_URL.format(version=version, locale=locale)
-    print(f"🌐 Fetching champions from {url}")
-    resp = requests.get(url, timeout=30)
-    resp.raise_for_status()
-    data = resp.json().get("data", {})
+    if stored == (version, locale) and not args.force:
+        print(f"⏭️  league_champions already at {version} ({locale}); nothing to do.")
+        cur.close()
+        conn.close()
+        return
 
+    if payload is None:
+        payload = download_champions(version, locale)
+    data = payload.get("data", {})
     if not data:
         print("❌ No champion data found.")
+        cur.close()
+        conn.close()
         return
 
     # =====================================================
-    # 3) Connect to PostgreSQL
+    # 3) Diff against the table
     # =====================================================
-    print(f"🗄️  Connecting to database {db_config['dbname']} at {db_config['host']}:{db_config['port']}")
-    conn = psycopg2.connect(**db_config)
-    cur = conn.cursor()
+    cur.execute(f"SELECT {', '.join(COLUMNS)} FROM league_champions")
+    current = {row[0]: row for row in cur.fetchall()}
+    created, updated, unchanged = diff_champions(current, champion_rows(data, version))
 
     # =====================================================
-    # 4) Upsert champions
+    # 4) Apply changed rows in one statement + record the version
     # =====================================================
-    created = updated = 0
-    for champ in data.values():
-        champion_key = champ["id"]
-        champion_id = int(champ["key"])
-        name = champ.get("name", champion_key)
-        title = champ.get("title", "")
-        filename = champ.get("image", {}).get("full", f"{champion_key}.png")
-        image_url = ICON_BASE.format(version=version, filename=filename)
-
-        cur.execute(
-            """
-            INSERT INTO league_champions (champion_id, champion_key, name, title, image_url)
-            VALUES (%s, %s, %s, %s, %s)
+    changed = created + updated
+    if changed:
+        execute_values(
+            cur,
+            f"""
+            INSERT INTO league_champions ({", ".join(COLUMNS)})
+            VALUES %s
             ON CONFLICT (champion_id) DO UPDATE
             SET champion_key = EXCLUDED.champion_key,
                 name = EXCLUDED.name,
                 title = EXCLUDED.title,
                 image_url = EXCLUDED.image_url
             """,
-            (champion_id, champion_key, name, title, image_url),
+            changed,
+            page_size=len(changed),
+        )
+    # workers compare this stamp to notice that their champion catalog is stale
+    if changed or stored != (version, locale):
+        cur.execute(
+            """
+            INSERT INTO league_champion_catalog_version (id, version, locale, updated_at)
+            VALUES (1, %s, %s, NOW())
+            ON CONFLICT (id) DO UPDATE
+            SET version = EXCLUDED.version, locale = EXCLUDED.locale, updated_at = EXCLUDED.updated_at
+            """,
+            (version, locale),
         )
-        if cur.rowcount == 1:
-            created += 1
-        else:
-            updated += 1
 
     conn.commit()
     cur.close()
@@ -92,7 +185,7 @@ def main():
     # =====================================================
     # 5) Summary
     # =====================================================
-    print(f"🎯 Done. Champions upserted: created={created}, updated={updated}")
+    print(f"🎯 Done. created={len(created)}, updated={len(updated)}, unchanged={len(unchanged)}")
     print(f"🧩 Version: {version} | Locale: {locale}")
 
 